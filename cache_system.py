@@ -1,168 +1,365 @@
 import os
 import json
+import time
+import sqlite3
 import hashlib
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
+import pandas as pd
 import streamlit as st
 
-class CacheSystem:
-    """Sistema de cache inteligente para análises e dados"""
+# Backend padrão do CacheSystem: 'sqlite' (um banco em modo WAL) ou 'json' (um arquivo por item)
+DEFAULT_CACHE_STORAGE = 'sqlite'
+
+
+class JSONCacheStorage:
+    """Um arquivo JSON por item e um arquivo de metadados reescrito a cada alteração (formato original)"""
     
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str):
         self.cache_dir = cache_dir
-        self.memory_cache: Dict[str, Any] = {}
-        self.cache_metadata: Dict[str, Dict[str, Any]] = {}
-        self.max_memory_items = 50
-        self.cache_expiry_hours = 24
-        self._ensure_cache_dir()
+        self.metadata: Dict[str, Dict[str, Any]] = {}
         self._load_metadata()
     
-    def _ensure_cache_dir(self):
-        """Garante que o diretório de cache existe"""
-        if not os.path.exists(self.cache_dir):
-            os.makedirs(self.cache_dir)
-    
     def _load_metadata(self):
         """Carrega metadados do cache"""
         metadata_file = os.path.join(self.cache_dir, "cache_metadata.json")
         if os.path.exists(metadata_file):
             try:
                 with open(metadata_file, 'r', encoding='utf-8') as f:
-                    self.cache_metadata = json.load(f)
+                    self.metadata = json.load(f)
             except:
-                self.cache_metadata = {}
+                self.metadata = {}
     
     def _save_metadata(self):
         """Salva metadados do cache"""
         metadata_file = os.path.join(self.cache_dir, "cache_metadata.json")
         try:
             with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_metadata, f, ensure_ascii=False, indent=2)
+                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
         except:
             pass
     
-    def _generate_cache_key(self, filename: str, analysis_type: str) -> str:
-        """Gera chave única para o cache"""
-        content = f"{filename}_{analysis_type}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Verifica se o cache ainda é válido"""
-        if cache_key not in self.cache_metadata:
+    def _is_valid(self, cache_key: str, now: float) -> bool:
+        metadata = self.metadata.get(cache_key)
+        if metadata is None:
             return False
-        
-        metadata = self.cache_metadata[cache_key]
-        created_time = datetime.fromisoformat(metadata.get('created_at', ''))
-        expiry_time = created_time + timedelta(hours=self.cache_expiry_hours)
-        
-        return datetime.now() < expiry_time
-    
-    def _cleanup_expired_cache(self):
-        """Remove cache expirado"""
-        expired_keys = []
-        for cache_key, metadata in self.cache_metadata.items():
-            if not self._is_cache_valid(cache_key):
-                expired_keys.append(cache_key)
-        
-        for cache_key in expired_keys:
-            self._remove_cache_item(cache_key)
+        expires_at = metadata.get('expires_at')
+        if expires_at is None:
+            # Metadados antigos: validade de 24 horas a partir da criação
+            expires_at = (datetime.fromisoformat(metadata['created_at']) + timedelta(hours=24)).timestamp()
+        return now < expires_at
     
-    def _remove_cache_item(self, cache_key: str):
-        """Remove item específico do cache"""
-        # Remover do cache em memória
-        if cache_key in self.memory_cache:
-            del self.memory_cache[cache_key]
-        
-        # Remover arquivo do disco
+    def get(self, cache_key: str, now: float) -> Tuple[bool, Any, float]:
+        """Retorna (encontrado, valor, expira_em) e atualiza o último acesso"""
+        if not self._is_valid(cache_key, now):
+            self.remove(cache_key)
+            return False, None, 0.0
+        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except:
+            return False, None, 0.0
+        self.touch_many({cache_key: now})
+        metadata = self.metadata[cache_key]
+        return True, data, metadata.get('expires_at', now)
+    
+    def touch_many(self, accesses: Dict[str, float]):
+        """Atualiza o último acesso de vários itens com uma única gravação dos metadados"""
+        touched = False
+        for cache_key, accessed_at in accesses.items():
+            if cache_key in self.metadata:
+                self.metadata[cache_key]['last_accessed'] = datetime.fromtimestamp(accessed_at).isoformat()
+                touched = True
+        if touched:
+            self._save_metadata()
+    
+    def set(self, cache_key: str, filename: str, analysis_type: str, data: Any, now: float, ttl: float):
+        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        self.metadata[cache_key] = {
+            'filename': filename,
+            'analysis_type': analysis_type,
+            'created_at': datetime.fromtimestamp(now).isoformat(),
+            'last_accessed': datetime.fromtimestamp(now).isoformat(),
+            'expires_at': now + ttl,
+            'size': len(str(data))
+        }
+        self._save_metadata()
+    
+    def remove(self, cache_key: str):
         cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
         if os.path.exists(cache_file):
             try:
                 os.remove(cache_file)
             except:
                 pass
-        
-        # Remover metadados
-        if cache_key in self.cache_metadata:
-            del self.cache_metadata[cache_key]
-        
+        if cache_key in self.metadata:
+            del self.metadata[cache_key]
+            self._save_metadata()
+    
+    def keys_for_file(self, filename: str) -> List[str]:
+        return [cache_key for cache_key, metadata in self.metadata.items() if metadata.get('filename') == filename]
+    
+    def remove_expired(self, now: float) -> List[str]:
+        expired_keys = [cache_key for cache_key in self.metadata if not self._is_valid(cache_key, now)]
+        for cache_key in expired_keys:
+            self.remove(cache_key)
+        return expired_keys
+    
+    def clear(self):
+        try:
+            for file in os.listdir(self.cache_dir):
+                if file.endswith('.json') and file != 'cache_metadata.json':
+                    os.remove(os.path.join(self.cache_dir, file))
+        except:
+            pass
+        self.metadata.clear()
         self._save_metadata()
     
-    def _manage_memory_cache(self):
-        """Gerencia o cache em memória para evitar uso excessivo"""
-        if len(self.memory_cache) > self.max_memory_items:
-            # Remover itens mais antigos
-            sorted_items = sorted(
-                self.memory_cache.items(),
-                key=lambda x: self.cache_metadata.get(x[0], {}).get('last_accessed', ''),
-                reverse=True
+    def stats(self) -> Dict[str, Any]:
+        analysis_types: Dict[str, int] = {}
+        for metadata in self.metadata.values():
+            analysis_type = metadata.get('analysis_type', 'unknown')
+            analysis_types[analysis_type] = analysis_types.get(analysis_type, 0) + 1
+        return {
+            'total_items': len(self.metadata),
+            'total_size': sum(metadata.get('size', 0) for metadata in self.metadata.values()),
+            'analysis_types': analysis_types
+        }
+
+
+class SQLiteCacheStorage:
+    """Itens em um banco SQLite (modo WAL): chave indexada, validade e último acesso em colunas
+    
+    Cada operação toca só a linha do item, em uma única transação, de modo que
+    ``get`` e ``set`` custam o mesmo independentemente do número de itens.
+    Os valores são gravados como JSON em colunas BLOB.
+    """
+    
+    def __init__(self, cache_dir: str, filename: str = "cache.sqlite3"):
+        self.path = os.path.join(cache_dir, filename)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    cache_key TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    analysis_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_filename ON cache_entries (filename)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+    
+    def get(self, cache_key: str, now: float) -> Tuple[bool, Any, float]:
+        """Retorna (encontrado, valor, expira_em); itens vencidos são removidos na mesma transação"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return False, None, 0.0
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+                return False, None, 0.0
+            self._conn.execute("UPDATE cache_entries SET last_access = ? WHERE cache_key = ?", (now, cache_key))
+        return True, json.loads(bytes(row[0]).decode('utf-8')), row[1]
+    
+    def touch_many(self, accesses: Dict[str, float]):
+        """Atualiza o último acesso de vários itens em uma única transação"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE cache_key = ?",
+                [(accessed_at, cache_key) for cache_key, accessed_at in accesses.items()]
             )
-            
-            # Manter apenas os itens mais recentes
-            self.memory_cache = dict(sorted_items[:self.max_memory_items])
+    
+    def set(self, cache_key: str, filename: str, analysis_type: str, data: Any, now: float, ttl: float):
+        value = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(cache_key, filename, analysis_type, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key, filename, analysis_type, sqlite3.Binary(value), len(value), now, now + ttl, now)
+            )
+    
+    def remove(self, cache_key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE cache_key = ?", (cache_key,))
+    
+    def keys_for_file(self, filename: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT cache_key FROM cache_entries WHERE filename = ?", (filename,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def remove_expired(self, now: float) -> List[str]:
+        with self._lock, self._conn:
+            expired_keys = [row[0] for row in self._conn.execute(
+                "SELECT cache_key FROM cache_entries WHERE expires_at <= ?", (now,)
+            ).fetchall()]
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        return expired_keys
+    
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries")
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total_items, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+            analysis_types = dict(self._conn.execute(
+                "SELECT analysis_type, COUNT(*) FROM cache_entries GROUP BY analysis_type"
+            ).fetchall())
+        return {'total_items': total_items, 'total_size': total_size, 'analysis_types': analysis_types}
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CacheSystem:
+    """Sistema de cache inteligente para análises e dados
+    
+    Os itens ficam em um backend de armazenamento (``storage``: 'sqlite' ou 'json')
+    e os mais usados também em memória (LRU de ``max_memory_items``). O diretório
+    e o backend só são criados no primeiro uso, não ao importar o módulo.
+    
+    Acertos em memória não tocam o armazenamento: os horários de acesso ficam
+    pendentes e são gravados em lote (``touch_many``) a cada ``touch_flush_items``
+    acessos, quando o item sai da memória ou ao consultar as estatísticas.
+    """
+    
+    def __init__(self, cache_dir: str = "cache", storage: str = DEFAULT_CACHE_STORAGE):
+        self.cache_dir = cache_dir
+        # Itens em memória: chave -> (valor, expira_em)
+        self.memory_cache: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.max_memory_items = 50
+        self.cache_expiry_hours = 24
+        # Últimos acessos ainda não gravados no armazenamento
+        self.touch_flush_items = 50
+        self._pending_touches: Dict[str, float] = {}
+        self._pending_accesses = 0
+        self._storage_name = storage
+        self._storage = None
+        self._storage_lock = threading.Lock()
+    
+    @property
+    def storage(self):
+        """Backend de armazenamento, criado no primeiro acesso"""
+        if self._storage is None:
+            with self._storage_lock:
+                if self._storage is None:
+                    self._ensure_cache_dir()
+                    self._storage = self._create_storage(self._storage_name)
+        return self._storage
+    
+    def _ensure_cache_dir(self):
+        """Garante que o diretório de cache existe"""
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+    
+    def _create_storage(self, storage: str):
+        if storage == 'sqlite':
+            try:
+                return SQLiteCacheStorage(self.cache_dir)
+            except sqlite3.Error:
+                # Sistema de arquivos sem suporte a WAL/locks: usar o formato JSON
+                return JSONCacheStorage(self.cache_dir)
+        if storage == 'json':
+            return JSONCacheStorage(self.cache_dir)
+        raise ValueError(f"Backend de cache não suportado: {storage}")
+    
+    def _generate_cache_key(self, filename: str, analysis_type: str) -> str:
+        """Gera chave única para o cache"""
+        content = f"{filename}_{analysis_type}"
+        return hashlib.md5(content.encode()).hexdigest()
+    
+    def _remember(self, cache_key: str, data: Any, expires_at: float):
+        """Guarda o item em memória, descartando os usados há mais tempo"""
+        self.memory_cache[cache_key] = (data, expires_at)
+        self.memory_cache.move_to_end(cache_key)
+        evicted = False
+        while len(self.memory_cache) > self.max_memory_items:
+            evicted_key, _ = self.memory_cache.popitem(last=False)
+            evicted = evicted or evicted_key in self._pending_touches
+        if evicted:
+            self._flush_touches()
+    
+    def _record_access(self, cache_key: str, now: float):
+        """Registra um acerto em memória; grava os acessos pendentes quando acumulam"""
+        self._pending_touches[cache_key] = now
+        self._pending_accesses += 1
+        if self._pending_accesses >= self.touch_flush_items:
+            self._flush_touches()
+    
+    def _flush_touches(self):
+        """Grava em lote os últimos acessos pendentes"""
+        if not self._pending_touches:
+            self._pending_accesses = 0
+            return
+        pending, self._pending_touches = self._pending_touches, {}
+        self._pending_accesses = 0
+        try:
+            self.storage.touch_many(pending)
+        except Exception:
+            # Último acesso é só informativo: falha de gravação não afeta o cache
+            pass
+    
+    def _remove_cache_item(self, cache_key: str):
+        """Remove item específico do cache"""
+        self.memory_cache.pop(cache_key, None)
+        self._pending_touches.pop(cache_key, None)
+        self.storage.remove(cache_key)
     
     def get(self, filename: str, analysis_type: str) -> Optional[Any]:
         """Recupera item do cache"""
         cache_key = self._generate_cache_key(filename, analysis_type)
-        
-        # Verificar se cache é válido
-        if not self._is_cache_valid(cache_key):
-            self._remove_cache_item(cache_key)
-            return None
+        now = time.time()
         
         # Tentar cache em memória primeiro
-        if cache_key in self.memory_cache:
-            # Atualizar último acesso
-            if cache_key in self.cache_metadata:
-                self.cache_metadata[cache_key]['last_accessed'] = datetime.now().isoformat()
-                self._save_metadata()
-            return self.memory_cache[cache_key]
-        
-        # Tentar carregar do disco
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Adicionar ao cache em memória
-                self.memory_cache[cache_key] = data
-                self._manage_memory_cache()
-                
-                # Atualizar último acesso
-                if cache_key in self.cache_metadata:
-                    self.cache_metadata[cache_key]['last_accessed'] = datetime.now().isoformat()
-                    self._save_metadata()
-                
+        cached = self.memory_cache.get(cache_key)
+        if cached is not None:
+            data, expires_at = cached
+            if now < expires_at:
+                self.memory_cache.move_to_end(cache_key)
+                self._record_access(cache_key, now)
                 return data
-            except:
-                return None
+            self._remove_cache_item(cache_key)
+            return None
         
-        return None
+        # Tentar carregar do armazenamento
+        try:
+            found, data, expires_at = self.storage.get(cache_key, now)
+        except Exception:
+            return None
+        if not found:
+            return None
+        self._remember(cache_key, data, expires_at)
+        return data
     
     def set(self, filename: str, analysis_type: str, data: Any) -> bool:
         """Salva item no cache"""
         try:
             cache_key = self._generate_cache_key(filename, analysis_type)
+            now = time.time()
+            ttl = self.cache_expiry_hours * 3600
             
-            # Salvar no cache em memória
-            self.memory_cache[cache_key] = data
-            self._manage_memory_cache()
-            
-            # Salvar no disco
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            # Atualizar metadados
-            self.cache_metadata[cache_key] = {
-                'filename': filename,
-                'analysis_type': analysis_type,
-                'created_at': datetime.now().isoformat(),
-                'last_accessed': datetime.now().isoformat(),
-                'size': len(str(data))
-            }
-            self._save_metadata()
-            
+            self.storage.set(cache_key, filename, analysis_type, data, now, ttl)
+            self._remember(cache_key, data, now + ttl)
             return True
             
         except Exception as e:
@@ -177,54 +374,30 @@ class CacheSystem:
             self._remove_cache_item(cache_key)
         else:
             # Invalidar todas as análises do arquivo
-            keys_to_remove = []
-            for cache_key, metadata in self.cache_metadata.items():
-                if metadata.get('filename') == filename:
-                    keys_to_remove.append(cache_key)
-            
-            for cache_key in keys_to_remove:
+            for cache_key in self.storage.keys_for_file(filename):
                 self._remove_cache_item(cache_key)
     
     def clear_all(self):
         """Limpa todo o cache"""
-        # Limpar cache em memória
         self.memory_cache.clear()
-        
-        # Limpar arquivos do disco
-        try:
-            for file in os.listdir(self.cache_dir):
-                if file.endswith('.json') and file != 'cache_metadata.json':
-                    os.remove(os.path.join(self.cache_dir, file))
-        except:
-            pass
-        
-        # Limpar metadados
-        self.cache_metadata.clear()
-        self._save_metadata()
+        self._pending_touches.clear()
+        self._pending_accesses = 0
+        self.storage.clear()
         
         st.success("✅ Cache limpo com sucesso!")
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache"""
-        self._cleanup_expired_cache()
-        
-        total_items = len(self.cache_metadata)
-        memory_items = len(self.memory_cache)
-        total_size = sum(metadata.get('size', 0) for metadata in self.cache_metadata.values())
-        
-        # Agrupar por tipo de análise
-        analysis_types = {}
-        for metadata in self.cache_metadata.values():
-            analysis_type = metadata.get('analysis_type', 'unknown')
-            if analysis_type not in analysis_types:
-                analysis_types[analysis_type] = 0
-            analysis_types[analysis_type] += 1
+        self._flush_touches()
+        for cache_key in self.storage.remove_expired(time.time()):
+            self.memory_cache.pop(cache_key, None)
         
+        stats = self.storage.stats()
         return {
-            'total_items': total_items,
-            'memory_items': memory_items,
-            'total_size': total_size,
-            'analysis_types': analysis_types,
+            'total_items': stats['total_items'],
+            'memory_items': len(self.memory_cache),
+            'total_size': stats['total_size'],
+            'analysis_types': stats['analysis_types'],
             'cache_dir': self.cache_dir
         }
     
@@ -261,5 +434,75 @@ class CacheSystem:
             if st.button("🔄 Atualizar Estatísticas", use_container_width=True):
                 st.rerun()
 
+class FrameCache:
+    """Cache em memória de DataFrames já processados, indexado pelo hash do conteúdo
+    
+    Evita refazer o parse do upload a cada rerun do Streamlit. Mantém um orçamento
+    explícito de memória e descarta os itens usados há mais tempo (LRU).
+    """
+    
+    def __init__(self, max_bytes: int = 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, content_hash: str) -> Optional[pd.DataFrame]:
+        """Retorna o DataFrame em cache e o marca como usado recentemente"""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is None:
+                return None
+            self._entries.move_to_end(content_hash)
+            return entry['df']
+    
+    def get_info(self, content_hash: str) -> Dict[str, Any]:
+        """Retorna os metadados associados ao DataFrame em cache"""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            return dict(entry['info']) if entry else {}
+    
+    def put(self, content_hash: str, df: pd.DataFrame, info: Optional[Dict[str, Any]] = None) -> bool:
+        """Adiciona DataFrame ao cache respeitando o orçamento de memória"""
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return False
+        
+        with self._lock:
+            if content_hash in self._entries:
+                self.current_bytes -= self._entries.pop(content_hash)['size']
+            
+            self._entries[content_hash] = {'df': df, 'size': size, 'info': info or {}}
+            self.current_bytes += size
+            
+            # Remover itens menos recentes até caber no orçamento
+            while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted['size']
+        
+        return True
+    
+    def invalidate(self, content_hash: str):
+        """Remove um DataFrame específico do cache"""
+        with self._lock:
+            entry = self._entries.pop(content_hash, None)
+            if entry is not None:
+                self.current_bytes -= entry['size']
+    
+    def clear(self):
+        """Limpa todos os DataFrames em cache"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de uso do cache"""
+        with self._lock:
+            return {
+                'items': len(self._entries),
+                'used_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
 # Instância global do CacheSystem
 cache_system = CacheSystem()
@@ -14,6 +14,7 @@ import numpy as np
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 import warnings
+from data_manager import data_manager, TIME_KEYWORDS
 warnings.filterwarnings('ignore')
 
 class ChartDetector:
@@ -128,6 +129,7 @@ class ChartDetector:
             'group_by': None,
             'aggregation': 'count',
             'time_column': None,
+            'correlation_method': 'spearman' if 'spearman' in question_lower else 'pearson',
             'color_column': None,
             'size_column': None
         }
@@ -147,12 +149,15 @@ class ChartDetector:
         elif any(word in question_lower for word in ['mínimo', 'minimo', 'min']):
             requirements['aggregation'] = 'min'
         
-        # Detecta colunas de tempo
-        time_keywords = ['data', 'ano', 'mês', 'mes', 'dia', 'tempo', 'período', 'periodo']
-        for col in df.columns:
-            if any(keyword in col.lower() for keyword in time_keywords):
-                requirements['time_column'] = col
-                break
+        # Detecta colunas de tempo: datetime64 convertidas no carregamento, senão pelo nome (ex.: ano inteiro)
+        datetime_cols = data_manager.get_datetime_columns(df)
+        if datetime_cols:
+            requirements['time_column'] = datetime_cols[0]
+        else:
+            for col in df.columns:
+                if any(keyword in str(col).lower() for keyword in TIME_KEYWORDS):
+                    requirements['time_column'] = col
+                    break
         
         return requirements
 
@@ -227,7 +232,7 @@ class ChartGenerator:
             return 'correlacao'
         
         # Se há colunas categóricas, usa comparação
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
         if len(categorical_cols) > 0:
             return 'comparacao'
         
@@ -264,12 +269,13 @@ class ChartGenerator:
         # Limita a 10 colunas para não sobrecarregar
         numeric_cols = numeric_cols[:10]
         
-        # Calcula matriz de correlação
-        corr_matrix = df[numeric_cols].corr()
+        # Matriz compartilhada com as demais telas (Spearman se pedido na pergunta)
+        method = requirements.get('correlation_method', 'pearson')
+        corr_matrix = data_manager.get_correlation(df, method=method, columns=list(numeric_cols))
         
         fig = px.imshow(
             corr_matrix,
-            title='Matriz de Correlação',
+            title='Matriz de Correlação' + (' (Spearman)' if method == 'spearman' else ''),
             color_continuous_scale='RdBu',
             aspect='auto'
         )
@@ -322,7 +328,7 @@ class ChartGenerator:
     
     def _create_comparison_chart(self, df: pd.DataFrame, requirements: Dict[str, Any]) -> go.Figure:
         """Cria gráfico de comparação (bar chart)"""
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
         numeric_cols = df.select_dtypes(include=[np.number]).columns
         
         if len(categorical_cols) == 0 or len(numeric_cols) == 0:
@@ -407,7 +413,7 @@ class ChartGenerator:
     def _create_ranking_chart(self, df: pd.DataFrame, requirements: Dict[str, Any]) -> go.Figure:
         """Cria gráfico de ranking (top N)"""
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
         
         if len(numeric_cols) == 0:
             return self._create_default_chart(df, requirements)
@@ -447,7 +453,7 @@ class ChartGenerator:
     
     def _create_categorical_chart(self, df: pd.DataFrame, requirements: Dict[str, Any]) -> go.Figure:
         """Cria gráfico categórico (pie chart)"""
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
         
         if len(categorical_cols) == 0:
             return self._create_default_chart(df, requirements)
@@ -21,6 +21,7 @@ import plotly.graph_objects as go
 
 # Importar visualizações avançadas
 from visualization_enhanced import generate_visualization_insights
+from data_manager import data_manager
 
 # Importações para APIs de IA
 try:
@@ -215,14 +216,16 @@ CONCLUSÕES DOS AGENTES:
             if df is not None:
                 data_context = self.analyze_data_context(df, analysis_name)
                 
-                # Adicionar estatísticas básicas dos dados
-                numeric_cols = df.select_dtypes(include=['number']).columns
+                # Adicionar estatísticas básicas dos dados (perfil compartilhado, sem nova varredura)
+                profile = data_manager.get_profile(df)
+                numeric_cols = profile.numeric_columns[:10]  # Limitar a 10 colunas
                 if len(numeric_cols) > 0:
                     data_context += f"\n\nESTATÍSTICAS BÁSICAS DOS DADOS:\n"
-                    for col in numeric_cols[:10]:  # Limitar a 10 colunas
-                        min_val = df[col].min()
-                        max_val = df[col].max()
-                        mean_val = df[col].mean()
+                    numeric_stats = profile.numeric_summary(numeric_cols)
+                    for col in numeric_cols:
+                        min_val = numeric_stats.at['min', col]
+                        max_val = numeric_stats.at['max', col]
+                        mean_val = numeric_stats.at['mean', col]
                         data_context += f"- {col}: Min={min_val:.2f}, Max={max_val:.2f}, Média={mean_val:.2f}\n"
             
             # Construir prompt do sistema
@@ -365,7 +368,7 @@ IMPORTANTE:
             # Resposta básica baseada nos dados disponíveis
             if df is not None:
                 numeric_cols = df.select_dtypes(include=['number']).columns
-                categorical_cols = df.select_dtypes(include=['object']).columns
+                categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
                 
                 if "tipos de dados" in user_message.lower():
                     return f"""**Tipos de Dados no Dataset:**
@@ -398,24 +401,29 @@ IMPORTANTE:
         if df is None:
             return "Nenhum dado carregado."
         
-        # Análise básica dos dados
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        # Perfil compartilhado (no modo out-of-core, os totais vêm do DuckDB e não da amostra)
+        profile = data_manager.get_profile(df)
+        numeric_cols = profile.numeric_columns
+        categorical_cols = profile.categorical_columns
+        backend = data_manager.get_query_backend(df)
+        n_records = profile.n_rows
         
         # Gerar insights das visualizações
         visualization_insights = ""
         try:
-            visualization_insights = generate_visualization_insights(df)
+            visualization_insights = generate_visualization_insights(df, backend)
         except Exception as e:
             visualization_insights = f"Erro ao gerar insights de visualização: {str(e)}"
         
         context = f"""
 CONTEXTO DOS DADOS:
 - Nome: {analysis_name}
-- Registros: {len(df):,}
+- Registros: {n_records:,}
 - Colunas: {len(df.columns)}
 - Numéricas: {len(numeric_cols)} ({', '.join(numeric_cols[:3])}{'...' if len(numeric_cols) > 3 else ''})
 - Categóricas: {len(categorical_cols)} ({', '.join(categorical_cols[:3])}{'...' if len(categorical_cols) > 3 else ''})
+- Valores ausentes: {profile.total_missing:,}
+- Registros duplicados: {profile.duplicates:,}
 
 INSIGHTS DAS VISUALIZAÇÕES (Matplotlib/Seaborn):
 {visualization_insights}
@@ -472,7 +480,7 @@ BIBLIOTECAS DE VISUALIZAÇÃO DISPONÍVEIS:
         # Sugestões baseadas nos dados
         if df is not None:
             numeric_cols = df.select_dtypes(include=['number']).columns
-            categorical_cols = df.select_dtypes(include=['object']).columns
+            categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
             
             if len(numeric_cols) > 0:
                 suggestions.append(f"📊 Analise a correlação entre {', '.join(numeric_cols[:3])}")
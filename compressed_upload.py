@@ -0,0 +1,183 @@
+# Leitura de uploads comprimidos (.gz, .bz2, .zip, .zst) descomprimindo em streaming
+import io
+import os
+import gzip
+import bz2
+import struct
+import zipfile
+from typing import Optional
+
+try:
+    import zstandard
+    ZSTANDARD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTANDARD_AVAILABLE = False
+
+# Extensões aceitas no upload além de .csv
+COMPRESSED_EXTENSIONS = ['gz', 'bz2', 'zip', 'zst']
+
+# Razão de compressão típica de CSVs, usada quando o formato não guarda o tamanho original (bz2)
+ESTIMATED_COMPRESSION_RATIO = 6
+
+# Assinaturas (magic bytes) de cada formato
+_MAGIC_NUMBERS = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'PK\x03\x04': 'zip',
+    b'\x28\xb5\x2f\xfd': 'zstd',
+}
+
+
+def detect_compression(file) -> Optional[str]:
+    """Identifica a compressão do arquivo pelos primeiros bytes (None se for texto puro)"""
+    file.seek(0)
+    header = file.read(4)
+    file.seek(0)
+    for magic, compression in _MAGIC_NUMBERS.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def uncompressed_size(file) -> int:
+    """Tamanho do conteúdo descomprimido do upload (o próprio tamanho se for texto)
+
+    gzip guarda o tamanho original módulo 2**32 no fim do arquivo (ISIZE), zip o
+    guarda por membro e zstd no cabeçalho do quadro, quando o compressor o
+    informa; nos demais casos o tamanho é estimado por
+    ``ESTIMATED_COMPRESSION_RATIO``.
+    """
+    compression = detect_compression(file)
+    file.seek(0, os.SEEK_END)
+    compressed_size = file.tell()
+    file.seek(0)
+    if compression is None:
+        return compressed_size
+
+    size = None
+    try:
+        if compression == 'gzip' and compressed_size >= 18:
+            file.seek(-4, os.SEEK_END)
+            size = struct.unpack('<I', file.read(4))[0]
+            # ISIZE volta a zero a cada 4 GiB; fora o cabeçalho, o conteúdo não é menor que o arquivo comprimido
+            while size < compressed_size * 0.99 - 64:
+                size += 1 << 32
+        elif compression == 'zip':
+            with zipfile.ZipFile(file) as archive:
+                size = archive.getinfo(_zip_member(archive)).file_size
+        elif compression == 'zstd' and ZSTANDARD_AVAILABLE:
+            content_size = zstandard.frame_content_size(file.read(18))
+            size = content_size if content_size >= compressed_size else None
+    except Exception:
+        # Arquivo truncado ou cabeçalho ilegível: o parse mostrará o erro; aqui vale a estimativa
+        size = None
+    finally:
+        file.seek(0)
+    return int(size) if size is not None else compressed_size * ESTIMATED_COMPRESSION_RATIO
+
+
+def _zip_member(archive: zipfile.ZipFile) -> str:
+    """Primeiro CSV do arquivo zip (ou o primeiro arquivo, se não houver .csv)"""
+    members = [info.filename for info in archive.infolist() if not info.is_dir()]
+    if not members:
+        raise ValueError("Arquivo zip vazio")
+    csv_members = [name for name in members if name.lower().endswith('.csv')]
+    return (csv_members or members)[0]
+
+
+class DecompressedUpload(io.BufferedIOBase):
+    """Arquivo somente leitura que descomprime o upload sob demanda, sem materializar o conteúdo
+
+    ``seek(0)`` reinicia a descompressão, permitindo ler a amostra do sniffer e
+    depois o arquivo inteiro. ``tell()`` retorna a posição no arquivo comprimido,
+    compatível com ``size`` para o cálculo de progresso.
+    """
+
+    def __init__(self, upload, compression: str):
+        super().__init__()
+        if compression == 'zstd' and not ZSTANDARD_AVAILABLE:
+            raise ImportError("Arquivos .zst exigem o pacote zstandard. Execute: pip install zstandard")
+
+        self._upload = upload
+        self.compression = compression
+        self.name = getattr(upload, 'name', 'upload')
+        self.size = getattr(upload, 'size', None)
+        self.file_id = getattr(upload, 'file_id', None)
+        self._archive: Optional[zipfile.ZipFile] = None
+        self._stream = None
+        self._open_stream()
+
+    def _open_stream(self):
+        """Abre o descompressor a partir do início do upload"""
+        self._upload.seek(0)
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._upload, mode='rb')
+        elif self.compression == 'bz2':
+            self._stream = bz2.BZ2File(self._upload, mode='rb')
+        elif self.compression == 'zip':
+            self._archive = zipfile.ZipFile(self._upload)
+            self._stream = self._archive.open(_zip_member(self._archive))
+        elif self.compression == 'zstd':
+            self._stream = zstandard.ZstdDecompressor().stream_reader(self._upload, read_across_frames=True, closefd=False)
+        else:
+            raise ValueError(f"Compressão não suportada: {self.compression}")
+
+    def _close_stream(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Lê ``size`` bytes descomprimidos (menos apenas no fim do arquivo)"""
+        if size is None or size < 0:
+            return self._stream.read()
+        parts = []
+        remaining = size
+        while remaining > 0:
+            data = self._stream.read(remaining)
+            if not data:
+                break
+            parts.append(data)
+            remaining -= len(data)
+        return b''.join(parts)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._stream.read(size if size and size > 0 else io.DEFAULT_BUFFER_SIZE)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Apenas o retorno ao início é suportado: reinicia a descompressão"""
+        if offset != 0 or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation("DecompressedUpload só suporta seek(0)")
+        self._close_stream()
+        self._open_stream()
+        return 0
+
+    def tell(self) -> int:
+        return self._upload.tell()
+
+    def close(self):
+        self._close_stream()
+        super().close()
+
+
+def open_upload(file):
+    """Retorna o próprio upload se for texto, ou um leitor que o descomprime em streaming"""
+    compression = detect_compression(file)
+    if compression is None:
+        return file
+    return DecompressedUpload(file, compression)
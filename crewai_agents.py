@@ -7,6 +7,7 @@ from crewai import Agent, Task, Crew, Process
 from langchain_openai import ChatOpenAI
 import json
 from typing import Dict, List, Any
+from data_manager import data_manager
 
 # Carregar variáveis de ambiente (forçar reload)
 load_dotenv(override=True)
@@ -116,24 +117,33 @@ class CSVAnalysisCrew:
     
     def _get_data_summary(self) -> str:
         """Gera um resumo dos dados para os agentes"""
+        profile = data_manager.get_profile(self.csv_data)
         summary = f"""
         RESUMO DOS DADOS CSV:
         
-        - Total de linhas: {len(self.csv_data)}
-        - Total de colunas: {len(self.csv_data.columns)}
-        - Colunas: {list(self.csv_data.columns)}
-        - Tipos de dados: {dict(self.csv_data.dtypes)}
-        - Valores faltantes: {dict(self.csv_data.isnull().sum())}
-        - Duplicatas: {self.csv_data.duplicated().sum()}
+        - Total de linhas: {profile.n_rows}
+        - Total de colunas: {profile.n_columns}
+        - Colunas: {profile.columns}
+        - Tipos de dados: {profile.dtypes.to_dict()}
+        - Valores faltantes: {profile.missing.to_dict()}
+        - Duplicatas: {profile.duplicates}
         
         PRIMEIRAS 5 LINHAS:
         {self.csv_data.head().to_string()}
         
         ESTATÍSTICAS BÁSICAS:
-        {self.csv_data.describe().to_string()}
+        {profile.numeric_summary().to_string()}
+        {self._quantile_note(profile)}
         """
         return summary
     
+    def _quantile_note(self, profile) -> str:
+        """Aviso sobre quartis estimados por sketch, com o erro de rank"""
+        rank_error = profile.max_quantile_error()
+        if not rank_error:
+            return ""
+        return f"(Quartis 25%/50%/75% aproximados por sketch KLL: erro de rank de até ±{rank_error * 100:.1f}%)"
+    
     def run_analysis(self) -> Dict[str, Any]:
         """Executa a análise completa com todos os agentes"""
         
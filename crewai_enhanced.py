@@ -188,16 +188,23 @@ class CrewAIEnhanced:
             st.warning("⚠️ Nenhum dado carregado para análise")
             return
         
-        # Criar contexto dos dados
+        # Criar contexto dos dados a partir do perfil compartilhado
+        profile = data_manager.get_profile(df)
+        rank_error = profile.max_quantile_error()
+        quantile_note = (f"(Quartis aproximados por sketch KLL: erro de rank de até ±{rank_error * 100:.1f}%)"
+                         if rank_error else "")
         data_context = f"""
         Dataset para análise:
-        - Dimensões: {df.shape[0]} linhas x {df.shape[1]} colunas
-        - Colunas: {', '.join(df.columns.tolist())}
-        - Tipos de dados: {df.dtypes.to_dict()}
+        - Dimensões: {profile.n_rows} linhas x {profile.n_columns} colunas
+        - Colunas: {', '.join(map(str, profile.columns))}
+        - Tipos de dados: {profile.dtypes.to_dict()}
+        - Valores ausentes: {profile.total_missing}
+        - Registros duplicados: {profile.duplicates}
         - Primeiras 5 linhas:
         {df.head().to_string()}
         - Estatísticas básicas:
-        {df.describe().to_string() if len(df.select_dtypes(include=['number']).columns) > 0 else 'Nenhuma coluna numérica encontrada'}
+        {profile.numeric_summary().to_string() if profile.numeric_columns else 'Nenhuma coluna numérica encontrada'}
+        {quantile_note}
         """
         
         self.tasks = {
@@ -65,6 +65,7 @@ from Relatorios_appCSV.report_generator import ReportGenerator, generate_pdf_rep
 
 # Importar visualizações avançadas
 from visualization_enhanced import show_enhanced_visualizations, generate_visualization_insights
+from compressed_upload import COMPRESSED_EXTENSIONS
 
 # Importar sistema de traduções
 from translations import get_text
@@ -245,7 +246,11 @@ st.markdown("""
 
 def load_csv_data(uploaded_files):
     """Carrega dados CSV dos arquivos enviados usando o DataManager"""
-    return data_manager.load_csv(uploaded_files)
+    return data_manager.load_csv(
+        uploaded_files,
+        combine_files=st.session_state.get('combine_files', True),
+        columns=st.session_state.get('selected_columns')
+    )
 
 
 def save_conversation_to_json(conversation_data):
@@ -564,27 +569,115 @@ def show_conclusions_interface():
             else:
                 st.info("Nenhuma análise anterior disponível (somente a análise atual existe).")
 
+def _compute_overview_stats(df, backend=None, total_rows=None):
+    """Calcula as estatísticas da visão geral
+    
+    Com ``backend`` os valores vêm do arquivo completo via DuckDB. Com ``total_rows``
+    o ``df`` é tratado como amostra e as contagens são extrapoladas (aproximadas).
+    """
+    # Perfil compartilhado (calculado uma vez por versão dos dados; DuckDB no modo out-of-core)
+    profile = data_manager.get_profile(df)
+    numeric_cols = pd.Index(profile.numeric_columns)
+    categorical_cols = pd.Index(profile.categorical_columns)
+    scale = total_rows / len(df) if total_rows and len(df) else 1.0
+    
+    n_rows = total_rows or profile.n_rows
+    missing = int(round(profile.total_missing * scale))
+    duplicates = int(round(profile.duplicates * scale))
+    corr_matrix = data_manager.get_correlation(df, columns=list(numeric_cols)) if len(numeric_cols) >= 2 else None
+    numeric_stats = profile.numeric_summary(list(numeric_cols[:5])) if len(numeric_cols) > 0 else None
+    categorical_stats = profile.categorical_summary(list(categorical_cols[:5]))
+    if scale != 1.0:
+        for col_stats in categorical_stats.values():
+            col_stats['missing_values'] = int(round(col_stats['missing_values'] * scale))
+    
+    return {
+        'n_rows': n_rows,
+        'missing': missing,
+        'duplicates': duplicates,
+        'numeric_cols': numeric_cols,
+        'categorical_cols': categorical_cols,
+        'corr_matrix': corr_matrix,
+        'numeric_stats': numeric_stats,
+        'categorical_stats': categorical_stats,
+        'quantile_errors': {col: profile.quantile_error(col) for col in numeric_cols[:5]},
+        'approximate': total_rows is not None
+    }
+
+def _get_overview_stats(df):
+    """Estatísticas exatas se prontas; senão, aproximadas da amostra enquanto as exatas são calculadas"""
+    backend = data_manager.get_query_backend(df)
+    sample, strata_col = data_manager.get_sample_frame(df)
+    if sample is df and backend is None:
+        return _compute_overview_stats(df)
+    if data_manager.is_profile_ready(df):
+        # Perfil já calculado (nesta sessão ou gravado para o mesmo conteúdo): exato sem esperar
+        return _compute_overview_stats(df, backend)
+    
+    exact = data_manager.get_exact_result('overview', _compute_overview_stats, df, backend)
+    if exact is not None:
+        return exact
+    
+    total_rows = backend.row_count() if backend is not None else len(df)
+    stats = _compute_overview_stats(sample, total_rows=total_rows)
+    stats['sample_rows'] = len(sample)
+    stats['strata_col'] = strata_col
+    # Falha do cálculo exato volta da thread para ser exibida na renderização
+    stats['exact_error'] = data_manager.get_exact_error('overview')
+    return stats
+
 def show_minimal_overview(df):
     """Overview minimalista dos dados"""
     if df is None:
         st.info("📁 Carregue um arquivo CSV para ver a visão geral")
         return
     
+    stats = _get_overview_stats(df)
+    if stats['approximate'] and data_manager.is_exact_pending('overview'):
+        # Atualiza só este trecho até as estatísticas exatas ficarem prontas
+        st.fragment(_render_overview_until_exact, run_every=1.0)(df)
+    else:
+        _render_overview(df, stats)
+
+def _render_overview_until_exact(df):
+    """Renderiza a visão geral aproximada e recarrega a página quando a exata fica pronta"""
+    stats = _get_overview_stats(df)
+    if not stats['approximate'] or not data_manager.is_exact_pending('overview'):
+        st.rerun()
+    _render_overview(df, stats)
+
+def _render_overview(df, stats):
+    """Desenha a visão geral a partir das estatísticas calculadas"""
+    n_rows = stats['n_rows']
+    missing = stats['missing']
+    duplicates = stats['duplicates']
+    numeric_cols = stats['numeric_cols']
+    approx = "≈ " if stats['approximate'] else ""
+    
+    if stats['approximate'] and stats.get('exact_error') is not None:
+        strata = f", estratificada por '{stats['strata_col']}'" if stats.get('strata_col') else ""
+        st.error(f"Erro ao calcular as estatísticas exatas: {str(stats['exact_error'])}")
+        st.caption(f"Valores aproximados a partir de uma amostra de {stats['sample_rows']:,} registros{strata}")
+    elif stats['approximate']:
+        strata = f", estratificada por '{stats['strata_col']}'" if stats.get('strata_col') else ""
+        st.caption(f"⏳ Valores aproximados a partir de uma amostra de {stats['sample_rows']:,} registros"
+                   f"{strata}; as estatísticas exatas estão sendo calculadas em segundo plano")
+    elif data_manager.get_query_backend(df) is not None:
+        st.caption("🦆 Estatísticas calculadas sobre o arquivo completo (modo out-of-core)")
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📊 Registros", f"{len(df):,}")
+        st.metric("📊 Registros", f"{n_rows:,}")
     
     with col2:
         st.metric("📋 Colunas", f"{len(df.columns)}")
     
     with col3:
-        missing = df.isnull().sum().sum()
-        st.metric("⚠️ Valores Faltantes", f"{missing:,}")
+        st.metric("⚠️ Valores Faltantes", f"{approx}{missing:,}")
     
     with col4:
-        duplicates = df.duplicated().sum()
-        st.metric("🔄 Duplicatas", f"{duplicates:,}")
+        st.metric("🔄 Duplicatas", f"{approx}{duplicates:,}")
     
     # Tipos de dados - Gráfico maior
     st.subheader("📈 Distribuição dos Tipos de Dados")
@@ -602,15 +695,34 @@ def show_minimal_overview(df):
         font_size=12
     )
     st.plotly_chart(fig, use_container_width=True)
-    
+
+    # Esquema inferido no carregamento
+    schema_report = data_manager.get_inferred_schema()
+    if not schema_report.empty:
+        with st.expander("🧬 Esquema Inferido", expanded=False):
+            st.dataframe(schema_report, use_container_width=True, hide_index=True)
+
+    # Bytes economizados pela redução de tipos no carregamento
+    memory_report = data_manager.get_memory_report()
+    if not memory_report.empty:
+        bytes_before = memory_report['bytes_antes'].sum()
+        bytes_after = memory_report['bytes_depois'].sum()
+        saved_pct = (bytes_before - bytes_after) / bytes_before * 100 if bytes_before else 0.0
+        with st.expander(f"💾 Otimização de Memória ({bytes_before / 1024**2:,.1f} MB → "
+                         f"{bytes_after / 1024**2:,.1f} MB, -{saved_pct:.1f}%)", expanded=False):
+            st.dataframe(
+                memory_report.sort_values('economia_bytes', ascending=False),
+                use_container_width=True,
+                hide_index=True
+            )
+
     # Dados de Perfilamento
     st.subheader("🔍 Perfilamento dos Dados")
     
     # Análise de correlação
-    numeric_cols = df.select_dtypes(include=['number']).columns
-    if len(numeric_cols) >= 2:
-        st.markdown("**📊 Matriz de Correlação**")
-        corr_matrix = df[numeric_cols].corr()
+    corr_matrix = stats['corr_matrix']
+    if corr_matrix is not None:
+        st.markdown(f"**📊 Matriz de Correlação**{' (aproximada)' if stats['approximate'] else ''}")
         
         # Criar heatmap de correlação
         fig_corr = px.imshow(
@@ -630,44 +742,100 @@ def show_minimal_overview(df):
         st.markdown("**📊 Colunas Numéricas**")
         if len(numeric_cols) > 0:
             for col in numeric_cols[:5]:  # Mostrar até 5 colunas
-                stats = df[col].describe()
+                col_stats = stats['numeric_stats'][col]
                 st.write(f"**{col}**:")
-                st.write(f"  - Média: {stats['mean']:.2f}")
-                st.write(f"  - Mediana: {stats['50%']:.2f}")
-                st.write(f"  - Desvio Padrão: {stats['std']:.2f}")
-                st.write(f"  - Min: {stats['min']:.2f} | Max: {stats['max']:.2f}")
+                st.write(f"  - Média: {approx}{col_stats['mean']:.2f}")
+                rank_error = stats['quantile_errors'].get(col)
+                rank_note = f" (±{rank_error * 100:.1f}% de rank)" if rank_error else ""
+                st.write(f"  - Mediana: {approx}{col_stats['50%']:.2f}{rank_note}")
+                st.write(f"  - Desvio Padrão: {approx}{col_stats['std']:.2f}")
+                st.write(f"  - Min: {approx}{col_stats['min']:.2f} | Max: {approx}{col_stats['max']:.2f}")
                 st.write("")
         else:
             st.info("Nenhuma coluna numérica encontrada")
     
     with col2:
         st.markdown("**📋 Colunas Categóricas**")
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        categorical_cols = stats['categorical_cols']
         if len(categorical_cols) > 0:
             for col in categorical_cols[:5]:  # Mostrar até 5 colunas
-                unique_count = df[col].nunique()
-                most_common = df[col].mode().iloc[0] if len(df[col].mode()) > 0 else "N/A"
+                col_stats = stats['categorical_stats'][col]
+                most_common = col_stats['most_common'] if col_stats['most_common'] is not None else "N/A"
                 st.write(f"**{col}**:")
-                st.write(f"  - Valores únicos: {unique_count}")
+                unique_error = col_stats.get('unique_error')
+                if unique_error:
+                    # Estimativa HyperLogLog (colunas de texto grandes)
+                    st.write(f"  - Valores únicos: ≈ {col_stats['unique_values']:,} (±{unique_error * 100:.1f}%)")
+                else:
+                    st.write(f"  - Valores únicos: {approx}{col_stats['unique_values']}")
                 st.write(f"  - Mais comum: {most_common}")
-                st.write(f"  - Valores faltantes: {df[col].isnull().sum()}")
+                st.write(f"  - Valores faltantes: {approx}{col_stats['missing_values']}")
                 st.write("")
         else:
             st.info("Nenhuma coluna categórica encontrada")
     
+    if not stats['approximate']:
+        _render_filtered_profile(df)
+    
     # Qualidade dos dados
     st.subheader("📋 Qualidade dos Dados")
     quality_col1, quality_col2, quality_col3 = st.columns(3)
     
     with quality_col1:
-        st.metric("✅ Completude", f"{((len(df) - df.isnull().sum().sum()) / (len(df) * len(df.columns)) * 100):.1f}%")
+        total_cells = n_rows * len(df.columns)
+        st.metric("✅ Completude", f"{((total_cells - missing) / total_cells * 100) if total_cells else 100.0:.1f}%")
     
     with quality_col2:
-        st.metric("🔄 Unicidade", f"{((len(df) - df.duplicated().sum()) / len(df) * 100):.1f}%")
+        st.metric("🔄 Unicidade", f"{((n_rows - duplicates) / n_rows * 100):.1f}%")
     
     with quality_col3:
         numeric_ratio = len(numeric_cols) / len(df.columns) * 100
         st.metric("📊 % Numéricas", f"{numeric_ratio:.1f}%")
+    
+    # Padrões de ausência (máscara de ausentes dos dados em memória)
+    if missing > 0 and not stats['approximate'] and data_manager.get_query_backend(df) is None:
+        mask = data_manager.get_nullity_mask(df)
+        incomplete = mask.rows_with_missing()
+        with st.expander(f"🧩 Padrões de Valores Ausentes ({incomplete:,} registros incompletos, "
+                         f"{incomplete / n_rows * 100:.1f}%)", expanded=False):
+            st.dataframe(data_manager.get_missing_patterns(df), use_container_width=True, hide_index=True)
+    
+    # Grupos de registros repetidos (índice de hashes dos dados em memória)
+    if duplicates > 0 and not stats['approximate'] and data_manager.get_query_backend(df) is None:
+        with st.expander(f"🔄 Registros Duplicados ({duplicates:,})", expanded=False):
+            st.dataframe(data_manager.get_duplicate_groups(df), use_container_width=True, hide_index=True)
+
+def _render_filtered_profile(df):
+    """Perfil de um recorte por categoria, combinando os agregados pré-calculados de cada valor"""
+    partition_cols = data_manager.get_partition_columns(df)
+    if not partition_cols:
+        return
+    with st.expander("🎯 Perfil por Categoria", expanded=False):
+        column = st.selectbox("Filtrar por", partition_cols, key="filtered_profile_column")
+        options = df[column].dropna().unique().tolist()
+        values = st.multiselect("Valores", options, default=options[:1], key=f"filtered_profile_values_{column}")
+        if not values:
+            st.info("Selecione ao menos um valor")
+            return
+        
+        profile = data_manager.get_filtered_profile(column, values, df)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📊 Registros", f"{profile.n_rows:,}")
+        with col2:
+            st.metric("⚠️ Valores Faltantes", f"{profile.total_missing:,}")
+        with col3:
+            st.metric("🔄 Duplicatas", f"{profile.duplicates:,}")
+        
+        if profile.numeric_columns:
+            rank_error = profile.max_quantile_error()
+            st.markdown(f"**📊 Colunas Numéricas**"
+                        f"{f' (quartis com ±{rank_error * 100:.1f}% de rank)' if rank_error else ''}")
+            st.dataframe(profile.numeric_summary().T, use_container_width=True)
+        categorical_stats = profile.categorical_summary()
+        if categorical_stats:
+            st.markdown("**📋 Colunas Categóricas**")
+            st.dataframe(pd.DataFrame(categorical_stats).T, use_container_width=True)
 
 def show_sidebar():
     """Sidebar minimalista"""
@@ -767,13 +935,74 @@ def show_sidebar():
         st.markdown("### 📁 Arquivos")
         uploaded_files = st.file_uploader(
             "Carregar CSV",
-            type=['csv'],
+            type=['csv'] + COMPRESSED_EXTENSIONS,
             accept_multiple_files=True,
-            help="Selecione arquivos CSV para análise"
+            help="Selecione arquivos CSV para análise (também aceita .csv.gz, .bz2, .zip e .zst)"
         )
         
         if uploaded_files:
             st.success(f"✅ {len(uploaded_files)} arquivo(s) carregado(s)")
+            if len(uploaded_files) > 1:
+                st.session_state['combine_files'] = st.checkbox(
+                    "🔗 Combinar arquivos",
+                    value=st.session_state.get('combine_files', True),
+                    help="Carrega todos os arquivos em paralelo e combina em um único conjunto de dados"
+                )
+            
+            # Prévia do cabeçalho: carregar só as colunas escolhidas
+            with st.expander("🧮 Colunas", expanded=False):
+                files_to_peek = uploaded_files if st.session_state.get('combine_files', True) else uploaded_files[:1]
+                previews = [data_manager.peek_upload(file) for file in files_to_peek]
+                all_columns = list(dict.fromkeys(col for preview in previews for col in preview.columns))
+                free_text = {col for file in files_to_peek for col in data_manager.get_free_text_columns(file)}
+                
+                exclude_free_text = st.checkbox(
+                    "Excluir colunas de texto livre",
+                    value=False,
+                    disabled=not free_text,
+                    help=f"Colunas com textos longos e pouco repetidos: {', '.join(sorted(free_text)) or 'nenhuma'}"
+                )
+                selected_columns = st.multiselect(
+                    "Colunas a carregar",
+                    options=all_columns,
+                    default=[col for col in all_columns if not (exclude_free_text and col in free_text)],
+                    key=f"columns_{'|'.join(file.name for file in files_to_peek)}_{exclude_free_text}",
+                    help="Apenas as colunas selecionadas são lidas do arquivo"
+                )
+                
+                if not selected_columns:
+                    st.warning("⚠️ Nenhuma coluna selecionada; todas serão carregadas.")
+                    st.session_state['selected_columns'] = None
+                else:
+                    st.caption(f"{len(selected_columns)} de {len(all_columns)} colunas "
+                               f"(prévia de {len(previews[0]):,} linhas)")
+                    st.dataframe(previews[0].reindex(columns=selected_columns).head(5), use_container_width=True)
+                    st.session_state['selected_columns'] = (
+                        selected_columns if len(selected_columns) < len(all_columns) else None
+                    )
+        
+        with st.expander("⚙️ Opções de leitura", expanded=False):
+            engine_options = {"Automático (benchmark)": "auto", "Pandas (C)": "c", "PyArrow (multi-thread)": "pyarrow"}
+            selected_engine = st.selectbox(
+                "Engine de parse",
+                options=list(engine_options.keys()),
+                index=list(engine_options.values()).index(data_manager.parser_engine),
+                help="O modo automático usa a engine mais rápida medida neste servidor"
+            )
+            data_manager.parser_engine = engine_options[selected_engine]
+            data_manager.arrow_dtypes = st.checkbox(
+                "Tipos Arrow (experimental)",
+                value=data_manager.arrow_dtypes,
+                help="Mantém as colunas em tipos PyArrow, reduzindo memória para textos"
+            )
+            tolerance_options = {"Exata (sem perda)": 0.0, "1e-7": 1e-7, "1e-6 (padrão)": 1e-6, "1e-5": 1e-5}
+            selected_tolerance = st.selectbox(
+                "Tolerância do float32",
+                options=list(tolerance_options.keys()),
+                index=list(tolerance_options.values()).index(data_manager.memory_optimizer.float32_rtol),
+                help="Erro relativo máximo aceito ao guardar colunas decimais em float32 (metade da memória)"
+            )
+            data_manager.memory_optimizer.float32_rtol = tolerance_options[selected_tolerance]
         
         # Analysis Info
         st.markdown("### 🏷️ Análise")
@@ -812,12 +1041,13 @@ def show_sidebar():
                                 overview_data = {
                                     'data_quality': (df.count().sum() / (len(df) * len(df.columns)) * 100),
                                     'numeric_columns': len(df.select_dtypes(include=[np.number]).columns),
-                                    'categorical_columns': len(df.select_dtypes(include=['object']).columns),
+                                    'categorical_columns': len(
+                                        df.select_dtypes(include=['object', 'category', 'string']).columns),
                                     'insights': [
                                         f"Dataset com {len(df):,} registros e {len(df.columns)} colunas",
                                         f"Completude geral: {(df.count().sum() / (len(df) * len(df.columns)) * 100):.1f}%",
-                                        f"Valores faltantes: {df.isnull().sum().sum()}",
-                                        f"Duplicatas: {df.duplicated().sum()}"
+                                        f"Valores faltantes: {data_manager.get_profile(df).total_missing}",
+                                        f"Duplicatas: {data_manager.get_profile(df).duplicates}"
                                     ]
                                 }
                                 
@@ -893,12 +1123,13 @@ def show_sidebar():
                                 overview_data = {
                                     'data_quality': (df.count().sum() / (len(df) * len(df.columns)) * 100),
                                     'numeric_columns': len(df.select_dtypes(include=[np.number]).columns),
-                                    'categorical_columns': len(df.select_dtypes(include=['object']).columns),
+                                    'categorical_columns': len(
+                                        df.select_dtypes(include=['object', 'category', 'string']).columns),
                                     'insights': [
                                         f"Dataset com {len(df):,} registros e {len(df.columns)} colunas",
                                         f"Completude geral: {(df.count().sum() / (len(df) * len(df.columns)) * 100):.1f}%",
-                                        f"Valores faltantes: {df.isnull().sum().sum()}",
-                                        f"Duplicatas: {df.duplicated().sum()}"
+                                        f"Valores faltantes: {data_manager.get_profile(df).total_missing}",
+                                        f"Duplicatas: {data_manager.get_profile(df).duplicates}"
                                     ]
                                 }
                                 
@@ -1025,7 +1256,7 @@ def main():
             elif selected == "📈 Visualizações":
                 st.markdown("### 📈 Visualizações Avançadas")
                 st.markdown('<hr class="chat-title-divider">', unsafe_allow_html=True)
-                show_enhanced_visualizations(df)
+                show_enhanced_visualizations(df, data_manager.get_query_backend(df))
                 
     
     else:
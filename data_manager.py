@@ -1,10 +1,56 @@
 import pandas as pd
+import numpy as np
 import streamlit as st
 import json
 import os
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from datetime import datetime
 import hashlib
+import codecs
+import csv
+import threading
+import shutil
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from cache_system import FrameCache
+from type_inference import TypeInferenceEngine
+from memory_optimizer import MemoryOptimizer
+from sampling_layer import SamplingLayer
+from compressed_upload import open_upload, detect_compression, uncompressed_size
+from profile_aggregates import AggregateProfiler
+from dataset_profile import DatasetProfile, ProfileEngine
+from partitioned_profile import PartitionedAggregates
+from profile_store import ProfileStore
+from row_hash_index import RowHashIndex
+from nullity_mask import NullityMask
+from correlation_engine import CorrelationEngine
+from parallel_profiler import ParallelColumnProfiler
+from parser_benchmark import get_default_engine
+from query_backend import DuckDBBackend, DUCKDB_AVAILABLE
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = feather = None
+
+# Encodings testados na amostra, em ordem de preferência (latin-1 aceita qualquer byte)
+SUPPORTED_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+# Versão do formato dos snapshots colunares; incrementar quando a limpeza/inferência mudar
+SNAPSHOT_VERSION = 3
+SNAPSHOT_INFO_KEY = b'csv_analysis_info'
+
+# Coluna que identifica o arquivo de origem ao combinar múltiplos uploads
+SOURCE_FILE_COLUMN = '_arquivo_origem'
+# Coluna com o número do grupo na listagem de registros duplicados
+DUPLICATE_GROUP_COLUMN = '_grupo_duplicado'
+# Palavras em nomes de colunas que indicam tempo (prioridade entre colunas datetime)
+TIME_KEYWORDS = ['time', 'date', 'data', 'ano', 'mês', 'mes', 'dia', 'tempo', 'período', 'periodo', 'hora']
 
 class DataManager:
     """Sistema central de dados para gerenciar CSV e análises CrewAI"""
@@ -14,6 +60,75 @@ class DataManager:
         self.current_filename: Optional[str] = None
         self.analysis_cache: Dict[str, Any] = {}
         self.cache_dir = "cache"
+        # Leitura em blocos para arquivos grandes
+        self.chunked_threshold_bytes = 200 * 1024 * 1024
+        self.chunk_size = 100_000
+        # Detecção de formato por amostra de bytes
+        self.sniff_sample_bytes = 64 * 1024
+        self.current_encoding: Optional[str] = None
+        self.current_delimiter: Optional[str] = None
+        # Cache de DataFrames processados, indexado pelo hash do conteúdo
+        self.current_hash: Optional[str] = None
+        self.frame_cache = FrameCache(max_bytes=1024 * 1024 * 1024)
+        self._upload_hashes: Dict[Tuple[Any, ...], str] = {}
+        # Múltiplos arquivos: carregar em paralelo e combinar
+        self.combine_multiple_files = True
+        self.max_parallel_files = os.cpu_count() or 4
+        # Engine de parse: 'c' (pandas), 'pyarrow' (multi-thread) ou 'auto' (benchmark do host)
+        self.parser_engine = 'auto'
+        self.arrow_dtypes = False
+        self._auto_engine: Optional[str] = None
+        self._engine_lock = threading.Lock()
+        # Modo out-of-core: consultas no DuckDB sobre o arquivo em disco
+        self.out_of_core_threshold_bytes = 2 * 1024 * 1024 * 1024
+        self.out_of_core_sample_rows = 100_000
+        self.query_backend: Optional[DuckDBBackend] = None
+        # Prévia (cabeçalho + primeiras linhas) para a escolha de colunas
+        self.peek_rows = 200
+        self.free_text_min_length = 30
+        self._peek_cache: Dict[str, pd.DataFrame] = {}
+        self._free_text_cache: Dict[str, List[str]] = {}
+        # Inferência de tipos por amostra
+        self.type_engine = TypeInferenceEngine()
+        self.inferred_schema: Dict[str, Dict[str, Any]] = {}
+        # Redução de tipos após a limpeza (bytes antes/depois por coluna)
+        self.optimize_memory = True
+        self.memory_optimizer = MemoryOptimizer()
+        self.memory_report: Dict[str, Dict[str, Any]] = {}
+        # Perfilamento de DataFrames largos dividido por colunas entre processos
+        self.parallel_profiler = ParallelColumnProfiler()
+        # Agregados aditivos (nulos, somas, extremos) atualizados incrementalmente
+        self.aggregate_profiler = AggregateProfiler(parallel=self.parallel_profiler)
+        self.aggregates: Optional[Dict[str, Any]] = None
+        # Arquivos já carregados que podem ser a base de um upload com linhas anexadas
+        self.max_append_bases = 16
+        self._append_bases: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._append_lock = threading.Lock()
+        # Amostras para a primeira renderização e estatísticas exatas em segundo plano
+        self.sampling = SamplingLayer()
+        # Perfis imutáveis por versão dos dados: (DataFrame perfilado, perfil)
+        self.profile_engine = ProfileEngine(self.aggregate_profiler, parallel=self.parallel_profiler)
+        self.max_profiles_per_version = 4
+        self._profiles: Dict[str, List[Tuple[pd.DataFrame, DatasetProfile]]] = {}
+        self._profile_lock = threading.Lock()
+        # Perfis e correlações gravados por conteúdo: um novo upload do mesmo arquivo não recalcula
+        self.persist_profiles = True
+        self.profile_store = ProfileStore(self.cache_dir)
+        # Hashes por registro (duplicatas e deduplicação), por versão dos dados
+        self.max_row_indexes = 4
+        self._row_indexes: "OrderedDict[str, RowHashIndex]" = OrderedDict()
+        self._row_index_lock = threading.Lock()
+        # Máscaras de ausentes compactadas em bits, por versão dos dados
+        self.max_nullity_masks = 4
+        self._nullity_masks: "OrderedDict[str, NullityMask]" = OrderedDict()
+        self._nullity_lock = threading.Lock()
+        # Agregados por valor de uma coluna categórica (perfis de recortes filtrados)
+        self.max_partition_values = 200
+        self.max_partitioned_columns = 8
+        self._partitions: "OrderedDict[Tuple[str, str], Tuple[pd.DataFrame, PartitionedAggregates]]" = OrderedDict()
+        self._partition_lock = threading.Lock()
+        # Matrizes de correlação compartilhadas (visão geral, visualizações, gráficos do chat, insights)
+        self.correlation_engine = CorrelationEngine()
         self._ensure_cache_dir()
     
     def _ensure_cache_dir(self):
@@ -25,38 +140,75 @@ class DataManager:
         """Gera hash único para o arquivo"""
         return hashlib.md5(filename.encode()).hexdigest()
     
-    def load_csv(self, uploaded_files) -> Optional[pd.DataFrame]:
-        """Carrega arquivo CSV e atualiza o estado atual"""
+    def load_csv(self, uploaded_files, chunked: Optional[bool] = None,
+                 combine_files: Optional[bool] = None,
+                 out_of_core: Optional[bool] = None,
+                 columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Carrega arquivo CSV e atualiza o estado atual
+        
+        Args:
+            uploaded_files: Lista de arquivos enviados pelo usuário
+            chunked: Força (True) ou desativa (False) a leitura em blocos.
+                Se None, a leitura em blocos é usada para arquivos acima de
+                ``chunked_threshold_bytes``.
+            combine_files: Se True, todos os arquivos enviados são carregados em
+                paralelo e combinados em um único DataFrame. Se None, usa
+                ``combine_multiple_files``.
+            out_of_core: Se True, o arquivo fica em disco e as estatísticas são
+                consultadas via DuckDB; ``current_df`` recebe apenas uma amostra.
+                Se None, é usado para arquivos acima de ``out_of_core_threshold_bytes``.
+            columns: Carrega apenas estas colunas (``usecols``), escolhidas a partir
+                de ``peek_upload``. Se None, carrega todas.
+        """
         try:
             if uploaded_files:
-                file = uploaded_files[0]
-                self.current_filename = file.name
+                if combine_files is None:
+                    combine_files = self.combine_multiple_files
+                files = list(uploaded_files) if combine_files else [uploaded_files[0]]
                 
-                # Tentar diferentes encodings
-                encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-                df = None
+                if len(files) == 1 and self._should_use_out_of_core(files[0], out_of_core):
+                    content_hash, df, info = self._open_out_of_core(files[0], columns)
+                    filename = files[0].name
+                elif len(files) == 1:
+                    self._close_query_backend()
+                    content_hash, df, info = self._load_single_upload(files[0], chunked, columns=columns)
+                    filename = files[0].name
+                else:
+                    self._close_query_backend()
+                    content_hash, df, info = self._load_multiple_uploads(files, chunked, columns)
+                    filename = f"{files[0].name} (+{len(files) - 1} arquivos)"
                 
-                for encoding in encodings:
-                    try:
-                        file.seek(0)  # Reset file pointer
-                        df = pd.read_csv(file, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                
-                if df is None:
-                    st.error("❌ Não foi possível carregar o arquivo com nenhum encoding suportado.")
-                    return None
-                
-                # Limpar dados
-                df = self._clean_dataframe(df)
+                file_changed = content_hash != self.current_hash
+                if file_changed and self.current_hash:
+                    self.sampling.invalidate(self.current_hash)
+                    with self._profile_lock:
+                        self._profiles.pop(self.current_hash, None)
+                    with self._partition_lock:
+                        for partition_key in [key for key in self._partitions if key[0] == self.current_hash]:
+                            del self._partitions[partition_key]
+                    self.correlation_engine.invalidate(self.current_hash)
+                self.current_filename = filename
+                self.current_hash = content_hash
+                self.current_encoding = info.get('encoding')
+                self.current_delimiter = info.get('delimiter')
+                self.inferred_schema = info.get('schema', {})
+                self.memory_report = info.get('memory_report', {})
+                self.aggregates = info.get('aggregates')
                 self.current_df = df
                 
                 # Limpar cache antigo se arquivo mudou
-                self._clear_old_cache()
+                if file_changed:
+                    self._clear_old_cache()
                 
                 st.success(f"✅ Arquivo '{self.current_filename}' carregado com sucesso!")
-                st.info(f"📊 Dados: {len(df):,} registros × {len(df.columns)} colunas")
+                if self.query_backend is not None:
+                    st.info(f"🦆 Modo out-of-core: {self.query_backend.row_count():,} registros × {len(df.columns)} colunas "
+                            f"consultados em disco (amostra de {len(df):,} registros em memória)")
+                else:
+                    st.info(f"📊 Dados: {len(df):,} registros × {len(df.columns)} colunas")
+                if file_changed and info.get('appended_rows') is not None:
+                    st.info(f"➕ Continuação de um arquivo já carregado: apenas "
+                            f"{info['appended_rows']:,} novos registros foram processados")
                 
                 return df
             else:
@@ -67,21 +219,864 @@ class DataManager:
             st.error(f"❌ Erro ao carregar arquivo: {str(e)}")
             return None
     
-    def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Limpa e prepara o DataFrame"""
-        # Remover colunas completamente vazias
-        df = df.dropna(axis=1, how='all')
+    def peek_upload(self, file, n_rows: Optional[int] = None) -> pd.DataFrame:
+        """Lê apenas o cabeçalho e as primeiras linhas para a escolha de colunas
         
-        # Converter colunas numéricas
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                # Tentar converter para numérico
+        Args:
+            file: Arquivo enviado
+            n_rows: Número de linhas lidas (padrão ``peek_rows``)
+        """
+        content_hash = self._get_content_hash(file)
+        preview = self._peek_cache.get(content_hash)
+        if preview is None:
+            stream = open_upload(file)
+            try:
+                encoding, delimiter = self._sniff_csv_format(stream)
                 try:
-                    df[col] = pd.to_numeric(df[col], errors='ignore')
-                except:
+                    preview = pd.read_csv(stream, encoding=encoding, sep=delimiter, nrows=n_rows or self.peek_rows)
+                except UnicodeDecodeError:
+                    stream.seek(0)
+                    preview = pd.read_csv(stream, encoding='latin-1', sep=delimiter, nrows=n_rows or self.peek_rows)
+            finally:
+                self._close_upload_stream(stream, file)
+            self._peek_cache[content_hash] = preview
+        return preview
+    
+    def get_free_text_columns(self, file) -> List[str]:
+        """Colunas de texto livre (alta cardinalidade e textos longos) na prévia do arquivo"""
+        content_hash = self._get_content_hash(file)
+        free_text = self._free_text_cache.get(content_hash)
+        if free_text is None:
+            preview = self.peek_upload(file)
+            schema = self.type_engine.infer_schema(preview)
+            free_text = []
+            for col, info in schema.items():
+                if info.get('inferred_type') != 'text':
+                    continue
+                lengths = preview[col].dropna().astype(str).str.len()
+                if not lengths.empty and lengths.mean() >= self.free_text_min_length:
+                    free_text.append(col)
+            self._free_text_cache[content_hash] = free_text
+        return free_text
+    
+    def _close_upload_stream(self, stream, file):
+        """Fecha o leitor de descompressão (o upload original continua aberto)"""
+        if stream is not file:
+            stream.close()
+        file.seek(0)
+    
+    def _projection_hash(self, content_hash: str, columns: Optional[List[str]]) -> str:
+        """Chave de cache do arquivo com a projeção de colunas e as opções de leitura aplicadas
+        
+        Engine de parse, dtypes Arrow e redução de tipos mudam o DataFrame resultante:
+        alterar uma dessas opções gera outra chave (cache em memória e snapshot).
+        """
+        projection = '*' if columns is None else '\x1f'.join(sorted(str(col) for col in columns))
+        key = '|'.join([content_hash, self._load_settings(), projection])
+        return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _load_settings(self) -> str:
+        """Opções de leitura que alteram os tipos do DataFrame carregado"""
+        return (f"engine={self.parser_engine};arrow={bool(self.arrow_dtypes)};optimize={bool(self.optimize_memory)};"
+                f"float32_rtol={self.memory_optimizer.float32_rtol:g}")
+    
+    def _resolve_usecols(self, file, encoding: str, delimiter: str,
+                         columns: Optional[List[str]]) -> Optional[List[str]]:
+        """Converte a seleção em ``usecols`` com as colunas que existem neste arquivo"""
+        if columns is None:
+            return None
+        file.seek(0)
+        header = pd.read_csv(file, encoding=encoding, sep=delimiter, nrows=0).columns
+        file.seek(0)
+        selected = set(columns)
+        return [col for col in header if col in selected]
+    
+    def _should_use_out_of_core(self, file, out_of_core: Optional[bool]) -> bool:
+        """Decide se o arquivo deve ser consultado em disco em vez de carregado inteiro"""
+        if out_of_core is None:
+            out_of_core = self._get_content_size(file) >= self.out_of_core_threshold_bytes
+        if out_of_core and not DUCKDB_AVAILABLE:
+            st.warning("⚠️ DuckDB não está instalado; carregando o arquivo inteiro em memória.")
+            return False
+        return out_of_core
+    
+    def _open_out_of_core(self, file, columns: Optional[List[str]] = None) -> Tuple[str, pd.DataFrame, Dict[str, Any]]:
+        """Copia o upload para disco e abre o backend DuckDB sobre ele
+        
+        Returns:
+            Hash do conteúdo (com a projeção), amostra limpa em memória e metadados do carregamento
+        """
+        content_hash = self._get_content_hash(file)
+        dataset_hash = self._projection_hash(content_hash, columns)
+        sample_key = f"{dataset_hash}_out_of_core"
+        
+        uploads_dir = os.path.join(self.cache_dir, "uploads")
+        os.makedirs(uploads_dir, exist_ok=True)
+        path = os.path.join(uploads_dir, f"{content_hash}.csv")
+        stream = open_upload(file)
+        try:
+            if not os.path.exists(path):
+                # Uploads comprimidos são gravados já descomprimidos, bloco a bloco
+                temp_path = f"{path}.tmp"
+                stream.seek(0)
+                with open(temp_path, 'wb') as target:
+                    shutil.copyfileobj(stream, target, length=1024 * 1024)
+                os.replace(temp_path, path)
+            
+            encoding, delimiter = self._sniff_csv_format(stream)
+            usecols = self._resolve_usecols(stream, encoding, delimiter, columns)
+        finally:
+            self._close_upload_stream(stream, file)
+        if (self.query_backend is None or self.query_backend.path != path
+                or self.query_backend.projection != usecols):
+            self._close_query_backend()
+            self.query_backend = DuckDBBackend(path, delimiter=delimiter, encoding=encoding, columns=usecols)
+        
+        df = self.frame_cache.get(sample_key)
+        if df is not None:
+            return dataset_hash, df, self.frame_cache.get_info(sample_key)
+        
+        df = self.query_backend.sample(self.out_of_core_sample_rows)
+        df, schema = self._clean_dataframe(df, None, self._decimal_hint(delimiter))
+        df, memory_report = self._optimize_memory(df, schema)
+        info = {'encoding': encoding, 'delimiter': delimiter, 'schema': schema,
+                'memory_report': memory_report, 'out_of_core': True}
+        self.frame_cache.put(sample_key, df, info)
+        return dataset_hash, df, info
+    
+    def _close_query_backend(self):
+        """Fecha o backend out-of-core do arquivo anterior"""
+        if self.query_backend is not None:
+            self.query_backend.close()
+            self.query_backend = None
+    
+    def get_query_backend(self, df: Optional[pd.DataFrame] = None) -> Optional[DuckDBBackend]:
+        """Retorna o backend out-of-core ativo
+        
+        Se ``df`` for informado, o backend só é retornado quando ``df`` é a amostra
+        dos dados atuais (e não um recorte qualquer).
+        """
+        if self.query_backend is None:
+            return None
+        if df is not None and df is not self.current_df:
+            return None
+        return self.query_backend
+    
+    def _load_single_upload(self, file, chunked: Optional[bool] = None, show_progress: bool = True,
+                            cache_in_memory: bool = True,
+                            columns: Optional[List[str]] = None) -> Tuple[str, pd.DataFrame, Dict[str, Any]]:
+        """Carrega um arquivo usando cache em memória, snapshot em disco ou parse
+        
+        Não chama o Streamlit quando ``show_progress`` é False, podendo rodar em threads.
+        
+        Returns:
+            Hash do conteúdo (com a projeção de colunas), DataFrame limpo e metadados do carregamento
+        """
+        # Reruns do Streamlit com o mesmo conteúdo reutilizam o DataFrame já processado
+        content_hash = self._projection_hash(self._get_content_hash(file), columns)
+        df = self.frame_cache.get(content_hash)
+        if df is not None:
+            return content_hash, df, self.frame_cache.get_info(content_hash)
+        
+        # Conteúdo já visto em outra sessão: reabrir o snapshot colunar sem parse
+        snapshot = self._load_snapshot(content_hash)
+        # Arquivo que só cresceu: processar apenas as linhas novas
+        appended = self._load_appended_upload(file, columns, content_hash) if snapshot is None else None
+        if snapshot is not None:
+            df, info = snapshot
+        elif appended is not None:
+            df, info = appended
+            info['filename'] = file.name
+            self._save_snapshot(content_hash, df, info)
+        else:
+            if chunked is None:
+                chunked = self._get_content_size(file) >= self.chunked_threshold_bytes
+            
+            progress_bar = None
+            if chunked and show_progress:
+                progress_bar = st.progress(0.0, text="📥 Carregando arquivo em blocos...")
+            progress_callback = (lambda value: progress_bar.progress(value)) if progress_bar else None
+            
+            df, info = self._parse_upload(file, chunked, progress_callback, columns)
+            info['filename'] = file.name
+            
+            if progress_bar is not None:
+                progress_bar.empty()
+            
+            self._save_snapshot(content_hash, df, info)
+        
+        if cache_in_memory:
+            self.frame_cache.put(content_hash, df, info)
+        self._register_append_base(file, content_hash, columns)
+        return content_hash, df, info
+    
+    def _register_append_base(self, file, dataset_hash: str, columns: Optional[List[str]]):
+        """Registra o arquivo carregado como possível prefixo de uploads futuros"""
+        if detect_compression(file) is not None:
+            return
+        with self._append_lock:
+            self._append_bases[dataset_hash] = {
+                'content_hash': self._get_content_hash(file),
+                'size': self._get_upload_size(file),
+                'columns': columns,
+                'settings': self._load_settings()
+            }
+            self._append_bases.move_to_end(dataset_hash)
+            while len(self._append_bases) > self.max_append_bases:
+                self._append_bases.popitem(last=False)
+    
+    def _get_prefix_hashes(self, file, sizes: List[int]) -> Dict[int, str]:
+        """Hash (mesmo algoritmo de ``_get_content_hash``) dos primeiros ``size`` bytes, em uma única leitura"""
+        hasher = hashlib.blake2b(digest_size=16)
+        prefix_hashes = {}
+        position = 0
+        file.seek(0)
+        for size in sorted(set(sizes)):
+            while position < size:
+                block = file.read(min(1024 * 1024, size - position))
+                if not block:
+                    break
+                hasher.update(block)
+                position += len(block)
+            if position == size:
+                prefix_hashes[size] = hasher.copy().hexdigest()
+        file.seek(0)
+        return prefix_hashes
+    
+    def _find_append_base(self, file, columns: Optional[List[str]]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Procura um arquivo já carregado cujo conteúdo é prefixo exato do upload"""
+        size = self._get_upload_size(file)
+        settings = self._load_settings()
+        with self._append_lock:
+            candidates = [(key, base) for key, base in self._append_bases.items()
+                          if base['size'] < size and base['columns'] == columns
+                          and base['settings'] == settings]
+        if not candidates:
+            return None
+        
+        prefix_hashes = self._get_prefix_hashes(file, [base['size'] for _, base in candidates])
+        for key, base in reversed(candidates):
+            if prefix_hashes.get(base['size']) == base['content_hash']:
+                return key, base
+        return None
+    
+    def _load_appended_upload(self, file, columns: Optional[List[str]] = None,
+                              content_hash: Optional[str] = None
+                              ) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Carrega um upload que estende um arquivo já carregado, fazendo parse só do final
+        
+        Retorna None (e o arquivo é carregado do zero) quando não há base, quando o
+        prefixo não termina em quebra de linha ou quando as linhas novas não seguem
+        o esquema da base. O índice de hashes da base, se existir, é estendido para
+        ``content_hash`` com as linhas novas.
+        """
+        if detect_compression(file) is not None:
+            return None
+        match = self._find_append_base(file, columns)
+        if match is None:
+            return None
+        base_key, base = match
+        
+        base_df = self.frame_cache.get(base_key)
+        base_info = self.frame_cache.get_info(base_key) if base_df is not None else None
+        if base_df is None:
+            snapshot = self._load_snapshot(base_key)
+            if snapshot is None:
+                return None
+            base_df, base_info = snapshot
+        
+        try:
+            appended = self._append_tail(file, base['size'], base_df, base_info, columns)
+        except (ValueError, TypeError, UnicodeDecodeError, pd.errors.ParserError):
+            return None
+        if appended is not None and content_hash is not None:
+            self._extend_row_index(base_key, content_hash, len(base_df), appended[0])
+        return appended
+    
+    def _append_tail(self, file, offset: int, base_df: pd.DataFrame, base_info: Dict[str, Any],
+                     columns: Optional[List[str]]) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Faz o parse dos bytes após ``offset`` com o esquema da base e anexa ao DataFrame base"""
+        file.seek(offset - 1)
+        ends_with_newline = file.read(1) == b'\n'
+        file.seek(0)
+        if not ends_with_newline:
+            return None
+        
+        encoding = base_info.get('encoding') or 'utf-8'
+        delimiter = base_info.get('delimiter') or ','
+        header = pd.read_csv(file, encoding=encoding, sep=delimiter, nrows=0).columns
+        usecols = self._resolve_usecols(file, encoding, delimiter, columns)
+        
+        # Colunas que a base guardou como texto/data são lidas como texto, como no parse completo
+        # (sem isso '07777' viraria o número 7777)
+        text_columns = {col: str for col in base_df.columns
+                        if self._dtype_family(base_df[col].dtype) in ('text', 'datetime')}
+        
+        # O final não tem cabeçalho nem BOM: usar os nomes do cabeçalho original
+        file.seek(offset)
+        tail = pd.read_csv(file, header=None, names=list(header), sep=delimiter, usecols=usecols,
+                           dtype=text_columns, encoding='utf-8' if encoding == 'utf-8-sig' else encoding)
+        file.seek(0)
+        
+        # Colunas descartadas por estarem vazias na base precisam continuar vazias
+        dropped = [col for col in tail.columns if col not in base_df.columns]
+        if any(tail[col].notna().any() for col in dropped):
+            return None
+        tail = tail[list(base_df.columns)].copy()
+        
+        base_schema = base_info.get('schema', {})
+        schema = copy.deepcopy(base_schema)
+        tail = self.type_engine.apply_schema(tail, schema)
+        if any(schema[col].get('inferred_type') != base_schema[col].get('inferred_type') for col in schema):
+            return None
+        tail = self.memory_optimizer.downcast_numeric(tail)
+        for col in base_df.columns:
+            if isinstance(base_df[col].dtype, pd.CategoricalDtype) and not isinstance(tail[col].dtype, pd.CategoricalDtype):
+                tail[col] = tail[col].astype('category')
+        # Tipo diferente do da base (ex.: texto que virou número): o parse completo decide
+        if any(self._dtype_family(base_df[col].dtype) != self._dtype_family(tail[col].dtype)
+               for col in base_df.columns):
+            return None
+        
+        casts_base, casts_tail = {}, {}
+        for col in base_df.columns:
+            target = self._promote_dtypes([base_df[col].dtype, tail[col].dtype], False, [base_df, tail], col)
+            if base_df[col].dtype != target:
+                casts_base[col] = target
+            if tail[col].dtype != target:
+                casts_tail[col] = target
+        tail_bytes = tail.memory_usage(deep=True, index=False)
+        combined_base = base_df.astype(casts_base) if casts_base else base_df
+        tail = tail.astype(casts_tail) if casts_tail else tail
+        df = pd.concat([combined_base, tail], ignore_index=True, sort=False)
+        
+        # Texto convertido em category pela otimização de memória: a proporção de distintos
+        # do arquivo completo decide o tipo, como no parse completo
+        if self.optimize_memory:
+            for col in df.columns:
+                if schema.get(col, {}).get('inferred_type') != 'text':
+                    continue
+                n_values = int(df[col].notna().sum())
+                if not n_values:
+                    continue
+                is_category = isinstance(df[col].dtype, pd.CategoricalDtype)
+                n_unique = len(df[col].cat.categories) if is_category else df[col].nunique(dropna=True)
+                if is_category != (n_unique / n_values <= self.memory_optimizer.category_max_ratio):
+                    return None
+        
+        for col, col_info in schema.items():
+            if col in df.columns:
+                col_info['dtype'] = str(df[col].dtype)
+        
+        # Relatório de memória e agregados atualizados sem revisitar as linhas da base
+        memory_report = {}
+        for col, col_report in base_info.get('memory_report', {}).items():
+            if col not in df.columns:
+                continue
+            memory_report[col] = dict(col_report)
+            memory_report[col]['dtype_after'] = str(df[col].dtype)
+            memory_report[col]['bytes_before'] = col_report['bytes_before'] + int(tail_bytes.get(col, 0))
+            memory_report[col]['bytes_after'] = int(df[col].memory_usage(deep=True, index=False))
+        
+        base_aggregates = base_info.get('aggregates')
+        tail_aggregates = self.aggregate_profiler.compute(tail)
+        aggregates = (self.aggregate_profiler.merge(base_aggregates, tail_aggregates)
+                      if base_aggregates else self.aggregate_profiler.compute(df))
+        
+        info = {
+            'encoding': encoding,
+            'delimiter': delimiter,
+            'schema': schema,
+            'memory_report': memory_report,
+            'aggregates': aggregates,
+            'appended_rows': len(tail)
+        }
+        return df, info
+    
+    def _dtype_family(self, dtype) -> str:
+        """Família do tipo ('numeric', 'bool', 'datetime' ou 'text'); promoções só dentro da família"""
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'bool'
+        if pd.api.types.is_numeric_dtype(dtype):
+            return 'numeric'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime'
+        return 'text'
+    
+    def _load_multiple_uploads(self, files: List[Any], chunked: Optional[bool] = None,
+                               columns: Optional[List[str]] = None) -> Tuple[str, pd.DataFrame, Dict[str, Any]]:
+        """Carrega vários arquivos em paralelo e combina em um único DataFrame"""
+        hashes = [self._projection_hash(self._get_content_hash(file), columns) for file in files]
+        combined_hash = hashlib.blake2b('|'.join(hashes).encode(), digest_size=16).hexdigest()
+        
+        df = self.frame_cache.get(combined_hash)
+        if df is not None:
+            return combined_hash, df, self.frame_cache.get_info(combined_hash)
+        
+        snapshot = self._load_snapshot(combined_hash)
+        if snapshot is not None:
+            df, info = snapshot
+            self.frame_cache.put(combined_hash, df, info)
+            return combined_hash, df, info
+        
+        progress_bar = st.progress(0.0, text=f"📥 Carregando {len(files)} arquivos em paralelo...")
+        results: List[Optional[Tuple[str, pd.DataFrame, Dict[str, Any]]]] = [None] * len(files)
+        
+        # O parser libera o GIL durante a tokenização, então threads aproveitam vários núcleos
+        max_workers = max(1, min(len(files), self.max_parallel_files))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._load_single_upload, file, chunked, False, False, columns): index
+                for index, file in enumerate(files)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                progress_bar.progress(done / len(files))
+        progress_bar.empty()
+        
+        frames = [result[1] for result in results]
+        infos = [result[2] for result in results]
+        df = self._combine_frames(frames, [file.name for file in files])
+        df, memory_report = self._optimize_memory(df)
+        
+        # O "antes" do combinado é a soma do "antes" de cada arquivo
+        for col, col_report in memory_report.items():
+            file_reports = [info['memory_report'][col] for info in infos
+                            if col in info.get('memory_report', {})]
+            if file_reports:
+                col_report['dtype_before'] = file_reports[0]['dtype_before']
+                col_report['bytes_before'] = sum(report['bytes_before'] for report in file_reports)
+        
+        # Esquema combinado: primeira ocorrência de cada coluna, com o dtype reconciliado
+        schema: Dict[str, Dict[str, Any]] = {}
+        for info in infos:
+            for col, col_info in info.get('schema', {}).items():
+                schema.setdefault(col, dict(col_info))
+        for col, col_info in schema.items():
+            if col in df.columns:
+                col_info['dtype'] = str(df[col].dtype)
+        
+        info = {
+            'encoding': infos[0].get('encoding'),
+            'delimiter': infos[0].get('delimiter'),
+            'schema': schema,
+            'memory_report': memory_report,
+            'aggregates': self._combine_aggregates(infos, df),
+            'sources': [file.name for file in files]
+        }
+        self._save_snapshot(combined_hash, df, info)
+        self.frame_cache.put(combined_hash, df, info)
+        return combined_hash, df, info
+    
+    def _combine_aggregates(self, infos: List[Dict[str, Any]], df: pd.DataFrame) -> Dict[str, Any]:
+        """Agregados do combinado a partir dos agregados de cada arquivo, sem revisitar as linhas
+        
+        Colunas sem agregados compatíveis com o tipo final (coluna de origem, tipos
+        reconciliados como texto, snapshots antigos) são recalculadas.
+        """
+        parts = [info.get('aggregates') for info in infos]
+        if any(part is None for part in parts):
+            return self.aggregate_profiler.compute(df)
+        merged = copy.deepcopy(parts[0])
+        for part in parts[1:]:
+            merged = self.aggregate_profiler.merge(merged, part)
+        stale = [col for col in df.columns if not self.aggregate_profiler.matches(merged, col, df[col])]
+        if stale:
+            merged['columns'].update(self.aggregate_profiler.compute(df[stale])['columns'])
+        return {'rows': len(df), 'columns': {str(col): merged['columns'][str(col)] for col in df.columns}}
+    
+    def _combine_frames(self, frames: List[pd.DataFrame], names: List[str]) -> pd.DataFrame:
+        """Reconcilia esquemas (união de colunas, promoção de tipos) e concatena os arquivos
+        
+        Cada linha recebe o nome do arquivo de origem em ``SOURCE_FILE_COLUMN``.
+        """
+        columns: List[str] = []
+        for frame in frames:
+            columns.extend(col for col in frame.columns if col not in columns)
+        
+        targets = {}
+        for col in columns:
+            dtypes = [frame[col].dtype for frame in frames if col in frame.columns]
+            missing_somewhere = len(dtypes) < len(frames)
+            targets[col] = self._promote_dtypes(dtypes, missing_somewhere, frames, col)
+        
+        aligned = []
+        for frame in frames:
+            casts = {col: targets[col] for col in frame.columns if frame[col].dtype != targets[col]}
+            aligned.append(frame.astype(casts) if casts else frame)
+        
+        combined = pd.concat(aligned, ignore_index=True, sort=False)
+        
+        # Nomes repetidos recebem sufixo para manter categorias únicas
+        labels = []
+        for index, name in enumerate(names):
+            labels.append(name if name not in labels else f"{name} ({index + 1})")
+        codes = np.repeat(np.arange(len(frames), dtype=np.int32), [len(frame) for frame in frames])
+        combined[SOURCE_FILE_COLUMN] = pd.Categorical.from_codes(codes, categories=labels)
+        
+        return combined
+    
+    def _promote_dtypes(self, dtypes: List[Any], missing_somewhere: bool,
+                        frames: List[pd.DataFrame], col: str) -> Any:
+        """Escolhe um dtype comum para a mesma coluna vinda de arquivos diferentes"""
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            categories = pd.Index([])
+            for frame in frames:
+                if col in frame.columns:
+                    categories = categories.union(frame[col].cat.categories, sort=False)
+            return pd.CategoricalDtype(categories)
+        
+        if all(pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+            return 'boolean' if missing_somewhere else dtypes[0]
+        
+        if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+               for dtype in dtypes):
+            promoted = np.result_type(*dtypes)
+            if missing_somewhere and promoted.kind in 'iu':
+                # Coluna ausente em algum arquivo vira NaN
+                promoted = np.result_type(promoted, np.float64)
+            return promoted
+        
+        if all(pd.api.types.is_datetime64_any_dtype(dtype) for dtype in dtypes) and len(set(map(str, dtypes))) == 1:
+            return dtypes[0]
+        
+        if len(set(map(str, dtypes))) == 1 and not missing_somewhere:
+            return dtypes[0]
+        
+        return np.dtype(object)
+    
+    def _get_content_hash(self, file) -> str:
+        """Gera hash do conteúdo do upload, calculado uma única vez por arquivo enviado"""
+        upload_key = None
+        file_id = getattr(file, 'file_id', None)
+        if file_id is not None:
+            upload_key = (file_id, file.name, self._get_upload_size(file))
+            if upload_key in self._upload_hashes:
+                return self._upload_hashes[upload_key]
+        
+        hasher = hashlib.blake2b(digest_size=16)
+        file.seek(0)
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            hasher.update(block)
+        file.seek(0)
+        content_hash = hasher.hexdigest()
+        
+        if upload_key is not None:
+            self._upload_hashes[upload_key] = content_hash
+        return content_hash
+    
+    def _get_snapshot_path(self, content_hash: str) -> str:
+        """Caminho do snapshot colunar (Arrow IPC) para um conteúdo"""
+        return os.path.join(self.cache_dir, f"{content_hash}_v{SNAPSHOT_VERSION}.arrow")
+    
+    def _save_snapshot(self, content_hash: str, df: pd.DataFrame, info: Dict[str, Any]) -> bool:
+        """Grava snapshot Arrow IPC (sem compressão, para permitir memory-map) do DataFrame limpo"""
+        if not PYARROW_AVAILABLE:
+            return False
+        
+        path = self._get_snapshot_path(content_hash)
+        temp_path = f"{path}.tmp"
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            metadata = dict(table.schema.metadata or {})
+            metadata[SNAPSHOT_INFO_KEY] = json.dumps(info, ensure_ascii=False, default=str).encode('utf-8')
+            table = table.replace_schema_metadata(metadata)
+            
+            # Um único lote por coluna permite reabrir sem cópia (split_blocks)
+            feather.write_feather(table, temp_path, compression='uncompressed',
+                                  chunksize=max(len(df), 1))
+            os.replace(temp_path, path)
+            return True
+        except Exception:
+            # Colunas com tipos mistos não são representáveis em Arrow: seguir sem snapshot
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
                     pass
+            return False
+    
+    def _load_snapshot(self, content_hash: str) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """Reabre snapshot via memory-map
+        
+        Colunas numéricas sem nulos apontam direto para o arquivo mapeado (somente leitura).
+        """
+        if not PYARROW_AVAILABLE:
+            return None
+        
+        path = self._get_snapshot_path(content_hash)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with pa.memory_map(path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            
+            metadata = table.schema.metadata or {}
+            info = json.loads(metadata.get(SNAPSHOT_INFO_KEY, b'{}').decode('utf-8'))
+            df = table.to_pandas(split_blocks=True)
+            return df, info
+        except Exception:
+            return None
+    
+    def _parse_upload(self, file, chunked: bool,
+                      progress_callback: Optional[Callable[[float], None]] = None,
+                      columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Detecta o formato, faz o parse e limpa o arquivo enviado
+        
+        Arquivos comprimidos (.gz, .bz2, .zip, .zst) são descomprimidos em streaming
+        direto para o parser, sem materializar o conteúdo descomprimido.
+        """
+        stream = open_upload(file)
+        try:
+            # Detectar encoding e delimitador a partir de uma amostra de bytes
+            encoding, delimiter = self._sniff_csv_format(stream)
+            usecols = self._resolve_usecols(stream, encoding, delimiter, columns)
+            
+            try:
+                df, schema, aggregates = self._read_upload(stream, encoding, delimiter, chunked,
+                                                           progress_callback, usecols)
+            except UnicodeDecodeError:
+                # Byte inválido após a amostra: latin-1 decodifica qualquer byte
+                encoding = 'latin-1'
+                df, schema, aggregates = self._read_upload(stream, encoding, delimiter, chunked,
+                                                           progress_callback, usecols)
+        finally:
+            self._close_upload_stream(stream, file)
         
-        return df
+        # Limpar dados
+        df, schema = self._clean_dataframe(df, schema, self._decimal_hint(delimiter))
+        df, memory_report = self._optimize_memory(df, schema)
+        if aggregates is not None:
+            aggregates = self.aggregate_profiler.reconcile(aggregates, df)
+        else:
+            aggregates = self.aggregate_profiler.compute(df)
+        
+        return df, {'encoding': encoding, 'delimiter': delimiter, 'schema': schema,
+                    'memory_report': memory_report, 'aggregates': aggregates}
+    
+    def _sniff_csv_format(self, file) -> Tuple[str, str]:
+        """Detecta encoding e delimitador lendo apenas uma amostra limitada de bytes"""
+        file.seek(0)
+        sample = file.read(self.sniff_sample_bytes)
+        file.seek(0)
+        at_eof = len(sample) < self.sniff_sample_bytes
+        
+        text, encoding = '', 'latin-1'
+        for candidate in SUPPORTED_ENCODINGS:
+            try:
+                # Decodificador incremental tolera caractere multibyte cortado no fim da amostra
+                decoder = codecs.getincrementaldecoder(candidate)()
+                text = decoder.decode(sample, final=at_eof)
+                encoding = candidate
+                break
+            except UnicodeDecodeError:
+                continue
+        
+        if encoding == 'utf-8' and sample.startswith(codecs.BOM_UTF8):
+            encoding = 'utf-8-sig'
+        
+        lines = text.splitlines()
+        if not at_eof and len(lines) > 1:
+            # Última linha da amostra pode estar incompleta
+            lines = lines[:-1]
+        
+        delimiter = ','
+        if lines:
+            try:
+                dialect = csv.Sniffer().sniff('\n'.join(lines[:50]), delimiters=',;\t|')
+                delimiter = dialect.delimiter
+            except csv.Error:
+                pass
+        
+        return encoding, delimiter
+    
+    def _read_upload(self, file, encoding: str, delimiter: str, chunked: bool,
+                     progress_callback: Optional[Callable[[float], None]] = None,
+                     usecols: Optional[List[str]] = None
+                     ) -> Tuple[pd.DataFrame, Optional[Dict[str, Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Faz o parse do arquivo uma única vez com o formato detectado
+        
+        Apenas as colunas em ``usecols`` são tokenizadas e convertidas.
+        
+        Returns:
+            DataFrame e, na leitura em blocos, o esquema inferido do primeiro bloco e
+            os agregados combinados dos blocos
+        """
+        file.seek(0)
+        if chunked:
+            # O leitor do PyArrow não suporta chunksize: blocos usam sempre o parser C
+            return self._read_csv_chunked(file, encoding, delimiter, progress_callback, usecols)
+        
+        read_options: Dict[str, Any] = {'encoding': encoding, 'sep': delimiter, 'usecols': usecols}
+        if self._resolve_parser_engine() == 'pyarrow':
+            read_options['engine'] = 'pyarrow'
+        if self.arrow_dtypes and PYARROW_AVAILABLE:
+            read_options['dtype_backend'] = 'pyarrow'
+        df = pd.read_csv(file, **read_options)
+        if read_options.get('engine') == 'pyarrow' and encoding.startswith('utf-8'):
+            self._check_decoded(df, encoding)
+        return df, None, None
+    
+    def _check_decoded(self, df: pd.DataFrame, encoding: str):
+        """O PyArrow devolve como bytes (em vez de falhar) colunas com UTF-8 inválido: tratar como o parser C"""
+        for col in df.columns:
+            dtype = df[col].dtype
+            if isinstance(dtype, pd.ArrowDtype):
+                binary = pa.types.is_binary(dtype.pyarrow_dtype) or pa.types.is_large_binary(dtype.pyarrow_dtype)
+            else:
+                binary = dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) in ('bytes', 'mixed')
+            if binary:
+                raise UnicodeDecodeError(encoding, b'', 0, 1, f"bytes inválidos na coluna {col}")
+    
+    def _resolve_parser_engine(self) -> str:
+        """Resolve a engine de parse; 'auto' usa o resultado do benchmark deste host"""
+        if self.parser_engine == 'pyarrow':
+            return 'pyarrow' if PYARROW_AVAILABLE else 'c'
+        if self.parser_engine != 'auto':
+            return 'c'
+        
+        with self._engine_lock:
+            if self._auto_engine is None:
+                self._auto_engine = get_default_engine(self.cache_dir)
+            return self._auto_engine
+    
+    def _decimal_hint(self, delimiter: Optional[str]) -> str:
+        """Separador decimal provável: CSVs com ';' costumam usar vírgula decimal"""
+        return ',' if delimiter == ';' else '.'
+    
+    def _get_upload_size(self, file) -> int:
+        """Retorna o tamanho do arquivo enviado em bytes"""
+        size = getattr(file, 'size', None)
+        if size is not None:
+            return int(size)
+        position = file.tell()
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(position)
+        return size
+    
+    def _get_content_size(self, file) -> int:
+        """Tamanho do conteúdo descomprimido, usado para decidir entre leitura em blocos e out-of-core"""
+        if detect_compression(file) is None:
+            return self._get_upload_size(file)
+        return uncompressed_size(file)
+    
+    def _read_csv_chunked(self, file, encoding: str, delimiter: str = ',',
+                          progress_callback: Optional[Callable[[float], None]] = None,
+                          usecols: Optional[List[str]] = None
+                          ) -> Tuple[pd.DataFrame, Optional[Dict[str, Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """Lê o CSV em blocos de tamanho limitado, reduzindo os tipos a cada bloco
+        
+        Os tipos do primeiro bloco definem o esquema alvo; os blocos seguintes são
+        convertidos para ele (com promoção quando os valores não cabem). Assim o pico
+        de memória fica próximo do tamanho final do DataFrame em vez de 3-4x.
+        Os agregados (momentos e sketches) são calculados em cada bloco e combinados
+        com ``AggregateProfiler.merge``, sem uma nova passada pelo DataFrame completo.
+        Colunas que viram texto em um bloco posterior (ex.: códigos numéricos seguidos
+        de alfanuméricos) são relidas como texto e têm o tipo reinferido no arquivo
+        inteiro, como na leitura completa.
+        """
+        total_size = self._get_upload_size(file)
+        chunks: List[pd.DataFrame] = []
+        first_dtypes: Optional[Dict[str, Any]] = None
+        target_dtypes: Optional[Dict[str, Any]] = None
+        schema: Optional[Dict[str, Dict[str, Any]]] = None
+        aggregates: Optional[Dict[str, Any]] = None
+        
+        with pd.read_csv(file, encoding=encoding, sep=delimiter, usecols=usecols,
+                         chunksize=self.chunk_size) as reader:
+            for chunk in reader:
+                if schema is None:
+                    schema = self.type_engine.infer_schema(chunk, self._decimal_hint(delimiter))
+                # Categorias só após juntar os blocos, para não divergirem entre eles
+                chunk = self.type_engine.apply_schema(chunk, schema, types=('numeric', 'boolean', 'datetime'))
+                chunk = self.memory_optimizer.downcast_numeric(chunk)
+                if target_dtypes is None:
+                    first_dtypes = target_dtypes = chunk.dtypes.to_dict()
+                else:
+                    chunk, target_dtypes = self._align_chunk_dtypes(chunk, target_dtypes)
+                chunks.append(chunk)
+                chunk_aggregates = self.aggregate_profiler.compute(chunk)
+                aggregates = (chunk_aggregates if aggregates is None
+                              else self.aggregate_profiler.merge(aggregates, chunk_aggregates))
+                
+                if progress_callback and total_size:
+                    progress_callback(min(file.tell() / total_size, 1.0))
+        
+        if not chunks:
+            return pd.DataFrame(), schema, None
+        
+        df = pd.concat(chunks, ignore_index=True, copy=False)
+        chunks.clear()
+        
+        degraded = [col for col, dtype in target_dtypes.items()
+                    if dtype == np.dtype(object) and first_dtypes[col] != np.dtype(object)]
+        if degraded:
+            # Os primeiros blocos já perderam o texto original (ex.: zeros à esquerda): reler só estas colunas
+            file.seek(0)
+            text = pd.read_csv(file, encoding=encoding, sep=delimiter, usecols=degraded, dtype=str)
+            schema.update(self.type_engine.infer_schema(text, self._decimal_hint(delimiter)))
+            for col in degraded:
+                df[col] = text[col].to_numpy()
+        return df, schema, aggregates
+    
+    def _align_chunk_dtypes(self, chunk: pd.DataFrame,
+                            target_dtypes: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Converte um bloco para o esquema alvo, promovendo tipos quando necessário"""
+        target_dtypes = dict(target_dtypes)
+        for col in chunk.columns:
+            target = target_dtypes.get(col)
+            current = chunk[col].dtype
+            if target is None or current == target:
+                continue
+            
+            if pd.api.types.is_numeric_dtype(target) and pd.api.types.is_numeric_dtype(current):
+                promoted = np.result_type(target, current)
+                target_dtypes[col] = promoted
+                if current != promoted:
+                    chunk[col] = chunk[col].astype(promoted)
+            else:
+                # Tipos incompatíveis entre blocos: manter como texto
+                target_dtypes[col] = np.dtype(object)
+                chunk[col] = chunk[col].astype(object)
+        
+        return chunk, target_dtypes
+    
+    def _clean_dataframe(self, df: pd.DataFrame, schema: Optional[Dict[str, Dict[str, Any]]] = None,
+                         decimal_hint: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+        """Limpa e prepara o DataFrame
+        
+        Returns:
+            DataFrame limpo e o esquema inferido de cada coluna
+        """
+        # Remover colunas completamente vazias
+        df = df.dropna(axis=1, how='all')
+        
+        # Inferir tipos por amostra e converter cada coluna uma única vez
+        if schema is None:
+            schema = self.type_engine.infer_schema(df, decimal_hint)
+        schema = {col: info for col, info in schema.items() if col in df.columns}
+        df = self.type_engine.apply_schema(df, schema)
+        
+        return df, schema
+    
+    def _optimize_memory(self, df: pd.DataFrame,
+                         schema: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+        """Reduz os tipos do DataFrame limpo e mantém o esquema com os dtypes finais
+        
+        Returns:
+            DataFrame otimizado e relatório de bytes antes/depois por coluna
+        """
+        if not self.optimize_memory:
+            return df, {}
+        
+        df, report = self.memory_optimizer.optimize(df)
+        if schema:
+            for col, col_info in schema.items():
+                if col in report:
+                    col_info['dtype'] = report[col]['dtype_after']
+        return df, report
     
     def _clear_old_cache(self):
         """Limpa cache de análises antigas"""
@@ -102,27 +1097,353 @@ class DataManager:
         """Retorna o nome do arquivo atual"""
         return self.current_filename
     
+    def get_inferred_schema(self) -> pd.DataFrame:
+        """Retorna o relatório do esquema inferido para os dados atuais"""
+        return self.type_engine.schema_report(self.inferred_schema)
+    
+    def get_sample_frame(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[str]]:
+        """Retorna a amostra usada na primeira renderização
+        
+        Para DataFrames pequenos (ou que não são os dados atuais) retorna o próprio
+        ``df``. A amostra é estratificada pela coluna de baixa cardinalidade
+        retornada junto, ou aleatória quando ela é None.
+        """
+        if df is not self.current_df or not self.sampling.needs_sampling(df):
+            return df, None
+        return self.sampling.get_sample(self.current_hash, df)
+    
+    def get_exact_result(self, name: str, func: Callable[..., Any], *args) -> Optional[Any]:
+        """Agenda ``func(*args)`` em segundo plano (uma vez por versão dos dados)
+        
+        Returns:
+            O resultado exato se já estiver pronto, ou None enquanto é calculado
+        """
+        self.sampling.submit(self.current_hash, name, func, *args)
+        return self.sampling.get_result(self.current_hash, name)
+    
+    def get_exact_error(self, name: str) -> Optional[BaseException]:
+        """Exceção do cálculo exato ``name``, se ele falhou (para exibir na renderização)"""
+        return self.sampling.get_error(self.current_hash, name)
+    
+    def is_exact_pending(self, name: str) -> bool:
+        """Indica se o cálculo exato ``name`` ainda está em andamento"""
+        return self.sampling.is_pending(self.current_hash, name)
+    
+    def get_profile(self, df: Optional[pd.DataFrame] = None) -> Optional[DatasetProfile]:
+        """Perfil do DataFrame, calculado uma única vez por versão dos dados
+        
+        Os dados atuais (no modo out-of-core, o arquivo completo via DuckDB), a
+        amostra e outros recortes da mesma versão têm cada um o seu perfil em cache.
+        
+        Args:
+            df: DataFrame perfilado (padrão: ``current_df``)
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return None
+        
+        key = self.current_hash
+        with self._profile_lock:
+            for profiled_df, profile in self._profiles.get(key, []):
+                if profiled_df is df:
+                    return profile
+        
+        persisted = self._persists(df)
+        profile = self.profile_store.load_profile(key, df, self._profile_mode(df)) if persisted else None
+        if profile is None:
+            aggregates = None
+            if df is self.current_df and self.aggregates and self.aggregates['rows'] == len(df):
+                aggregates = self.aggregates
+            backend = self.get_query_backend(df)
+            duplicates = self.get_row_index(df).duplicate_count() if backend is None else None
+            missing = self.get_nullity_mask(df).counts() if backend is None and aggregates is None else None
+            profile = self.profile_engine.build(df, backend, aggregates, duplicates, missing)
+            if persisted:
+                self.profile_store.save_profile(key, profile, self._profile_mode(df))
+        
+        if key is not None:
+            self._remember_profile(key, df, profile)
+        return profile
+    
+    def _remember_profile(self, key: str, df: pd.DataFrame, profile: DatasetProfile):
+        with self._profile_lock:
+            entries = self._profiles.setdefault(key, [])
+            if not any(profiled_df is df for profiled_df, _ in entries):
+                entries.append((df, profile))
+                del entries[:-self.max_profiles_per_version]
+    
+    def get_partition_columns(self, df: Optional[pd.DataFrame] = None) -> List[str]:
+        """Colunas categóricas com poucos valores, usadas como filtro de perfis (ver ``get_filtered_profile``)"""
+        df = self.current_df if df is None else df
+        if df is None or self.get_query_backend(df) is not None:
+            # Out-of-core: os valores do arquivo completo não estão em memória para particionar
+            return []
+        profile = self.get_profile(df)
+        summary = profile.categorical_summary()
+        return [col for col in profile.categorical_columns
+                if summary[col].get('unique_error') is None
+                and 1 < summary[col]['unique_values'] <= self.max_partition_values]
+    
+    def get_filtered_profile(self, column: str, values: list,
+                             df: Optional[pd.DataFrame] = None) -> Optional[DatasetProfile]:
+        """Perfil do recorte ``df[column].isin(values)``
+        
+        Nos dados atuais, os agregados de cada valor de ``column`` são calculados uma
+        vez e o perfil de qualquer filtro é obtido combinando partições, sem
+        percorrer as linhas. Outros recortes, colunas com muitos valores e o modo
+        out-of-core (amostra em memória) filtram e perfilam diretamente.
+        
+        Args:
+            column: Coluna categórica do filtro
+            values: Valores mantidos
+            df: DataFrame analisado (padrão: ``current_df``)
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return None
+        key = self.current_hash
+        if (df is not self.current_df or key is None or self.get_query_backend(df) is not None
+                or df[column].nunique() > self.max_partition_values):
+            return self.profile_engine.build(df[df[column].isin(values)])
+        
+        partition_key = (key, column)
+        with self._partition_lock:
+            cached = self._partitions.get(partition_key)
+            if cached is not None and cached[0] is df:
+                self._partitions.move_to_end(partition_key)
+                partitioned = cached[1]
+            else:
+                partitioned = None
+        if partitioned is None:
+            partitioned = PartitionedAggregates.build(df, column, self.aggregate_profiler, self.get_row_index(df))
+            with self._partition_lock:
+                self._partitions[partition_key] = (df, partitioned)
+                self._partitions.move_to_end(partition_key)
+                while len(self._partitions) > self.max_partitioned_columns:
+                    self._partitions.popitem(last=False)
+        return self.profile_engine.build_filtered(partitioned, values)
+    
+    def get_correlation(self, df: Optional[pd.DataFrame] = None, method: str = 'pearson',
+                        columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Matriz de correlação calculada uma vez por versão dos dados e compartilhada
+        
+        No modo out-of-core, Pearson é calculado sobre o arquivo completo via DuckDB;
+        Spearman usa a amostra em memória.
+        
+        Args:
+            df: DataFrame analisado (padrão: ``current_df``)
+            method: 'pearson' ou 'spearman'
+            columns: Subconjunto de colunas numéricas (padrão: todas)
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return None
+        key = self.current_hash
+        backend = self.get_query_backend(df)
+        if self._persists(df) and not self.correlation_engine.has_matrix(key, df, method, backend):
+            matrix = self.profile_store.load_correlation(key, method, self._profile_mode(df))
+            if matrix is not None and all(col in df.columns for col in matrix.columns):
+                self.correlation_engine.put(key, df, method, matrix, backend)
+            else:
+                matrix = self.correlation_engine.get_matrix(key, df, method, None, backend)
+                self.profile_store.save_correlation(key, method, matrix, self._profile_mode(df))
+        return self.correlation_engine.get_matrix(key, df, method, columns, backend)
+    
+    def is_profile_ready(self, df: Optional[pd.DataFrame] = None) -> bool:
+        """Indica se o perfil e a correlação de Pearson de ``df`` já estão prontos (em memória ou gravados)
+        
+        O que estiver gravado é carregado para a memória, de modo que a visão geral
+        seguinte não recalcula nada.
+        """
+        df = self.current_df if df is None else df
+        key = self.current_hash
+        if df is None or key is None:
+            return False
+        with self._profile_lock:
+            profile = next((profile for profiled_df, profile in self._profiles.get(key, []) if profiled_df is df), None)
+        if profile is None and self._persists(df):
+            profile = self.profile_store.load_profile(key, df, self._profile_mode(df))
+            if profile is not None:
+                self._remember_profile(key, df, profile)
+        if profile is None:
+            return False
+        if len(profile.numeric_columns) < 2:
+            return True
+        
+        backend = self.get_query_backend(df)
+        if self.correlation_engine.has_matrix(key, df, 'pearson', backend):
+            return True
+        matrix = self.profile_store.load_correlation(key, 'pearson', self._profile_mode(df)) if self._persists(df) else None
+        if matrix is None or not all(col in df.columns for col in matrix.columns):
+            return False
+        self.correlation_engine.put(key, df, 'pearson', matrix, backend)
+        return True
+    
+    def _persists(self, df: pd.DataFrame) -> bool:
+        """Perfis e correlações são gravados só para os dados atuais completos"""
+        return self.persist_profiles and df is self.current_df and self.current_hash is not None
+    
+    def _profile_mode(self, df: pd.DataFrame) -> str:
+        """Modo do perfil gravado: calculado no DuckDB (out-of-core) ou em memória"""
+        return 'out_of_core' if self.get_query_backend(df) is not None else 'memory'
+    
+    def get_top_correlations(self, df: Optional[pd.DataFrame] = None, k: int = 3, method: str = 'pearson',
+                             columns: Optional[List[str]] = None) -> Dict[str, List[Tuple[str, str, float]]]:
+        """Os ``k`` pares com correlação positiva e negativa mais fortes (ver ``CorrelationEngine.top_pairs``)"""
+        matrix = self.get_correlation(df, method, columns)
+        if matrix is None:
+            return {'positive': [], 'negative': []}
+        return self.correlation_engine.top_pairs(matrix, k)
+    
+    def get_row_index(self, df: Optional[pd.DataFrame] = None) -> Optional[RowHashIndex]:
+        """Índice de hashes por registro, calculado uma vez por versão dos dados
+        
+        Outros recortes (amostras, filtros) têm o índice calculado sem cache.
+        
+        Args:
+            df: DataFrame indexado (padrão: ``current_df``)
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return None
+        key = self.current_hash if df is self.current_df else None
+        if key is None:
+            return RowHashIndex.build(df)
+        
+        with self._row_index_lock:
+            index = self._row_indexes.get(key)
+            if index is not None and len(index) == len(df):
+                self._row_indexes.move_to_end(key)
+                return index
+        index = RowHashIndex.build(df)
+        self._store_row_index(key, index)
+        return index
+    
+    def _store_row_index(self, key: str, index: RowHashIndex):
+        with self._row_index_lock:
+            self._row_indexes[key] = index
+            self._row_indexes.move_to_end(key)
+            while len(self._row_indexes) > self.max_row_indexes:
+                self._row_indexes.popitem(last=False)
+    
+    def _extend_row_index(self, base_key: str, key: str, base_rows: int, df: pd.DataFrame):
+        """Reaproveita o índice da base para ``df`` (base + linhas anexadas), hasheando só as novas"""
+        with self._row_index_lock:
+            base_index = self._row_indexes.get(base_key)
+        if base_index is None or len(base_index) != base_rows:
+            return
+        try:
+            index = base_index.append(df.iloc[base_rows:])
+        except ValueError:
+            # Tipos promovidos (ex.: inteiro → float): o índice será recalculado sob demanda
+            return
+        self._store_row_index(key, index)
+    
+    def get_nullity_mask(self, df: Optional[pd.DataFrame] = None) -> Optional[NullityMask]:
+        """Máscara de ausentes compactada, calculada uma vez por versão dos dados
+        
+        Outros recortes (amostras, filtros) têm a máscara calculada sem cache.
+        
+        Args:
+            df: DataFrame analisado (padrão: ``current_df``)
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return None
+        key = self.current_hash if df is self.current_df else None
+        if key is None:
+            return NullityMask.build(df)
+        
+        with self._nullity_lock:
+            mask = self._nullity_masks.get(key)
+            if mask is not None and mask.n_rows == len(df) and mask.columns == list(df.columns):
+                self._nullity_masks.move_to_end(key)
+                return mask
+        mask = NullityMask.build(df)
+        with self._nullity_lock:
+            self._nullity_masks[key] = mask
+            self._nullity_masks.move_to_end(key)
+            while len(self._nullity_masks) > self.max_nullity_masks:
+                self._nullity_masks.popitem(last=False)
+        return mask
+    
+    def get_missing_patterns(self, df: Optional[pd.DataFrame] = None, limit: Optional[int] = 10) -> pd.DataFrame:
+        """Combinações de colunas ausentes ao mesmo tempo, com frequência (ver ``NullityMask.patterns``)"""
+        mask = self.get_nullity_mask(df)
+        if mask is None:
+            return pd.DataFrame()
+        return mask.patterns(limit)
+    
+    def get_duplicate_groups(self, df: Optional[pd.DataFrame] = None, limit: Optional[int] = 20) -> pd.DataFrame:
+        """Registros repetidos agrupados, com o número do grupo em ``DUPLICATE_GROUP_COLUMN``
+        
+        Args:
+            df: DataFrame analisado (padrão: ``current_df``)
+            limit: Número máximo de grupos listados
+        """
+        df = self.current_df if df is None else df
+        index = self.get_row_index(df)
+        if index is None:
+            return pd.DataFrame()
+        groups = index.duplicate_groups(limit)
+        if not groups:
+            return df.iloc[0:0].assign(**{DUPLICATE_GROUP_COLUMN: pd.Series(dtype='int64')})
+        positions = np.concatenate(groups)
+        group_numbers = np.repeat(np.arange(1, len(groups) + 1), [len(group) for group in groups])
+        duplicates = df.iloc[positions].copy()
+        duplicates.insert(0, DUPLICATE_GROUP_COLUMN, group_numbers)
+        return duplicates
+    
+    def drop_duplicates(self, df: Optional[pd.DataFrame] = None) -> Optional[pd.DataFrame]:
+        """DataFrame sem registros repetidos (mantém a primeira ocorrência), via índice de hashes"""
+        df = self.current_df if df is None else df
+        index = self.get_row_index(df)
+        if index is None:
+            return None
+        if index.duplicate_count() == 0:
+            return df
+        return df.iloc[index.unique_positions()]
+    
+    def get_datetime_columns(self, df: Optional[pd.DataFrame] = None) -> List[str]:
+        """Colunas datetime64 já convertidas no carregamento
+        
+        Colunas cujo nome indica tempo (data, time, dia...) vêm primeiro.
+        """
+        df = self.current_df if df is None else df
+        if df is None:
+            return []
+        datetime_cols = df.select_dtypes(include=['datetime', 'datetimetz']).columns.tolist()
+        hinted = [col for col in datetime_cols if any(keyword in str(col).lower() for keyword in TIME_KEYWORDS)]
+        return hinted + [col for col in datetime_cols if col not in hinted]
+    
+    def get_datetime_format(self, column: str) -> Optional[str]:
+        """Formato de data detectado na amostra da coluna (None se já veio tipada)"""
+        return self.inferred_schema.get(column, {}).get('format')
+    
+    def get_memory_report(self) -> pd.DataFrame:
+        """Retorna os bytes economizados por coluna na otimização de memória"""
+        return self.memory_optimizer.report_frame(self.memory_report)
+    
     def get_data_summary(self) -> Dict[str, Any]:
         """Retorna resumo dos dados atuais"""
         if self.current_df is None:
             return {}
         
-        df = self.current_df
+        # No modo out-of-core o perfil traz totais e estatísticas do arquivo inteiro, não da amostra
+        profile = self.get_profile()
         summary = {
-            "total_records": len(df),
-            "total_columns": len(df.columns),
-            "columns": list(df.columns),
-            "data_types": df.dtypes.to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "numeric_columns": df.select_dtypes(include=['number']).columns.tolist(),
-            "categorical_columns": df.select_dtypes(include=['object']).columns.tolist(),
-            "basic_stats": {}
+            "total_records": profile.n_rows,
+            "total_columns": profile.n_columns,
+            "columns": profile.columns,
+            "data_types": profile.dtypes.to_dict(),
+            "missing_values": profile.missing.to_dict(),
+            "numeric_columns": profile.numeric_columns,
+            "categorical_columns": profile.categorical_columns,
+            "inferred_schema": self.inferred_schema,
+            "basic_stats": profile.numeric_summary().to_dict() if profile.numeric_columns else {}
         }
-        
-        # Estatísticas básicas para colunas numéricas
-        numeric_cols = summary["numeric_columns"]
-        if numeric_cols:
-            summary["basic_stats"] = df[numeric_cols].describe().to_dict()
+        if profile.out_of_core:
+            summary["out_of_core"] = True
         
         return summary
     
@@ -216,9 +1537,13 @@ class DataManager:
     def clear_cache(self):
         """Limpa todo o cache"""
         self.analysis_cache.clear()
+        self.frame_cache.clear()
+        self.sampling.clear()
+        self._peek_cache.clear()
+        self._free_text_cache.clear()
         try:
             for file in os.listdir(self.cache_dir):
-                if file.endswith("_analysis.json"):
+                if file.endswith("_analysis.json") or file.endswith(".arrow") or "_profile_v" in file:
                     os.remove(os.path.join(self.cache_dir, file))
         except:
             pass
@@ -231,8 +1556,13 @@ class DataManager:
         df = self.current_df
         issues = []
         
+        profile = self.get_profile()
+        n_rows = profile.n_rows
+        duplicates = profile.duplicates
+        total_missing = profile.total_missing
+        
         # Verificar se DataFrame não está vazio
-        if len(df) == 0:
+        if n_rows == 0:
             issues.append("DataFrame está vazio")
         
         # Verificar se há colunas
@@ -240,20 +1570,28 @@ class DataManager:
             issues.append("Nenhuma coluna encontrada")
         
         # Verificar valores duplicados
-        duplicates = df.duplicated().sum()
         if duplicates > 0:
             issues.append(f"{duplicates} registros duplicados encontrados")
         
         # Verificar valores ausentes
-        missing_percent = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+        missing_percent = (total_missing / (n_rows * len(df.columns))) * 100 if n_rows and len(df.columns) else 0.0
         if missing_percent > 50:
             issues.append(f"{missing_percent:.1f}% dos valores estão ausentes")
         
+        # Colunas vazias e registros incompletos (máscara de ausentes; no modo out-of-core, a amostra)
+        mask = self.get_nullity_mask()
+        empty_columns = [col for col, count in mask.counts().items() if mask.n_rows and count == mask.n_rows]
+        if empty_columns:
+            issues.append(f"{len(empty_columns)} colunas totalmente vazias: {', '.join(map(str, empty_columns[:5]))}")
+        incomplete_percent = mask.rows_with_missing() / mask.n_rows * 100 if mask.n_rows else 0.0
+        
         return {
             "valid": len(issues) == 0,
             "issues": issues,
             "duplicates": duplicates,
             "missing_percent": missing_percent,
+            "empty_columns": empty_columns,
+            "incomplete_rows_percent": incomplete_percent,
             "data_quality": "Boa" if len(issues) == 0 else "Atenção necessária"
         }
 
@@ -0,0 +1,465 @@
+# Perfil do dataset: estatísticas calculadas uma única vez por versão dos dados e compartilhadas
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+from sketches import HyperLogLog
+from profile_aggregates import AggregateProfiler
+from partitioned_profile import PartitionedAggregates
+
+# Versão do cálculo do perfil; incrementar quando as estatísticas mudarem (invalida perfis gravados)
+PROFILE_ENGINE_VERSION = 4
+
+# Linhas de ``DataFrame.describe()`` para colunas numéricas
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+# Tipos tratados como categóricos; 'string' inclui ``string[python]`` e ``string[pyarrow]`` (dtypes Arrow)
+CATEGORICAL_DTYPES = ['object', 'category', 'string']
+
+# Faixas dos histogramas e quantidade de valores mais frequentes guardados no perfil
+HISTOGRAM_BINS = 30
+TOP_VALUES_LIMIT = 10
+
+# Colunas dos histogramas guardados (mesmo formato de ``DuckDBBackend.histogram``)
+HISTOGRAM_COLUMNS = ['inicio', 'fim', 'contagem']
+
+
+class DatasetProfile:
+    """Perfil imutável de uma versão dos dados (contagens, ausentes, duplicatas, describe e categorias)
+
+    Guarda também os histogramas das colunas numéricas e os valores mais
+    frequentes das categóricas, para que os gráficos não varram os dados de novo.
+    Os acessores devolvem cópias, de modo que nenhum consumidor altera o perfil compartilhado.
+    """
+
+    def __init__(self, n_rows: int, dtypes: pd.Series, numeric_columns: Tuple[str, ...],
+                 categorical_columns: Tuple[str, ...], missing: pd.Series, duplicates: int,
+                 numeric_summary: pd.DataFrame, categorical_summary: Dict[str, Dict[str, Any]],
+                 out_of_core: bool = False, quantile_errors: Optional[Dict[str, float]] = None,
+                 histograms: Optional[Dict[str, pd.DataFrame]] = None,
+                 top_values: Optional[Dict[str, pd.Series]] = None):
+        object.__setattr__(self, '_values', {
+            'n_rows': int(n_rows),
+            'dtypes': dtypes,
+            'numeric_columns': tuple(numeric_columns),
+            'categorical_columns': tuple(categorical_columns),
+            'missing': missing,
+            'duplicates': int(duplicates),
+            'numeric_summary': numeric_summary,
+            'categorical_summary': categorical_summary,
+            'out_of_core': bool(out_of_core),
+            'quantile_errors': dict(quantile_errors or {}),
+            'histograms': dict(histograms or {}),
+            'top_values': dict(top_values or {})
+        })
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DatasetProfile é imutável")
+
+    @property
+    def n_rows(self) -> int:
+        return self._values['n_rows']
+
+    @property
+    def n_columns(self) -> int:
+        return len(self._values['dtypes'])
+
+    @property
+    def columns(self) -> list:
+        return self._values['dtypes'].index.tolist()
+
+    @property
+    def dtypes(self) -> pd.Series:
+        return self._values['dtypes'].copy()
+
+    @property
+    def numeric_columns(self) -> list:
+        return list(self._values['numeric_columns'])
+
+    @property
+    def categorical_columns(self) -> list:
+        return list(self._values['categorical_columns'])
+
+    @property
+    def missing(self) -> pd.Series:
+        """Valores ausentes por coluna"""
+        return self._values['missing'].copy()
+
+    @property
+    def total_missing(self) -> int:
+        return int(self._values['missing'].sum())
+
+    @property
+    def duplicates(self) -> int:
+        return self._values['duplicates']
+
+    @property
+    def out_of_core(self) -> bool:
+        return self._values['out_of_core']
+
+    def numeric_summary(self, columns: Optional[list] = None) -> pd.DataFrame:
+        """Estatísticas no formato de ``DataFrame.describe()`` (todas as numéricas ou ``columns``)"""
+        summary = self._values['numeric_summary']
+        if columns is not None:
+            summary = summary[[col for col in columns if col in summary.columns]]
+        return summary.copy()
+
+    def quantile_error(self, column: str) -> Optional[float]:
+        """Erro de rank normalizado dos quartis da coluna (0 se exatos, None se desconhecido)"""
+        if self.out_of_core:
+            return None
+        return self._values['quantile_errors'].get(column, 0.0)
+
+    def max_quantile_error(self, columns: Optional[list] = None) -> float:
+        """Maior erro de rank conhecido entre as colunas numéricas"""
+        errors = self._values['quantile_errors']
+        columns = self.numeric_columns if columns is None else columns
+        return max([errors.get(col, 0.0) for col in columns], default=0.0)
+
+    def categorical_summary(self, columns: Optional[list] = None) -> Dict[str, Dict[str, Any]]:
+        """Valores únicos, valor mais comum e ausentes por coluna categórica"""
+        summary = self._values['categorical_summary']
+        selected = summary if columns is None else [col for col in columns if col in summary]
+        return {col: dict(summary[col]) for col in selected}
+
+    def histogram(self, column: str) -> Optional[pd.DataFrame]:
+        """Histograma da coluna numérica (colunas: inicio, fim, contagem); None se não guardado"""
+        histogram = self._values['histograms'].get(column)
+        return histogram.copy() if histogram is not None else None
+
+    def top_values(self, column: str) -> Optional[pd.Series]:
+        """Valores mais frequentes da coluna categórica (valor -> contagem); None se não guardados"""
+        counts = self._values['top_values'].get(column)
+        return counts.copy() if counts is not None else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável em JSON (tipos como texto; valores mais comuns convertidos para escalares)"""
+        values = self._values
+        summary = values['numeric_summary']
+        return {
+            'n_rows': values['n_rows'],
+            'columns': [str(col) for col in values['dtypes'].index],
+            'dtypes': [str(dtype) for dtype in values['dtypes']],
+            'numeric_columns': list(values['numeric_columns']),
+            'categorical_columns': list(values['categorical_columns']),
+            'missing': {str(col): int(count) for col, count in values['missing'].items()},
+            'duplicates': values['duplicates'],
+            'numeric_summary': {
+                'index': [str(row) for row in summary.index],
+                'columns': [str(col) for col in summary.columns],
+                'data': summary.to_numpy(dtype=np.float64).tolist()
+            },
+            'categorical_summary': {
+                str(col): {**stats, 'most_common': _to_json_scalar(stats['most_common'])}
+                for col, stats in values['categorical_summary'].items()
+            },
+            'out_of_core': values['out_of_core'],
+            'quantile_errors': {str(col): float(error) for col, error in values['quantile_errors'].items()},
+            'histograms': {
+                str(col): {
+                    'edges': np.append(hist['inicio'].to_numpy(dtype=np.float64),
+                                       hist['fim'].to_numpy(dtype=np.float64)[-1:]).tolist(),
+                    'counts': [int(count) for count in hist['contagem']]
+                }
+                for col, hist in values['histograms'].items()
+            },
+            'top_values': {
+                str(col): {
+                    'values': [_to_json_scalar(value) for value in counts.index],
+                    'counts': [int(count) for count in counts]
+                }
+                for col, counts in values['top_values'].items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], dtypes: Optional[pd.Series] = None) -> 'DatasetProfile':
+        """
+        Reconstrói um perfil gravado com ``to_dict``
+
+        Args:
+            data: Perfil serializado
+            dtypes: Tipos do DataFrame correspondente (preserva categorias e fusos);
+                padrão: tipos reconstruídos a partir do texto
+        """
+        if dtypes is None:
+            dtypes = pd.Series([_parse_dtype(dtype) for dtype in data['dtypes']], index=data['columns'], dtype=object)
+        summary = data['numeric_summary']
+        return cls(
+            n_rows=data['n_rows'],
+            dtypes=dtypes,
+            numeric_columns=tuple(data['numeric_columns']),
+            categorical_columns=tuple(data['categorical_columns']),
+            missing=pd.Series(data['missing'], dtype='int64').reindex(data['columns'], fill_value=0),
+            duplicates=data['duplicates'],
+            numeric_summary=pd.DataFrame(summary['data'], index=summary['index'], columns=summary['columns'],
+                                         dtype='float64') if summary['columns'] else pd.DataFrame(),
+            categorical_summary={col: dict(stats) for col, stats in data['categorical_summary'].items()},
+            out_of_core=data['out_of_core'],
+            quantile_errors=data['quantile_errors'],
+            histograms={col: _histogram_frame(np.asarray(hist['edges'], dtype=np.float64),
+                                              np.asarray(hist['counts'], dtype=np.int64))
+                        for col, hist in data['histograms'].items()},
+            top_values={col: pd.Series(counts['counts'], index=counts['values'], name=col, dtype='int64')
+                        for col, counts in data['top_values'].items()}
+        )
+
+
+def _histogram_frame(edges: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({'inicio': edges[:-1], 'fim': edges[1:], 'contagem': counts}, columns=HISTOGRAM_COLUMNS)
+
+
+def _histogram(series: pd.Series, bins: int = HISTOGRAM_BINS) -> pd.DataFrame:
+    """Histograma de faixas de largura igual entre o mínimo e o máximo (como ``DuckDBBackend.histogram``)"""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return pd.DataFrame(columns=HISTOGRAM_COLUMNS)
+    low, high = float(values.min()), float(values.max())
+    width = (high - low) / bins if high > low else 1.0
+    edges = low + width * np.arange(bins + 1)
+    if high > low:
+        # Arredondamento não pode deixar o máximo fora da última faixa
+        edges[-1] = high
+    counts, _ = np.histogram(values, bins=edges)
+    return _histogram_frame(edges, counts.astype(np.int64))
+
+
+def _to_json_scalar(value):
+    """Converte escalares NumPy/pandas para tipos nativos (datas viram texto ISO)"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_dtype(name: str):
+    try:
+        return pd.api.types.pandas_dtype(name)
+    except TypeError:
+        return np.dtype(object)
+
+
+class ProfileEngine:
+    """Calcula o perfil completo do dataset em uma passada (em memória ou via DuckDB)
+
+    Colunas de texto com ao menos ``distinct_sketch_min_rows`` valores têm os
+    distintos estimados por HyperLogLog (com erro relativo informado em
+    ``unique_error``) e o valor mais comum obtido de uma amostra. Acima de
+    ``quantile_sketch_min_rows`` registros, os quartis vêm dos sketches KLL dos
+    agregados do carregamento em vez de ``describe()``. Com ``parallel``, o
+    ``describe()`` exato de blocos numéricos largos é dividido entre processos.
+    """
+
+    def __init__(self, aggregate_profiler: Optional[AggregateProfiler] = None,
+                 distinct_sketch_min_rows: int = 1_000_000, quantile_sketch_min_rows: int = 1_000_000,
+                 mode_sample_rows: int = 100_000, parallel=None):
+        self.aggregate_profiler = aggregate_profiler or AggregateProfiler()
+        self.parallel = parallel
+        self.distinct_sketch_min_rows = distinct_sketch_min_rows
+        self.quantile_sketch_min_rows = quantile_sketch_min_rows
+        self.mode_sample_rows = mode_sample_rows
+
+    def build(self, df: pd.DataFrame, backend=None,
+              aggregates: Optional[Dict[str, Any]] = None,
+              duplicates: Optional[int] = None,
+              missing: Optional[pd.Series] = None) -> DatasetProfile:
+        """
+        Calcula o perfil de um DataFrame
+
+        Args:
+            df: DataFrame carregado (no modo out-of-core, a amostra em memória)
+            backend: Backend DuckDB; se informado, os valores vêm do arquivo completo
+            aggregates: Agregados aditivos de ``df`` (ausentes e sketches já calculados)
+            duplicates: Registros duplicados já conhecidos (ex.: índice de hashes)
+            missing: Ausentes por coluna já conhecidos (ex.: máscara de ausentes)
+        """
+        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+
+        if backend is not None:
+            return self._build_from_backend(df, backend, numeric_cols, categorical_cols)
+
+        if aggregates is not None:
+            null_counts = self.aggregate_profiler.null_counts(aggregates).reindex(df.columns, fill_value=0)
+            sketches = self.aggregate_profiler.distinct_sketches(aggregates)
+            quantile_sketches = self.aggregate_profiler.quantile_sketches(aggregates)
+        else:
+            null_counts = missing if missing is not None else df.isna().sum()
+            sketches, quantile_sketches = {}, {}
+        if duplicates is None:
+            duplicates = int(df.duplicated().sum())
+        numeric_summary, quantile_errors = self._numeric_summary(df, numeric_cols, quantile_sketches)
+        categorical_summary, top_values = {}, {}
+        for col in categorical_cols:
+            categorical_summary[col], top_values[col] = self._categorical_column(
+                df[col], int(null_counts.get(col, 0)), sketches.get(str(col)))
+        return DatasetProfile(
+            n_rows=len(df),
+            dtypes=df.dtypes,
+            numeric_columns=numeric_cols,
+            categorical_columns=categorical_cols,
+            missing=null_counts.astype('int64'),
+            duplicates=duplicates,
+            numeric_summary=numeric_summary,
+            categorical_summary=categorical_summary,
+            quantile_errors=quantile_errors,
+            histograms={col: _histogram(df[col]) for col in numeric_cols},
+            top_values=top_values
+        )
+
+    def build_filtered(self, partitioned: PartitionedAggregates, values: list) -> DatasetProfile:
+        """
+        Perfil do recorte ``partitioned.column in values`` montado só com agregados
+
+        Contagens, ausentes e duplicatas são exatos; média e desvio padrão vêm dos
+        momentos combinados por partição (iguais ao ``describe()`` até o
+        arredondamento de ponto flutuante). Os quartis vêm dos sketches KLL e, em
+        colunas de texto sem frequências guardadas, os únicos são estimados por
+        HyperLogLog (sem valor mais comum). Os agregados não guardam histogramas,
+        então o perfil do recorte não os tem.
+        """
+        combined = partitioned.combine(values, self.aggregate_profiler)
+        aggregates = combined['aggregates']
+        dtypes = partitioned.dtypes
+        frame = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+        numeric_cols = frame.select_dtypes(include=['number']).columns.tolist()
+        categorical_cols = frame.select_dtypes(include=CATEGORICAL_DTYPES).columns.tolist()
+        null_counts = self.aggregate_profiler.null_counts(aggregates)
+        null_counts = pd.Series([int(null_counts.get(str(col), 0)) for col in dtypes.index],
+                                index=dtypes.index, dtype='int64')
+
+        summary = self.aggregate_profiler.describe(aggregates, [str(col) for col in numeric_cols])
+        quantile_sketches = self.aggregate_profiler.quantile_sketches(aggregates)
+        quantile_errors = {}
+        numeric_summary = pd.DataFrame(index=DESCRIBE_INDEX, columns=numeric_cols, dtype='float64')
+        for col in numeric_cols:
+            if str(col) not in summary.columns:
+                continue
+            numeric_summary[col] = summary[str(col)].reindex(DESCRIBE_INDEX)
+            sketch = quantile_sketches.get(str(col))
+            if sketch is not None:
+                numeric_summary.loc[['25%', '50%', '75%'], col] = sketch.quantiles([0.25, 0.5, 0.75])
+                quantile_errors[col] = sketch.rank_error
+
+        sketches = self.aggregate_profiler.distinct_sketches(aggregates)
+        categorical_summary, top_values = {}, {}
+        for col in categorical_cols:
+            counts = combined['value_counts'].get(col)
+            if counts is not None:
+                counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+                top_values[col] = counts.head(TOP_VALUES_LIMIT).astype('int64').rename(col).rename_axis(None)
+                categorical_summary[col] = {
+                    'unique_values': int(len(counts)),
+                    'unique_error': None,
+                    'most_common': counts.index[0] if len(counts) > 0 else None,
+                    'missing_values': int(null_counts[col])
+                }
+            else:
+                sketch = sketches.get(str(col))
+                categorical_summary[col] = {
+                    'unique_values': sketch.estimate() if sketch is not None else 0,
+                    'unique_error': sketch.relative_error if sketch is not None else None,
+                    'most_common': None,
+                    'missing_values': int(null_counts[col])
+                }
+        return DatasetProfile(
+            n_rows=aggregates['rows'],
+            dtypes=dtypes,
+            numeric_columns=numeric_cols,
+            categorical_columns=categorical_cols,
+            missing=null_counts,
+            duplicates=combined['duplicates'],
+            numeric_summary=numeric_summary,
+            categorical_summary=categorical_summary,
+            quantile_errors=quantile_errors,
+            top_values=top_values
+        )
+
+    def _numeric_summary(self, df: pd.DataFrame, numeric_cols: list,
+                         quantile_sketches: Dict[str, Any]) -> Tuple[pd.DataFrame, Dict[str, float]]:
+        """Formato ``describe()``; com sketches para todas as colunas, os quartis vêm deles"""
+        if not numeric_cols:
+            return pd.DataFrame(), {}
+        if len(df) < self.quantile_sketch_min_rows or not all(str(col) in quantile_sketches for col in numeric_cols):
+            if self.parallel is not None and self.parallel.should_use(len(df), len(numeric_cols)):
+                summary = self.parallel.describe(df[numeric_cols])
+                if summary is not None:
+                    return summary, {}
+            return df[numeric_cols].describe(), {}
+        
+        summary = df[numeric_cols].agg(['count', 'mean', 'std', 'min', 'max'])
+        quartiles = {col: quantile_sketches[str(col)].quantiles([0.25, 0.5, 0.75]) for col in numeric_cols}
+        for row, position in (('25%', 0), ('50%', 1), ('75%', 2)):
+            summary.loc[row] = [quartiles[col][position] for col in numeric_cols]
+        errors = {col: quantile_sketches[str(col)].rank_error for col in numeric_cols}
+        return summary.loc[DESCRIBE_INDEX].astype('float64'), errors
+
+    def _build_from_backend(self, df: pd.DataFrame, backend, numeric_cols: list,
+                            categorical_cols: list) -> DatasetProfile:
+        """Perfil do arquivo completo consultado no DuckDB; colunas fora do arquivo usam a amostra"""
+        backend_numeric = set(backend.numeric_columns())
+        backend_cols = set(backend.column_types().index)
+        numeric_cols = [col for col in numeric_cols if col in backend_numeric]
+        categorical_summary = backend.categorical_summary([col for col in categorical_cols if col in backend_cols])
+        top_values = {}
+        for col in categorical_cols:
+            if col in categorical_summary:
+                top_values[col] = backend.value_counts(col, limit=TOP_VALUES_LIMIT).astype('int64')
+            else:
+                categorical_summary[col], top_values[col] = self._categorical_column(df[col], int(df[col].isna().sum()))
+        numeric_summary = backend.numeric_summary(numeric_cols) if numeric_cols else pd.DataFrame()
+        # Mínimo e máximo já vêm do resumo: cada histograma custa uma única varredura
+        histograms = {
+            col: backend.histogram(col, bins=HISTOGRAM_BINS,
+                                   bounds=(numeric_summary.at['min', col], numeric_summary.at['max', col]))
+            for col in numeric_cols
+        }
+        return DatasetProfile(
+            n_rows=backend.row_count(),
+            dtypes=df.dtypes,
+            numeric_columns=numeric_cols,
+            categorical_columns=categorical_cols,
+            missing=backend.null_counts(),
+            duplicates=backend.duplicate_count(),
+            numeric_summary=numeric_summary,
+            categorical_summary=categorical_summary,
+            out_of_core=True,
+            histograms=histograms,
+            top_values=top_values
+        )
+
+    def _categorical_column(self, series: pd.Series, missing: int,
+                            sketch: Optional[HyperLogLog] = None) -> Tuple[Dict[str, Any], pd.Series]:
+        """Únicos, valor mais comum e valores mais frequentes a partir de uma única contagem de frequências
+        
+        Em colunas de texto grandes (fora ``category``) a contagem exata é trocada
+        pelo sketch, evitando a tabela hash com milhões de valores; as frequências
+        dos valores mais comuns são então as da amostra, escaladas para a coluna.
+        """
+        if (not isinstance(series.dtype, pd.CategoricalDtype)
+                and len(series) - missing >= self.distinct_sketch_min_rows):
+            if sketch is None:
+                sketch = HyperLogLog().add_series(series)
+            sample = series.dropna().sample(n=min(self.mode_sample_rows, len(series) - missing), random_state=42)
+            sample_counts = sample.value_counts()
+            scale = (len(series) - missing) / max(len(sample), 1)
+            top_values = (sample_counts.head(TOP_VALUES_LIMIT) * scale).round().astype('int64')
+            return {
+                'unique_values': sketch.estimate(),
+                'unique_error': sketch.relative_error,
+                'most_common': sample_counts.index[0] if len(sample_counts) > 0 else None,
+                'missing_values': missing
+            }, top_values.rename(series.name).rename_axis(None)
+        
+        counts = series.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        return {
+            'unique_values': int(len(counts)),
+            'unique_error': None,
+            'most_common': counts.index[0] if len(counts) > 0 else None,
+            'missing_values': missing
+        }, counts.head(TOP_VALUES_LIMIT).astype('int64').rename(series.name).rename_axis(None)
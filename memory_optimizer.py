@@ -0,0 +1,105 @@
+# Otimizador de Memória: reduz os tipos das colunas sem perder valores
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Tuple
+
+# Erro relativo aceito ao converter float64 em float32 (0 exige round-trip exato)
+DEFAULT_FLOAT32_RTOL = 1e-6
+
+
+class MemoryOptimizer:
+    """Reduz inteiros e floats para o menor tipo sem perda e converte texto repetitivo em category
+
+    Floats viram float32 quando todos os valores voltam a float64 com erro
+    relativo até ``float32_rtol``; valores fora da faixa do float32 (estouro
+    ou subnormais que viram zero) mantêm a coluna em float64.
+    """
+
+    def __init__(self, category_max_ratio: float = 0.5, float32_rtol: float = DEFAULT_FLOAT32_RTOL):
+        self.category_max_ratio = category_max_ratio
+        self.float32_rtol = float32_rtol
+
+    def optimize(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+        """
+        Otimiza os tipos de todas as colunas
+
+        Args:
+            df: DataFrame já limpo e com os tipos inferidos
+
+        Returns:
+            DataFrame otimizado e relatório coluna -> dtype e bytes antes/depois
+        """
+        report = {}
+        for col in df.columns:
+            before = df[col]
+            after = self._optimize_column(before)
+            bytes_before = int(before.memory_usage(deep=True, index=False))
+            bytes_after = int(after.memory_usage(deep=True, index=False)) if after is not before else bytes_before
+            if after is not before:
+                df[col] = after
+            report[col] = {
+                'dtype_before': str(before.dtype),
+                'dtype_after': str(after.dtype),
+                'bytes_before': bytes_before,
+                'bytes_after': bytes_after
+            }
+        return df, report
+
+    def downcast_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reduz apenas as colunas numéricas (usado bloco a bloco na leitura em blocos)"""
+        for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+                converted = self._downcast_series(df[col])
+                if converted is not df[col]:
+                    df[col] = converted
+        return df
+
+    def report_frame(self, report: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+        """Gera relatório tabular com os bytes economizados por coluna"""
+        rows = []
+        for col, info in report.items():
+            saved = info['bytes_before'] - info['bytes_after']
+            rows.append({
+                'coluna': col,
+                'dtype_antes': info['dtype_before'],
+                'dtype_depois': info['dtype_after'],
+                'bytes_antes': info['bytes_before'],
+                'bytes_depois': info['bytes_after'],
+                'economia_bytes': saved,
+                'economia_pct': round(saved / info['bytes_before'] * 100, 1) if info['bytes_before'] else 0.0
+            })
+        return pd.DataFrame(rows)
+
+    def _optimize_column(self, series: pd.Series) -> pd.Series:
+        """Retorna a coluna com o menor tipo adequado (ou a própria coluna se nada mudar)"""
+        if pd.api.types.is_bool_dtype(series):
+            return series
+        if pd.api.types.is_numeric_dtype(series):
+            return self._downcast_series(series)
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            return self._to_category(series)
+        return series
+
+    def _downcast_series(self, series: pd.Series) -> pd.Series:
+        """Menor inteiro que comporta os valores; float32 se o round-trip respeitar ``float32_rtol``"""
+        if pd.api.types.is_integer_dtype(series):
+            converted = pd.to_numeric(series, downcast='integer')
+            return converted if converted.dtype != series.dtype else series
+
+        if pd.api.types.is_float_dtype(series) and series.dtype == np.float64:
+            values = series.to_numpy()
+            with np.errstate(over='ignore'):
+                as_float32 = values.astype(np.float32)
+            if np.allclose(as_float32.astype(np.float64), values, rtol=self.float32_rtol, atol=0.0, equal_nan=True):
+                return pd.Series(as_float32, index=series.index, name=series.name)
+
+        return series
+
+    def _to_category(self, series: pd.Series) -> pd.Series:
+        """Converte texto com muitas repetições em category"""
+        n_values = series.notna().sum()
+        if n_values == 0:
+            return series
+        if series.nunique(dropna=True) / n_values > self.category_max_ratio:
+            return series
+        return series.astype('category')
@@ -0,0 +1,105 @@
+# Máscara de ausentes compactada em bits: totais, ausentes por registro e padrões de ausência
+import pandas as pd
+import numpy as np
+from typing import List, Optional
+
+
+class NullityMask:
+    """Um bit por célula (``np.packbits``), calculado uma vez por versão dos dados
+
+    Cada coluna é convertida separadamente, sem alocar a máscara booleana do
+    DataFrame inteiro; a máscara ocupa 1/8 do ``df.isna()`` equivalente.
+    """
+
+    def __init__(self, columns: List[str], n_rows: int, bits: np.ndarray, counts: np.ndarray):
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self.bits = bits
+        self.bits.flags.writeable = False
+        self._counts = counts
+        self._row_counts: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'NullityMask':
+        n_rows = len(df)
+        bits = np.zeros((len(df.columns), (n_rows + 7) // 8), dtype=np.uint8)
+        counts = np.zeros(len(df.columns), dtype=np.int64)
+        for position in range(len(df.columns)):
+            missing = df.iloc[:, position].isna().to_numpy()
+            counts[position] = np.count_nonzero(missing)
+            if counts[position]:
+                bits[position] = np.packbits(missing, bitorder='little')
+        return cls(df.columns, n_rows, bits, counts)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    @property
+    def total(self) -> int:
+        """Total de células ausentes"""
+        return int(self._counts.sum())
+
+    def counts(self) -> pd.Series:
+        """Valores ausentes por coluna (equivalente a ``df.isna().sum()``)"""
+        return pd.Series(self._counts, index=self.columns, dtype='int64')
+
+    def column(self, col: str) -> np.ndarray:
+        """Máscara booleana de uma coluna"""
+        position = self.columns.index(col)
+        return np.unpackbits(self.bits[position], count=self.n_rows, bitorder='little').astype(bool)
+
+    def row_counts(self) -> np.ndarray:
+        """Número de colunas ausentes em cada registro"""
+        if self._row_counts is None:
+            row_counts = np.zeros(self.n_rows, dtype=np.int32)
+            for position in np.flatnonzero(self._counts):
+                row_counts += np.unpackbits(self.bits[position], count=self.n_rows, bitorder='little')
+            row_counts.flags.writeable = False
+            self._row_counts = row_counts
+        return self._row_counts
+
+    def rows_with_missing(self) -> int:
+        """Registros com ao menos um valor ausente"""
+        return int(np.count_nonzero(self.row_counts()))
+
+    def patterns(self, limit: Optional[int] = 10) -> pd.DataFrame:
+        """
+        Combinações de colunas ausentes ao mesmo tempo e sua frequência
+
+        Registros sem ausentes não formam padrão. Cada registro recebe um código
+        com um bit por coluna que tem ausentes (palavras de 64 bits), e os
+        códigos são contados como uma única coluna.
+
+        Returns:
+            DataFrame com 'colunas_ausentes', 'n_colunas', 'registros' e 'percentual', do mais frequente
+        """
+        result_columns = ['colunas_ausentes', 'n_colunas', 'registros', 'percentual']
+        with_missing = np.flatnonzero(self._counts)
+        if with_missing.size == 0 or self.n_rows == 0:
+            return pd.DataFrame(columns=result_columns)
+
+        n_words = (with_missing.size + 63) // 64
+        codes = np.zeros((self.n_rows, n_words), dtype=np.uint64)
+        for offset, position in enumerate(with_missing):
+            column_bits = np.unpackbits(self.bits[position], count=self.n_rows, bitorder='little')
+            codes[:, offset // 64] |= column_bits.astype(np.uint64) << np.uint64(offset % 64)
+
+        if n_words == 1:
+            patterns, frequencies = np.unique(codes[:, 0], return_counts=True)
+            patterns = patterns[:, None]
+        else:
+            patterns, frequencies = np.unique(codes, axis=0, return_counts=True)
+        present = patterns.any(axis=1)
+        patterns, frequencies = patterns[present], frequencies[present]
+        order = np.argsort(-frequencies, kind='stable')[:limit]
+
+        rows = []
+        for index in order:
+            names = [
+                self.columns[position] for offset, position in enumerate(with_missing)
+                if (int(patterns[index, offset // 64]) >> (offset % 64)) & 1
+            ]
+            rows.append([", ".join(str(name) for name in names), len(names), int(frequencies[index]),
+                         frequencies[index] / self.n_rows * 100])
+        return pd.DataFrame(rows, columns=result_columns)
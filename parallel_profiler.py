@@ -0,0 +1,140 @@
+# Perfilamento paralelo por coluna: o bloco numérico vai para memória compartilhada e as colunas
+# são divididas entre processos, sem copiar os dados para cada worker
+import os
+import threading
+import multiprocessing
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+from profile_aggregates import numeric_aggregates
+
+# Linhas de ``DataFrame.describe()`` calculadas pelos workers
+DESCRIBE_ROWS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+def _attach_block(shm_name: str, shape: Tuple[int, int]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Abre no worker o bloco (colunas x linhas) criado pelo processo principal"""
+    try:
+        # O processo principal é o dono do bloco: o worker não deve registrá-lo para remoção
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    except TypeError:
+        # Python < 3.13 não tem ``track``
+        shm = shared_memory.SharedMemory(name=shm_name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _describe_columns(shm_name: str, shape: Tuple[int, int], start: int, stop: int) -> np.ndarray:
+    """Estatísticas no formato ``describe()`` das colunas ``start:stop`` do bloco"""
+    shm, block = _attach_block(shm_name, shape)
+    try:
+        result = np.full((len(DESCRIBE_ROWS), stop - start), np.nan)
+        for offset, values in enumerate(block[start:stop]):
+            valid = values[~np.isnan(values)]
+            result[0, offset] = valid.size
+            if valid.size == 0:
+                continue
+            result[1, offset] = valid.mean()
+            result[2, offset] = valid.std(ddof=1) if valid.size > 1 else np.nan
+            result[3, offset] = valid.min()
+            result[4:7, offset] = np.percentile(valid, [25, 50, 75])
+            result[7, offset] = valid.max()
+        return result
+    finally:
+        del block
+        shm.close()
+
+
+def _aggregate_columns(shm_name: str, shape: Tuple[int, int], start: int, stop: int,
+                       quantile_k: int) -> List[Dict[str, Any]]:
+    """Agregados combináveis (contagem, momentos, extremos e sketch KLL) das colunas ``start:stop``"""
+    shm, block = _attach_block(shm_name, shape)
+    try:
+        return [numeric_aggregates(values[~np.isnan(values)], quantile_k) for values in block[start:stop]]
+    finally:
+        del block
+        shm.close()
+
+
+class ParallelColumnProfiler:
+    """Divide as colunas numéricas entre um pool de processos (criado sob demanda)
+
+    Só é usado em DataFrames largos e grandes (``min_columns`` e ``min_cells``);
+    abaixo disso o custo de iniciar os processos e copiar o bloco não compensa.
+    Se o pool não puder ser usado (ambiente sem ``/dev/shm``, worker encerrado),
+    retorna None e o chamador segue pelo caminho serial.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, min_columns: int = 64, min_cells: int = 10_000_000):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.min_columns = min_columns
+        self.min_cells = min_cells
+        self.enabled = True
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def should_use(self, n_rows: int, n_columns: int) -> bool:
+        """Indica se vale a pena paralelizar um bloco com estas dimensões"""
+        return (self.enabled and self.max_workers > 1 and n_columns >= self.min_columns
+                and n_rows * n_columns >= self.min_cells)
+
+    def describe(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Equivalente a ``df.describe()`` para colunas numéricas, calculado em paralelo"""
+        blocks = self._run(df, _describe_columns)
+        if blocks is None:
+            return None
+        return pd.DataFrame(np.hstack(blocks), index=DESCRIBE_ROWS, columns=df.columns)
+
+    def aggregates(self, df: pd.DataFrame, quantile_k: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Agregados numéricos por coluna (ver ``AggregateProfiler``), calculados em paralelo"""
+        blocks = self._run(df, _aggregate_columns, quantile_k)
+        if blocks is None:
+            return None
+        results = [column for block in blocks for column in block]
+        return {str(col): column for col, column in zip(df.columns, results)}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, df: pd.DataFrame, func, *args) -> Optional[list]:
+        """Copia o bloco para a memória compartilhada e distribui faixas de colunas entre os workers"""
+        n_rows, n_columns = len(df), len(df.columns)
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, n_rows * n_columns * 8))
+        except OSError:
+            return None
+        try:
+            # Uma coluna por linha do bloco: cada worker lê faixas contíguas de memória
+            block = np.ndarray((n_columns, n_rows), dtype=np.float64, buffer=shm.buf)
+            for position, col in enumerate(df.columns):
+                block[position] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            del block
+
+            step = -(-n_columns // (self.max_workers * 4))
+            ranges = [(start, min(start + step, n_columns)) for start in range(0, n_columns, step)]
+            executor = self._get_executor()
+            futures = [executor.submit(func, shm.name, (n_columns, n_rows), start, stop, *args)
+                       for start, stop in ranges]
+            return [future.result() for future in futures]
+        except (BrokenProcessPool, OSError):
+            # Pool indisponível neste ambiente: desativar e deixar o chamador usar o caminho serial
+            self.enabled = False
+            self.shutdown()
+            return None
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # spawn: o processo do Streamlit tem threads, e fork com threads ativas pode travar
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
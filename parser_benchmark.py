@@ -0,0 +1,124 @@
+"""
+Benchmark dos parsers CSV disponíveis no host
+Mede a vazão do parser C do pandas e do leitor multi-thread do PyArrow em um CSV
+sintético e escolhe o mais rápido como padrão para o DataManager.
+"""
+
+import io
+import os
+import json
+import time
+import platform
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pyarrow = None
+    PYARROW_AVAILABLE = False
+
+BENCHMARK_FILE = "parser_benchmark.json"
+
+
+def _host_signature() -> str:
+    """Identifica o host e as versões das bibliotecas que influenciam o resultado"""
+    return "|".join([
+        platform.node(),
+        platform.machine(),
+        str(os.cpu_count()),
+        pd.__version__,
+        pyarrow.__version__ if PYARROW_AVAILABLE else "no-pyarrow",
+    ])
+
+
+def _build_sample_csv(rows: int) -> bytes:
+    """Gera um CSV sintético com colunas numéricas, texto e datas"""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "valor": rng.normal(100, 25, rows).round(4),
+        "quantidade": rng.integers(0, 1000, rows),
+        "taxa": rng.random(rows),
+        "categoria": rng.choice(["A", "B", "C", "D"], rows),
+        "data": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def benchmark_parser_engines(rows: int = 100_000, repeats: int = 2) -> Dict[str, float]:
+    """
+    Mede a vazão (MB/s) de cada engine de parse disponível
+
+    Args:
+        rows: Número de linhas do CSV sintético
+        repeats: Repetições por engine (vale o melhor tempo)
+
+    Returns:
+        Dicionário engine -> MB/s
+    """
+    data = _build_sample_csv(rows)
+    size_mb = len(data) / (1024 * 1024)
+    engines = ["c", "pyarrow"] if PYARROW_AVAILABLE else ["c"]
+
+    results = {}
+    for engine in engines:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            pd.read_csv(io.BytesIO(data), engine=engine)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[engine] = size_mb / best if best else 0.0
+
+    return results
+
+
+def get_default_engine(cache_dir: str = "cache", force: bool = False) -> str:
+    """
+    Retorna a engine mais rápida neste host, executando o benchmark uma única vez
+
+    O resultado fica salvo em ``cache_dir`` e é refeito quando o host ou as
+    versões do pandas/PyArrow mudam.
+    """
+    if not PYARROW_AVAILABLE:
+        return "c"
+
+    signature = _host_signature()
+    path = os.path.join(cache_dir, BENCHMARK_FILE)
+
+    if not force and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get("host") == signature and saved.get("default_engine"):
+                return saved["default_engine"]
+        except (OSError, ValueError):
+            pass
+
+    try:
+        results = benchmark_parser_engines()
+    except Exception:
+        return "c"
+
+    default_engine = max(results, key=results.get)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "host": signature,
+                "default_engine": default_engine,
+                "throughput_mb_s": results,
+            }, f, ensure_ascii=False, indent=2)
+    except OSError:
+        pass
+
+    return default_engine
+
+
+if __name__ == "__main__":
+    for engine, throughput in benchmark_parser_engines().items():
+        print(f"{engine:>8}: {throughput:8.1f} MB/s")
+    print(f"Engine padrão: {get_default_engine(force=True)}")
@@ -0,0 +1,94 @@
+# Agregados particionados por categoria: perfis de recortes filtrados sem reprocessar linhas
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from profile_aggregates import AggregateProfiler
+from row_hash_index import RowHashIndex
+
+
+class PartitionedAggregates:
+    """Agregados aditivos de cada valor de uma coluna categórica (a coluna de partição)
+
+    Um filtro ``coluna in valores`` é respondido combinando as partições
+    escolhidas: contagens, somas, ausentes e sketches são somados/mesclados.
+    Colunas de texto com até ``max_tracked_values`` valores distintos guardam
+    também as frequências por partição (únicos e valor mais comum exatos).
+    Duplicatas também são aditivas: registros iguais têm o mesmo valor na
+    coluna de partição e, portanto, caem na mesma partição.
+    """
+
+    def __init__(self, column: str, dtypes: pd.Series, rows: int, partitions: Dict[Any, Dict[str, Any]],
+                 duplicates: Dict[Any, int], value_counts: Dict[Any, Dict[str, pd.Series]]):
+        self.column = column
+        self.dtypes = dtypes
+        self.rows = rows
+        self.partitions = partitions
+        self.duplicates = duplicates
+        self.value_counts = value_counts
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, column: str, profiler: AggregateProfiler,
+              row_index: Optional[RowHashIndex] = None, max_tracked_values: int = 1000) -> 'PartitionedAggregates':
+        """
+        Calcula os agregados de todas as partições em uma passada pelos dados
+
+        Args:
+            df: DataFrame completo
+            column: Coluna de partição (registros sem valor nela não entram em nenhuma partição)
+            profiler: Calcula os agregados de cada partição
+            row_index: Índice de hashes de ``df`` (padrão: calculado aqui)
+            max_tracked_values: Limite de distintos para guardar frequências de colunas de texto
+        """
+        codes, keys = pd.factorize(df[column], sort=True)
+        row_index = row_index if row_index is not None else RowHashIndex.build(df)
+        duplicated = np.bincount(codes[codes >= 0], weights=row_index.duplicated()[codes >= 0],
+                                 minlength=len(keys))
+        tracked = [
+            col for col in df.columns
+            if col != column and profiler._is_text(df[col]) and df[col].nunique() <= max_tracked_values
+        ]
+
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+        partitions, duplicates, value_counts = {}, {}, {}
+        for code, key in enumerate(keys):
+            part = df.iloc[order[boundaries[code]:boundaries[code + 1]]]
+            partitions[key] = profiler.compute(part)
+            duplicates[key] = int(duplicated[code])
+            value_counts[key] = {col: part[col].value_counts() for col in tracked}
+        return cls(column, df.dtypes, len(df), partitions, duplicates, value_counts)
+
+    @property
+    def keys(self) -> List[Any]:
+        """Valores da coluna de partição, em ordem"""
+        return list(self.partitions)
+
+    def partition_sizes(self) -> pd.Series:
+        """Registros de cada partição"""
+        return pd.Series({key: part['rows'] for key, part in self.partitions.items()}, dtype='int64')
+
+    def combine(self, values: List[Any], profiler: AggregateProfiler) -> Dict[str, Any]:
+        """
+        Agregados do recorte ``coluna in values`` a partir das partições
+
+        Returns:
+            {'aggregates': ..., 'duplicates': int, 'value_counts': {coluna: frequências}}
+        """
+        selected = [value for value in values if value in self.partitions]
+        if not selected:
+            empty = {'rows': 0, 'columns': {str(col): {'nulls': 0} for col in self.dtypes.index}}
+            return {'aggregates': empty, 'duplicates': 0, 'value_counts': {}}
+        aggregates = self.partitions[selected[0]]
+        for value in selected[1:]:
+            aggregates = profiler.merge(aggregates, self.partitions[value])
+        value_counts = {
+            col: pd.concat([self.value_counts[value][col] for value in selected]).groupby(level=0, observed=True).sum()
+            for col in self.value_counts[selected[0]]
+        }
+        value_counts[self.column] = self.partition_sizes()[selected]
+        return {
+            'aggregates': aggregates,
+            'duplicates': sum(self.duplicates[value] for value in selected),
+            'value_counts': value_counts
+        }
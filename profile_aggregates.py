@@ -0,0 +1,181 @@
+# Agregados aditivos de perfil: calculados por bloco de dados e combinados sem reprocessar linhas
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+from sketches import HyperLogLog, KLLSketch
+
+
+def numeric_aggregates(valid: np.ndarray, quantile_k: int) -> Dict[str, Any]:
+    """Agregados de uma coluna numérica (valores não nulos em float64)
+
+    Guarda média e soma dos quadrados dos desvios (``m2``) em vez de somas
+    brutas: ``sum_sq - n * mean²`` perde todos os dígitos significativos em
+    colunas com média grande e variância pequena (ex.: timestamps Unix).
+    """
+    mean = float(valid.mean()) if valid.size else 0.0
+    deviations = valid - mean
+    return {
+        'count': int(valid.size),
+        'mean': mean,
+        'm2': float(np.dot(deviations, deviations)),
+        'min': float(valid.min()) if valid.size else None,
+        'max': float(valid.max()) if valid.size else None,
+        'quantiles': KLLSketch(quantile_k).add_values(valid).to_dict()
+    }
+
+
+def merge_moments(parts: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Combina contagem, média e ``m2`` de vários blocos (fórmula paralela de Chan et al.)"""
+    count, mean, m2 = 0, 0.0, 0.0
+    for part in parts:
+        if not part['count']:
+            continue
+        total = count + part['count']
+        delta = part['mean'] - mean
+        mean += delta * part['count'] / total
+        m2 += part['m2'] + delta * delta * count * part['count'] / total
+        count = total
+    return {'count': count, 'mean': mean, 'm2': m2}
+
+
+class AggregateProfiler:
+    """Contagens, momentos e extremos por coluna que podem ser combinados entre blocos (ex.: linhas anexadas)
+
+    Colunas de texto levam um sketch HyperLogLog de valores distintos e colunas
+    numéricas um sketch KLL de quantis, ambos combináveis da mesma forma.
+    Com ``parallel`` (``ParallelColumnProfiler``), os agregados numéricos de
+    DataFrames largos são calculados em um pool de processos.
+    """
+
+    def __init__(self, sketch_precision: int = 12, quantile_k: int = 200, parallel=None):
+        self.sketch_precision = sketch_precision
+        self.quantile_k = quantile_k
+        self.parallel = parallel
+
+    def compute(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Calcula os agregados de um DataFrame em uma única passada por coluna
+
+        Returns:
+            Dicionário serializável em JSON: total de linhas e agregados por coluna
+        """
+        null_counts = df.isna().sum()
+        numeric_cols = [col for col in df.columns if self._is_numeric(df[col])]
+        parallel_results = None
+        if self.parallel is not None and self.parallel.should_use(len(df), len(numeric_cols)):
+            parallel_results = self.parallel.aggregates(df[numeric_cols], self.quantile_k)
+        columns = {}
+        for col in df.columns:
+            col_aggregates: Dict[str, Any] = {'nulls': int(null_counts[col])}
+            series = df[col]
+            if parallel_results is not None and str(col) in parallel_results:
+                col_aggregates.update(parallel_results[str(col)])
+            elif self._is_numeric(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                col_aggregates.update(numeric_aggregates(values[~np.isnan(values)], self.quantile_k))
+            elif self._is_text(series):
+                col_aggregates['distinct'] = HyperLogLog(self.sketch_precision).add_series(series).to_dict()
+            columns[str(col)] = col_aggregates
+        return {'rows': int(len(df)), 'columns': columns}
+
+    def merge(self, left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+        """Combina agregados de dois blocos; colunas ausentes em um bloco contam como nulas nele"""
+        merged = {}
+        for col in list(left['columns']) + [col for col in right['columns'] if col not in left['columns']]:
+            parts = [
+                side['columns'].get(col, {'nulls': side['rows']})
+                for side in (left, right)
+            ]
+            col_aggregates: Dict[str, Any] = {'nulls': sum(part['nulls'] for part in parts)}
+            numeric_parts = [part for part in parts if 'count' in part]
+            if numeric_parts:
+                minimums = [part['min'] for part in numeric_parts if part['min'] is not None]
+                maximums = [part['max'] for part in numeric_parts if part['max'] is not None]
+                col_aggregates.update(
+                    **merge_moments(numeric_parts),
+                    min=min(minimums) if minimums else None,
+                    max=max(maximums) if maximums else None
+                )
+                if all('quantiles' in part for part in numeric_parts):
+                    col_aggregates['quantiles'] = self._merge_sketches(
+                        [KLLSketch.from_dict(part['quantiles']) for part in numeric_parts]
+                    ).to_dict()
+            # Sketch só é válido se todos os blocos que têm a coluna o trouxerem
+            present = [side['columns'][col] for side in (left, right) if col in side['columns']]
+            if all('distinct' in part for part in present):
+                col_aggregates['distinct'] = self._merge_sketches(
+                    [HyperLogLog.from_dict(part['distinct']) for part in present]
+                ).to_dict()
+            merged[col] = col_aggregates
+        return {'rows': left['rows'] + right['rows'], 'columns': merged}
+
+    def reconcile(self, aggregates: Dict[str, Any], df: pd.DataFrame) -> Dict[str, Any]:
+        """Ajusta agregados combinados de blocos ao DataFrame final
+
+        Colunas removidas na limpeza saem; colunas cujo tipo mudou depois dos
+        blocos (ex.: numérica em um bloco e texto em outro) são recalculadas.
+        """
+        stale = [col for col in df.columns if not self.matches(aggregates, col, df[col])]
+        recomputed = self.compute(df[stale])['columns'] if stale else {}
+        columns = {
+            str(col): recomputed[str(col)] if str(col) in recomputed else aggregates['columns'][str(col)]
+            for col in df.columns
+        }
+        return {'rows': int(len(df)), 'columns': columns}
+
+    def null_counts(self, aggregates: Dict[str, Any]) -> pd.Series:
+        """Valores ausentes por coluna"""
+        return pd.Series({col: info['nulls'] for col, info in aggregates['columns'].items()}, dtype='int64')
+
+    def distinct_sketches(self, aggregates: Dict[str, Any]) -> Dict[str, HyperLogLog]:
+        """Sketches de valores distintos das colunas de texto"""
+        return {col: HyperLogLog.from_dict(info['distinct'])
+                for col, info in aggregates['columns'].items() if 'distinct' in info}
+
+    def quantile_sketches(self, aggregates: Dict[str, Any]) -> Dict[str, KLLSketch]:
+        """Sketches de quantis das colunas numéricas"""
+        return {col: KLLSketch.from_dict(info['quantiles'])
+                for col, info in aggregates['columns'].items() if 'quantiles' in info}
+
+    def _merge_sketches(self, sketches: list):
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged = merged.merge(sketch)
+        return merged
+
+    def matches(self, aggregates: Dict[str, Any], column: str, series: pd.Series) -> bool:
+        """Indica se os agregados da coluna correspondem ao tipo atual dela (numérica, texto ou outro)"""
+        info = aggregates['columns'].get(str(column))
+        if info is None:
+            return False
+        if self._is_numeric(series):
+            return 'count' in info and 'distinct' not in info
+        if self._is_text(series):
+            return 'distinct' in info and 'count' not in info
+        return 'count' not in info and 'distinct' not in info
+
+    def _is_numeric(self, series: pd.Series) -> bool:
+        return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+    def _is_text(self, series: pd.Series) -> bool:
+        return (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(series)
+                or pd.api.types.is_string_dtype(series))
+
+    def describe(self, aggregates: Dict[str, Any], columns: Optional[list] = None) -> pd.DataFrame:
+        """Estatísticas (count, mean, std, min, max) das colunas numéricas a partir dos agregados"""
+        stats = {}
+        for col, info in aggregates['columns'].items():
+            if 'count' not in info or (columns is not None and col not in columns):
+                continue
+            count = info['count']
+            mean = info['mean'] if count else np.nan
+            variance = info['m2'] / (count - 1) if count > 1 else np.nan
+            stats[col] = [
+                count,
+                mean,
+                np.sqrt(max(variance, 0.0)) if not np.isnan(variance) else np.nan,
+                info['min'] if info['min'] is not None else np.nan,
+                info['max'] if info['max'] is not None else np.nan
+            ]
+        return pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', 'max'])
@@ -0,0 +1,96 @@
+# Perfis gravados no diretório de cache: reabrir o mesmo conteúdo não recalcula as estatísticas
+import os
+import json
+import threading
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional
+
+from dataset_profile import DatasetProfile, PROFILE_ENGINE_VERSION
+
+# Modos de cálculo do perfil: em memória (pandas) ou sobre o arquivo em disco (DuckDB)
+PROFILE_MODES = ['memory', 'out_of_core']
+
+
+class ProfileStore:
+    """Um arquivo JSON por conteúdo (hash), modo de cálculo e versão do motor de perfil
+
+    O modo separa o perfil out-of-core (arquivo completo via DuckDB) do perfil
+    em memória do mesmo conteúdo, que podem diferir (ex.: quartis exatos contra
+    aproximados, Spearman sobre a amostra).
+    Guarda o perfil (esquema, ausentes, duplicatas, describe com quartis,
+    valores mais comuns) e as matrizes de correlação já calculadas. A gravação
+    é atômica (arquivo temporário + ``os.replace``); um arquivo ilegível é
+    tratado como ausente.
+    """
+
+    def __init__(self, cache_dir: str = "cache"):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def path(self, content_hash: str, mode: str = 'memory') -> str:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Modo de perfil desconhecido: {mode}")
+        return os.path.join(self.cache_dir, f"{content_hash}_{mode}_profile_v{PROFILE_ENGINE_VERSION}.json")
+
+    def load_profile(self, content_hash: str, df: pd.DataFrame, mode: str = 'memory') -> Optional[DatasetProfile]:
+        """Perfil gravado para o conteúdo e modo, se as colunas e tipos ainda corresponderem a ``df``"""
+        data = self._read(content_hash, mode).get('profile')
+        if data is None:
+            return None
+        if (data['columns'] != [str(col) for col in df.columns]
+                or data['dtypes'] != [str(dtype) for dtype in df.dtypes]):
+            return None
+        try:
+            return DatasetProfile.from_dict(data, df.dtypes)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def save_profile(self, content_hash: str, profile: DatasetProfile, mode: str = 'memory'):
+        with self._lock:
+            data = self._read(content_hash, mode)
+            data['profile'] = profile.to_dict()
+            self._write(content_hash, mode, data)
+
+    def load_correlation(self, content_hash: str, method: str, mode: str = 'memory') -> Optional[pd.DataFrame]:
+        """Matriz de correlação completa gravada para o conteúdo e modo (None se ainda não calculada)"""
+        matrix = self._read(content_hash, mode).get('correlations', {}).get(method)
+        if matrix is None:
+            return None
+        columns = matrix['columns']
+        values = np.array(matrix['data'], dtype=np.float64).reshape(len(columns), len(columns))
+        return pd.DataFrame(values, index=columns, columns=columns)
+
+    def save_correlation(self, content_hash: str, method: str, matrix: pd.DataFrame, mode: str = 'memory'):
+        with self._lock:
+            data = self._read(content_hash, mode)
+            data.setdefault('correlations', {})[method] = {
+                'columns': [str(col) for col in matrix.columns],
+                'data': matrix.to_numpy(dtype=np.float64).tolist()
+            }
+            self._write(content_hash, mode, data)
+
+    def _read(self, content_hash: str, mode: str) -> Dict[str, Any]:
+        path = self.path(content_hash, mode)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, content_hash: str, mode: str, data: Dict[str, Any]):
+        path = self.path(content_hash, mode)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+            os.replace(temp_path, path)
+        except OSError:
+            # Sem permissão/espaço: o perfil continua só em memória
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,223 @@
+"""
+Backend de Consultas Out-of-Core com DuckDB
+Executa consultas colunares sobre o arquivo CSV em disco, sem carregá-lo inteiro em memória.
+Apenas resultados agregados (pequenos) voltam como DataFrames do pandas.
+"""
+
+import threading
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    duckdb = None
+    DUCKDB_AVAILABLE = False
+
+# Encodings aceitos pelo leitor CSV do DuckDB
+_DUCKDB_ENCODINGS = {'utf-8': 'utf-8', 'utf-8-sig': 'utf-8', 'latin-1': 'latin-1', 'cp1252': 'latin-1'}
+
+_NUMERIC_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT',
+                  'UINTEGER', 'UBIGINT', 'FLOAT', 'DOUBLE', 'REAL', 'DECIMAL')
+_TEXT_TYPES = ('VARCHAR', 'BOOLEAN')
+
+
+def _quote(identifier: str) -> str:
+    """Escapa nome de coluna para SQL"""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    """Escapa texto literal para SQL"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBBackend:
+    """Consultas agregadas sobre um CSV em disco usando DuckDB embarcado (sem servidor)"""
+
+    def __init__(self, path: str, delimiter: str = ',', encoding: str = 'utf-8',
+                 memory_limit: str = '1GB', columns: Optional[List[str]] = None):
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("DuckDB não está instalado. Execute: pip install duckdb")
+
+        self.path = path
+        self.projection = columns
+        self.conn = duckdb.connect(database=':memory:')
+        # A conexão é compartilhada entre sessões do Streamlit: serializar o acesso
+        self._lock = threading.Lock()
+        self._execute(f"SET memory_limit={_literal(memory_limit)}")
+        select = ", ".join(_quote(col) for col in columns) if columns else "*"
+        options = (f"{_literal(path)}, delim={_literal(delimiter)}, header=true, "
+                   f"encoding={_literal(_DUCKDB_ENCODINGS.get(encoding, 'utf-8'))}")
+        # Tipos detectados uma única vez no arquivo inteiro: com amostra, uma coluna numérica no
+        # início e texto mais adiante faria toda consulta falhar. A view fixa os tipos e não refaz a detecção.
+        with self._lock:
+            described = self.conn.execute(f"DESCRIBE SELECT * FROM read_csv({options}, sample_size=-1)").fetchall()
+        types = ", ".join(f"{_literal(name)}: {_literal(sql_type)}" for name, sql_type, *_ in described)
+        self._execute(f"CREATE VIEW dados AS SELECT {select} FROM read_csv({options}, types={{{types}}})")
+        self._row_count: Optional[int] = None
+        self._column_types: Optional[pd.Series] = None
+
+    def close(self):
+        """Fecha a conexão com o DuckDB"""
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def _execute(self, sql: str):
+        """Executa SQL sem retorno"""
+        with self._lock:
+            self.conn.execute(sql)
+
+    def _fetchone(self, sql: str) -> tuple:
+        """Executa SQL e retorna a primeira linha"""
+        with self._lock:
+            return self.conn.execute(sql).fetchone()
+
+    def query(self, sql: str) -> pd.DataFrame:
+        """Executa SQL sobre a view ``dados`` e retorna o resultado como DataFrame"""
+        with self._lock:
+            return self.conn.execute(sql).df()
+
+    def row_count(self) -> int:
+        """Número total de registros do arquivo"""
+        if self._row_count is None:
+            self._row_count = int(self._fetchone("SELECT count(*) FROM dados")[0])
+        return self._row_count
+
+    def column_types(self) -> pd.Series:
+        """Tipos SQL de cada coluna"""
+        if self._column_types is None:
+            described = self.query("DESCRIBE dados")
+            self._column_types = pd.Series(described['column_type'].values, index=described['column_name'].values)
+        return self._column_types
+
+    def columns(self) -> List[str]:
+        """Nomes das colunas"""
+        return self.column_types().index.tolist()
+
+    def numeric_columns(self) -> List[str]:
+        """Colunas com tipo numérico"""
+        types = self.column_types()
+        return [col for col, sql_type in types.items() if str(sql_type).startswith(_NUMERIC_TYPES)]
+
+    def categorical_columns(self) -> List[str]:
+        """Colunas de texto ou booleanas"""
+        types = self.column_types()
+        return [col for col, sql_type in types.items() if str(sql_type).startswith(_TEXT_TYPES)]
+
+    def null_counts(self) -> pd.Series:
+        """Valores ausentes por coluna, em uma única varredura"""
+        columns = self.columns()
+        if not columns:
+            return pd.Series(dtype='int64')
+        select = ", ".join(f"count(*) - count({_quote(col)})" for col in columns)
+        values = self._fetchone(f"SELECT {select} FROM dados")
+        return pd.Series([int(value) for value in values], index=columns)
+
+    def duplicate_count(self) -> int:
+        """Número de registros duplicados (DuckDB usa disco se o DISTINCT não couber na memória)"""
+        distinct = self._fetchone("SELECT count(*) FROM (SELECT DISTINCT * FROM dados)")[0]
+        return self.row_count() - int(distinct)
+
+    def numeric_summary(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Estatísticas no formato de ``DataFrame.describe()`` calculadas no DuckDB, em uma única varredura"""
+        columns = columns if columns is not None else self.numeric_columns()
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        if not columns:
+            return pd.DataFrame(index=index, dtype='float64')
+        select = ", ".join(
+            f"count({q}), avg({q}), stddev_samp({q}), min({q}), "
+            f"approx_quantile({q}, 0.25), approx_quantile({q}, 0.5), approx_quantile({q}, 0.75), max({q})"
+            for q in map(_quote, columns)
+        )
+        row = self._fetchone(f"SELECT {select} FROM dados")
+        values = [float(value) if value is not None else np.nan for value in row]
+        stats = {col: values[position * len(index):(position + 1) * len(index)]
+                 for position, col in enumerate(columns)}
+        return pd.DataFrame(stats, index=index)
+
+    def categorical_summary(self, columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Valores únicos (aproximados), valor mais comum e ausentes por coluna, em uma única varredura"""
+        columns = columns if columns is not None else self.categorical_columns()
+        if not columns:
+            return {}
+        select = ", ".join(
+            f"approx_count_distinct({q}), mode({q}), count(*) - count({q})"
+            for q in map(_quote, columns)
+        )
+        row = self._fetchone(f"SELECT {select} FROM dados")
+        summary = {}
+        for position, col in enumerate(columns):
+            unique_count, most_common, missing = row[position * 3:(position + 1) * 3]
+            summary[col] = {
+                'unique_values': int(unique_count),
+                'most_common': most_common,
+                'missing_values': int(missing)
+            }
+        return summary
+
+    def value_counts(self, column: str, limit: int = 10) -> pd.Series:
+        """Valores mais frequentes de uma coluna"""
+        q = _quote(column)
+        result = self.query(
+            f"SELECT {q} AS valor, count(*) AS n FROM dados WHERE {q} IS NOT NULL "
+            f"GROUP BY 1 ORDER BY n DESC LIMIT {int(limit)}"
+        )
+        return pd.Series(result['n'].values, index=result['valor'].values, name=column)
+
+    def histogram(self, column: str, bins: int = 30, bounds: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+        """Histograma com ``bins`` faixas de largura igual (colunas: inicio, fim, contagem)
+
+        ``bounds`` (mínimo, máximo) já conhecidos evitam a varredura que os calcula.
+        """
+        q = _quote(column)
+        low, high = bounds if bounds is not None else self._fetchone(f"SELECT min({q}), max({q}) FROM dados")
+        if low is None or high is None or pd.isna(low) or pd.isna(high):
+            return pd.DataFrame(columns=['inicio', 'fim', 'contagem'])
+
+        low, high = float(low), float(high)
+        width = (high - low) / bins if high > low else 1.0
+        counts = self.query(
+            f"SELECT least(CAST(floor(({q} - {low}) / {width}) AS INTEGER), {bins - 1}) AS faixa, "
+            f"count(*) AS contagem FROM dados WHERE {q} IS NOT NULL GROUP BY 1"
+        )
+        full = np.zeros(bins, dtype=np.int64)
+        full[counts['faixa'].astype(int).values] = counts['contagem'].values
+        edges = low + width * np.arange(bins + 1)
+        return pd.DataFrame({'inicio': edges[:-1], 'fim': edges[1:], 'contagem': full})
+
+    def correlation_matrix(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Matriz de correlação de Pearson calculada em uma única varredura"""
+        columns = columns if columns is not None else self.numeric_columns()
+        pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+        matrix = np.eye(len(columns))
+        if pairs:
+            select = ", ".join(f"corr({_quote(columns[i])}, {_quote(columns[j])})" for i, j in pairs)
+            values = self._fetchone(f"SELECT {select} FROM dados")
+            for (i, j), value in zip(pairs, values):
+                matrix[i, j] = matrix[j, i] = value if value is not None else np.nan
+        return pd.DataFrame(matrix, index=columns, columns=columns)
+
+    def count_by_period(self, column: str, unit: str = 'hour', fmt: Optional[str] = None) -> pd.DataFrame:
+        """Contagem de registros por período (colunas: period, count)
+
+        Args:
+            fmt: Formato strftime detectado no carregamento, usado quando a coluna é texto
+        """
+        q = _quote(column)
+        if fmt and fmt != 'ISO8601' and str(self.column_types().get(column, '')).startswith('VARCHAR'):
+            timestamp = f"try_strptime({q}, {_literal(fmt)})"
+        else:
+            timestamp = f"TRY_CAST({q} AS TIMESTAMP)"
+        return self.query(
+            f"SELECT date_trunc({_literal(unit)}, {timestamp}) AS period, count(*) AS count "
+            "FROM dados WHERE period IS NOT NULL GROUP BY 1 ORDER BY 1"
+        )
+
+    def sample(self, rows: int) -> pd.DataFrame:
+        """Amostra aleatória (reservoir) do arquivo para partes que precisam de linhas"""
+        return self.query(f"SELECT * FROM dados USING SAMPLE reservoir({int(rows)} ROWS) REPEATABLE (42)")
@@ -0,0 +1,125 @@
+# Índice de hashes por registro: duplicatas, grupos e deduplicação sem comparar linhas inteiras
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Tuple
+
+
+class RowHashIndex:
+    """Hash de 64 bits de cada registro, calculado uma vez por versão dos dados
+
+    Os hashes são calculados sobre tipos normalizados (inteiros em 64 bits, floats
+    em float64), de modo que a redução de tipos e a promoção ao anexar linhas não
+    alteram o hash de registros já indexados.
+    """
+
+    block_rows = 200_000
+
+    def __init__(self, hashes: np.ndarray, signature: Tuple[str, ...]):
+        self.hashes = hashes
+        self.hashes.flags.writeable = False
+        self.signature = signature
+        self._duplicated: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'RowHashIndex':
+        """Calcula os hashes de todos os registros, em blocos para limitar a memória temporária"""
+        return cls(cls._hash_rows(df), cls._signature(df))
+
+    def append(self, tail: pd.DataFrame) -> 'RowHashIndex':
+        """Novo índice com os registros de ``tail`` anexados (só as linhas novas são processadas)
+
+        Se a promoção de tipos mudou a normalização de alguma coluna (ex.: inteiro
+        que virou float), os hashes antigos não são comparáveis e o índice deve ser
+        recalculado: nesse caso é levantado ``ValueError``.
+        """
+        if self._signature(tail) != self.signature:
+            raise ValueError("Tipos das linhas anexadas incompatíveis com o índice")
+        return RowHashIndex(np.concatenate([self.hashes, self._hash_rows(tail)]), self.signature)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def duplicated(self) -> np.ndarray:
+        """Máscara dos registros repetidos (a primeira ocorrência não é marcada)"""
+        if self._duplicated is None:
+            duplicated = pd.Series(self.hashes).duplicated(keep='first').to_numpy()
+            duplicated.flags.writeable = False
+            self._duplicated = duplicated
+        return self._duplicated
+
+    def duplicate_count(self) -> int:
+        """Número de registros duplicados (equivalente a ``df.duplicated().sum()``)"""
+        return int(self.duplicated().sum())
+
+    def duplicate_groups(self, limit: Optional[int] = None) -> List[np.ndarray]:
+        """Posições dos registros de cada grupo repetido, em ordem da primeira ocorrência
+
+        Args:
+            limit: Número máximo de grupos retornados
+        """
+        codes, _ = pd.factorize(self.hashes)
+        counts = np.bincount(codes)
+        repeated = counts[codes] > 1
+        positions = np.flatnonzero(repeated)
+        if positions.size == 0:
+            return []
+        group_codes = codes[positions]
+        order = np.argsort(group_codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(group_codes[order])) + 1
+        groups = np.split(positions[order], boundaries)
+        return groups[:limit] if limit is not None else groups
+
+    def unique_positions(self) -> np.ndarray:
+        """Posições mantidas na deduplicação (primeira ocorrência de cada registro)"""
+        return np.flatnonzero(~self.duplicated())
+
+    @classmethod
+    def _hash_rows(cls, df: pd.DataFrame) -> np.ndarray:
+        if len(df) == 0:
+            return np.array([], dtype=np.uint64)
+        blocks = [
+            pd.util.hash_pandas_object(cls._normalize(df.iloc[start:start + cls.block_rows]), index=False).to_numpy()
+            for start in range(0, len(df), cls.block_rows)
+        ]
+        return np.concatenate(blocks)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """Converte colunas numéricas para a largura máxima do seu tipo"""
+        casts = {}
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_bool_dtype(dtype):
+                continue
+            extension = pd.api.types.is_extension_array_dtype(dtype)
+            if pd.api.types.is_integer_dtype(dtype):
+                target = 'Int64' if extension else 'int64'
+            elif pd.api.types.is_float_dtype(dtype):
+                target = 'Float64' if extension else 'float64'
+            else:
+                continue
+            if str(dtype) != target:
+                casts[col] = target
+        return df.astype(casts) if casts else df
+
+    @staticmethod
+    def _signature(df: pd.DataFrame) -> Tuple[str, ...]:
+        """Tipo normalizado de cada coluna; índices com assinaturas iguais são comparáveis"""
+        signature = []
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_bool_dtype(dtype):
+                kind = 'bool'
+            elif pd.api.types.is_integer_dtype(dtype):
+                kind = 'int'
+            elif pd.api.types.is_float_dtype(dtype):
+                kind = 'float'
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                kind = 'datetime'
+            else:
+                kind = 'text'
+            # Arrays mascarados (Int64, boolean...) têm hash diferente dos arrays NumPy
+            if kind != 'text' and pd.api.types.is_extension_array_dtype(dtype):
+                kind = f"{kind}-ext"
+            signature.append(f"{col}:{kind}")
+        return tuple(signature)
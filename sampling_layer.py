@@ -0,0 +1,134 @@
+# Camada de Amostragem: renderização imediata a partir de amostra e estatísticas exatas em segundo plano
+import threading
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, Callable, Tuple
+
+
+class SamplingLayer:
+    """Amostras estratificadas/aleatórias por versão dos dados e cálculos exatos em threads"""
+
+    def __init__(self, sample_rows: int = 50_000, max_strata: int = 50,
+                 max_workers: int = 2, random_state: int = 42):
+        self.sample_rows = sample_rows
+        self.max_strata = max_strata
+        self.random_state = random_state
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="exact-stats")
+        self._samples: Dict[str, Tuple[pd.DataFrame, Optional[str]]] = {}
+        self._jobs: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def needs_sampling(self, df: pd.DataFrame) -> bool:
+        """Indica se o DataFrame é grande o bastante para renderizar a partir de amostra"""
+        return len(df) > self.sample_rows
+
+    def get_sample(self, key: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[str]]:
+        """
+        Retorna a amostra do DataFrame para a versão ``key`` dos dados
+
+        Returns:
+            Amostra e a coluna usada na estratificação (None para amostra aleatória)
+        """
+        with self._lock:
+            cached = self._samples.get(key)
+        if cached is not None:
+            return cached
+
+        strata_col = self._choose_strata_column(df)
+        if strata_col is not None:
+            positions = self._stratified_positions(df[strata_col])
+        else:
+            positions = self._random_positions(len(df), self.sample_rows)
+        sample = df.iloc[positions]
+
+        with self._lock:
+            self._samples[key] = (sample, strata_col)
+        return sample, strata_col
+
+    def submit(self, key: str, name: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Agenda um cálculo exato em segundo plano (uma única vez por versão dos dados)"""
+        with self._lock:
+            job = self._jobs.get((key, name))
+            if job is None:
+                job = self._executor.submit(func, *args, **kwargs)
+                self._jobs[(key, name)] = job
+            return job
+
+    def get_result(self, key: str, name: str) -> Optional[Any]:
+        """Resultado exato se já estiver pronto; None enquanto calcula ou se falhou"""
+        with self._lock:
+            job = self._jobs.get((key, name))
+        if job is None or not job.done() or job.cancelled() or job.exception() is not None:
+            return None
+        return job.result()
+
+    def get_error(self, key: str, name: str) -> Optional[BaseException]:
+        """Exceção do cálculo exato que falhou (None enquanto calcula, se deu certo ou foi cancelado)
+
+        As threads não têm o contexto de execução do Streamlit: a falha é
+        devolvida para ser exibida por quem renderiza a página.
+        """
+        with self._lock:
+            job = self._jobs.get((key, name))
+        if job is None or not job.done() or job.cancelled():
+            return None
+        return job.exception()
+
+    def is_pending(self, key: str, name: str) -> bool:
+        """Indica se o cálculo exato ainda está em andamento"""
+        with self._lock:
+            job = self._jobs.get((key, name))
+        return job is not None and not job.done()
+
+    def invalidate(self, key: str):
+        """Descarta amostra e cálculos de uma versão dos dados"""
+        with self._lock:
+            self._samples.pop(key, None)
+            for job_key in [job_key for job_key in self._jobs if job_key[0] == key]:
+                self._jobs.pop(job_key).cancel()
+
+    def clear(self):
+        """Descarta todas as amostras e cálculos"""
+        with self._lock:
+            self._samples.clear()
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs.clear()
+
+    def _choose_strata_column(self, df: pd.DataFrame) -> Optional[str]:
+        """Coluna de baixa cardinalidade (category, booleana ou inteira) com menos grupos"""
+        best_col, best_groups = None, self.max_strata + 1
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                groups = len(series.cat.categories)
+            elif pd.api.types.is_bool_dtype(series):
+                groups = 2
+            elif pd.api.types.is_integer_dtype(series):
+                # Faixa de valores como limite superior de grupos, sem contar distintos
+                low, high = series.min(), series.max()
+                if pd.isna(low):
+                    continue
+                groups = int(high) - int(low) + 1
+            else:
+                continue
+            if 1 < groups < best_groups:
+                best_col, best_groups = col, groups
+        return best_col
+
+    def _stratified_positions(self, strata: pd.Series) -> np.ndarray:
+        """Alocação proporcional por grupo, garantindo ao menos uma linha de cada grupo"""
+        rng = np.random.default_rng(self.random_state)
+        fraction = self.sample_rows / len(strata)
+        groups = strata.groupby(strata, observed=True, dropna=False, sort=False).indices
+        positions = []
+        for group_positions in groups.values():
+            size = min(len(group_positions), max(1, int(round(len(group_positions) * fraction))))
+            positions.append(rng.choice(group_positions, size=size, replace=False))
+        return np.sort(np.concatenate(positions)) if positions else np.array([], dtype=np.int64)
+
+    def _random_positions(self, n_rows: int, size: int) -> np.ndarray:
+        """Amostra uniforme sem reposição (equivalente ao reservoir para dados em memória)"""
+        rng = np.random.default_rng(self.random_state)
+        return np.sort(rng.choice(n_rows, size=min(size, n_rows), replace=False))
@@ -0,0 +1,225 @@
+# Sketches probabilísticos: resumos de tamanho fixo, combináveis entre blocos e arquivos
+import base64
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada uint64 (exato: cada metade de 32 bits cabe em float64)"""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high > 0, 32 + high_bits, low_bits)
+
+
+class HyperLogLog:
+    """Contagem aproximada de valores distintos (HyperLogLog sobre hashes de 64 bits)
+
+    Usa ``2 ** precision`` registradores de um byte; o erro relativo típico
+    (um desvio padrão) é ``1.04 / sqrt(2 ** precision)``.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision deve estar entre 4 e 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Erro relativo típico da estimativa (um desvio padrão)"""
+        return float(1.04 / np.sqrt(len(self.registers)))
+
+    def add_hashes(self, hashes: np.ndarray) -> 'HyperLogLog':
+        """Adiciona valores já convertidos em hashes uint64"""
+        if len(hashes) == 0:
+            return self
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        remaining_bits = 64 - self.precision
+        positions = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+        ranks = (remaining_bits - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, positions, ranks)
+        return self
+
+    def add_series(self, series: pd.Series) -> 'HyperLogLog':
+        """Adiciona os valores não nulos de uma coluna"""
+        values = series.dropna()
+        if len(values) == 0:
+            return self
+        # Sem fatorar antes (categorize=False): em colunas tipo ID quase todos os valores são únicos
+        return self.add_hashes(pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy())
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Novo sketch equivalente a ter visto os valores dos dois"""
+        if other.precision != self.precision:
+            raise ValueError("Sketches com precisões diferentes não podem ser combinados")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def estimate(self) -> int:
+        """Estimativa do número de valores distintos"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Correção para cardinalidades pequenas (linear counting)
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável em JSON (registradores em base64)"""
+        return {'precision': self.precision,
+                'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HyperLogLog':
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class KLLSketch:
+    """Sketch de quantis KLL: amostra compactada por níveis, combinável entre blocos e arquivos
+
+    Cada item do nível ``h`` representa ``2 ** h`` valores. Enquanto nenhum nível
+    foi compactado os quantis são exatos; depois o erro de rank é limitado por
+    ``rank_error``, calculado a partir das compactações feitas por este sketch e
+    pelos que foram combinados nele.
+
+    Limite: compactar o nível ``h`` (itens ordenados, metade alternada promovida
+    com deslocamento aleatório) altera o rank estimado de qualquer valor em 0 ou
+    ±2^h, com sinal equiprovável. A soma dessas parcelas tem média zero e, por
+    Hoeffding, fica abaixo de ``sqrt(2 ln(2/δ) Σ 4^h)`` com probabilidade 1 - δ
+    (``failure_probability``), e nunca acima de ``Σ 2^h``. A busca do quantil
+    acrescenta no máximo o peso de um item do nível mais alto.
+    """
+
+    failure_probability = 1e-3
+    # Valores ordenados por vez em ``add_values`` (128 KiB em float64)
+    batch_size = 16_384
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        # Σ 2^h e Σ 4^h das compactações (limites determinístico e de Hoeffding)
+        self.error_sum = 0.0
+        self.error_variance = 0.0
+        # Sem semente fixa: sketches combinados precisam de deslocamentos independentes
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        """Erro de rank normalizado dos quantis (0 enquanto o sketch guarda todos os valores)"""
+        if len(self.levels) == 1 or self.n == 0:
+            return 0.0
+        hoeffding = np.sqrt(2 * np.log(2 / self.failure_probability) * self.error_variance)
+        lookup = 2 ** (len(self.levels) - 1)
+        return float((min(self.error_sum, hoeffding) + lookup) / self.n)
+
+    def add_values(self, values: np.ndarray) -> 'KLLSketch':
+        """Adiciona valores numéricos (NaN são ignorados)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += int(values.size)
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        # Em blocos de ``batch_size``: ordenação e memória temporária limitadas, não proporcionais à coluna
+        for start in range(0, values.size, self.batch_size):
+            self.levels[0] = np.sort(np.concatenate([self.levels[0], values[start:start + self.batch_size]]))
+            self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        """Novo sketch equivalente a ter visto os valores dos dois"""
+        merged = KLLSketch(max(self.k, other.k))
+        merged.n = self.n + other.n
+        merged.error_sum = self.error_sum + other.error_sum
+        merged.error_variance = self.error_variance + other.error_variance
+        extremes = [value for value in (self.min, other.min) if value is not None]
+        merged.min = min(extremes) if extremes else None
+        extremes = [value for value in (self.max, other.max) if value is not None]
+        merged.max = max(extremes) if extremes else None
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.sort(np.concatenate([sketch.levels[level] for sketch in (self, other) if level < len(sketch.levels)]),
+                    kind='stable')
+            for level in range(depth)
+        ]
+        merged._compress()
+        return merged
+
+    def quantiles(self, probabilities: List[float]) -> List[float]:
+        """Quantis aproximados (exatos, com interpolação como no pandas, se não houve compactação)"""
+        if self.n == 0:
+            return [np.nan for _ in probabilities]
+        if len(self.levels) == 1:
+            return [float(value) for value in np.quantile(self.levels[0], probabilities)]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** height, dtype=np.int64)
+                                  for height, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        result = []
+        for probability in probabilities:
+            if probability <= 0:
+                result.append(self.min)
+            elif probability >= 1:
+                result.append(self.max)
+            else:
+                position = np.searchsorted(cumulative, probability * self.n, side='left')
+                result.append(float(items[order][min(position, len(items) - 1)]))
+        return result
+
+    def _capacity(self, level: int) -> int:
+        """Capacidade do nível: ``k`` no topo, decaindo 2/3 por nível abaixo"""
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        """Compacta níveis acima da capacidade: metade dos itens (alternados) sobe um nível"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            # Com quantidade ímpar, o menor item fica no nível para preservar o peso total
+            kept = items[:len(items) % 2]
+            promoted = items[len(kept):][int(self._rng.integers(2))::2]
+            self.error_sum += 2.0 ** level
+            self.error_variance += 4.0 ** level
+            self.levels[level] = kept
+            self.levels[level + 1] = np.sort(np.concatenate([self.levels[level + 1], promoted]), kind='stable')
+            # Um novo nível reduz a capacidade dos de baixo: recomeçar do início
+            level = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forma serializável em JSON (itens de cada nível em base64)"""
+        return {
+            'k': self.k, 'n': self.n, 'min': self.min, 'max': self.max,
+            'error_sum': self.error_sum, 'error_variance': self.error_variance,
+            'levels': [base64.b64encode(level.tobytes()).decode('ascii') for level in self.levels]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KLLSketch':
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.error_sum = data.get('error_sum', 0.0)
+        sketch.error_variance = data.get('error_variance', 0.0)
+        sketch.levels = [np.frombuffer(base64.b64decode(level), dtype=np.float64).copy() for level in data['levels']]
+        return sketch
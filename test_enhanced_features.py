@@ -0,0 +1,1519 @@
+#!/usr/bin/env python3
+"""
+Testes das otimizações de carregamento e perfilamento (sketches, agregados, índices e caches)
+"""
+
+import io
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import KLLSketch
+
+
+class _Upload(io.BytesIO):
+    """Arquivo enviado pelo Streamlit (conteúdo, nome, tamanho e id)"""
+
+    def __init__(self, content: bytes, name: str):
+        super().__init__(content)
+        self.name = name
+        self.size = len(content)
+        self.file_id = f"{name}-{len(content)}"
+
+
+def _manager(cache_dir):
+    """DataManager com cache em um diretório temporário"""
+    from data_manager import DataManager
+
+    manager = DataManager()
+    manager.cache_dir = str(cache_dir)
+    manager.profile_store.cache_dir = str(cache_dir)
+    manager._ensure_cache_dir()
+    return manager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return _manager(tmp_path / "manager")
+
+
+def _load(manager, content, name: str = "dados.csv", **options) -> pd.DataFrame:
+    """Carrega ``content`` (texto ou bytes) com as opções de ``load_csv`` e retorna os dados atuais"""
+    return _load_files(manager, [(name, content)], **options)
+
+
+def _load_files(manager, files, **options) -> pd.DataFrame:
+    """Carrega vários uploads ``(nome, conteúdo)`` de uma vez"""
+    uploads = [_Upload(content.encode("utf-8") if isinstance(content, str) else content, name)
+               for name, content in files]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        manager.load_csv(uploads, **options)
+    return manager.current_df
+
+
+def _plain_load(tmp_path, content, name: str = "dados.csv") -> pd.DataFrame:
+    """Referência: leitura completa em memória, com um DataManager e cache próprios"""
+    return _load(_manager(tmp_path / "referencia"), content, name)
+
+
+def _assert_same_frame(result: pd.DataFrame, expected: pd.DataFrame):
+    """Mesmos valores e tipos (categorias podem diferir na ordem)"""
+    pd.testing.assert_frame_equal(result, expected, check_categorical=False)
+
+
+def _assert_describe_matches(described: pd.DataFrame, frame: pd.DataFrame,
+                             rows=("count", "mean", "std", "min", "max")):
+    """Estatísticas de ``describe()`` das numéricas de ``frame`` (em float64) até o arredondamento"""
+    expected = frame.select_dtypes("number").astype("float64").describe().loc[list(rows)]
+    pd.testing.assert_frame_equal(described.loc[list(rows), expected.columns], expected,
+                                  check_exact=False, rtol=1e-9)
+
+
+def _max_rank_error(sketch, data):
+    """Maior erro de rank normalizado do sketch nos percentis 1..99"""
+    ordered = np.sort(data)
+    probabilities = np.linspace(0.01, 0.99, 99)
+    values = np.array(sketch.quantiles(list(probabilities)))
+    low = np.searchsorted(ordered, values, side='left') / len(ordered)
+    high = np.searchsorted(ordered, values, side='right') / len(ordered)
+    return float(np.max(np.maximum(0.0, np.maximum(low - probabilities, probabilities - high))))
+
+
+def test_kll_exact_without_compaction():
+    """Sem compactação os quartis são os mesmos do pandas e o erro é zero"""
+    data = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch(200).add_values(data)
+    assert sketch.rank_error == 0.0
+    assert sketch.quantiles([0.25, 0.5, 0.75]) == pytest.approx(pd.Series(data).quantile([0.25, 0.5, 0.75]).tolist())
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_kll_merged_error_within_rank_error(seed):
+    """Após 200 combinações o erro medido fica dentro de ``rank_error``"""
+    data = np.random.default_rng(seed).lognormal(size=200 * 2_000)
+    sketches = [KLLSketch(200).add_values(block) for block in np.split(data, 200)]
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged = merged.merge(sketch)
+    assert merged.n == len(data)
+    assert 0.0 < merged.rank_error < 0.05
+    assert _max_rank_error(merged, data) <= merged.rank_error
+
+
+def test_kll_add_values_is_bounded():
+    """Uma coluna grande é processada em blocos: o sketch fica pequeno e o erro dentro do limite"""
+    data = np.random.default_rng(7).normal(size=1_000_000)
+    sketch = KLLSketch(200).add_values(data)
+    assert sketch.n == len(data)
+    assert sum(len(level) for level in sketch.levels) <= 3 * sketch.k
+    assert (sketch.min, sketch.max) == (data.min(), data.max())
+    assert _max_rank_error(sketch, data) <= sketch.rank_error
+
+
+def test_kll_serialization_keeps_error_bound():
+    """``to_dict``/``from_dict`` preservam itens e limite de erro"""
+    sketch = KLLSketch(64).add_values(np.arange(10_000, dtype=float))
+    restored = KLLSketch.from_dict(sketch.to_dict())
+    assert restored.rank_error == sketch.rank_error
+    assert restored.quantiles([0.5]) == sketch.quantiles([0.5])
+
+
+@pytest.mark.parametrize("storage", ["sqlite", "json"])
+def test_cache_memory_hit_skips_storage(tmp_path, storage, monkeypatch):
+    """Acertos em memória não tocam o armazenamento; itens gravados sobrevivem a uma nova instância"""
+    from cache_system import CacheSystem
+
+    cache = CacheSystem(cache_dir=str(tmp_path), storage=storage)
+    assert cache.set("dados.csv", "summary", {"linhas": 10})
+    monkeypatch.setattr(cache.storage, "get", lambda *args: pytest.fail("armazenamento acessado"))
+    monkeypatch.setattr(cache.storage, "touch_many", lambda *args: pytest.fail("armazenamento acessado"))
+    assert cache.get("dados.csv", "summary") == {"linhas": 10}
+    monkeypatch.undo()
+    assert CacheSystem(cache_dir=str(tmp_path), storage=storage).get("dados.csv", "summary") == {"linhas": 10}
+
+
+def test_cache_flushes_last_access_in_batches(tmp_path, monkeypatch):
+    """Acessos em memória são gravados em lote: a coluna de último acesso acompanha os itens usados"""
+    import sqlite3
+
+    from cache_system import CacheSystem
+
+    cache = CacheSystem(cache_dir=str(tmp_path))
+    cache.touch_flush_items = 3
+    cache.set("dados.csv", "frio", 1)
+    cache.set("dados.csv", "quente", 2)
+    flushes = []
+    touch_many = cache.storage.touch_many
+    monkeypatch.setattr(cache.storage, "touch_many",
+                        lambda accesses: flushes.append(dict(accesses)) or touch_many(accesses))
+    for _ in range(5):
+        cache.get("dados.csv", "quente")
+    assert len(flushes) == 1
+    cache.get_cache_stats()
+    assert len(flushes) == 2
+
+    with sqlite3.connect(cache.storage.path) as conn:
+        order = [row[0] for row in conn.execute("SELECT analysis_type FROM cache_entries ORDER BY last_access")]
+    assert order == ["frio", "quente"]
+
+
+def test_cache_storage_is_created_lazily(tmp_path):
+    """Criar o CacheSystem (ex.: ao importar o módulo) não cria diretório nem banco"""
+    from cache_system import CacheSystem
+
+    cache_dir = tmp_path / "cache"
+    cache = CacheSystem(cache_dir=str(cache_dir))
+    assert not cache_dir.exists()
+    assert cache.get("dados.csv", "summary") is None
+    assert (cache_dir / "cache.sqlite3").exists()
+
+
+def _append_csv():
+    header = "cep,cidade,valor,data\n"
+    base = "".join(
+        f"{cep},{cidade},{i},2024-01-{i % 28 + 1:02d}\n"
+        for i, (cep, cidade) in enumerate([("07777", "a"), ("01234", "b"), ("X1", "a")] * 200)
+    )
+    tail = "".join(
+        f"{cep},{cidade},{i}.5,2024-02-{i % 28 + 1:02d}\n"
+        for i, (cep, cidade) in enumerate([("07777", "c"), ("01234", "a")] * 10)
+    )
+    return header + base, header + base + tail
+
+
+def test_append_matches_full_parse(tmp_path, manager):
+    """Linhas anexadas a um arquivo já carregado dão o mesmo DataFrame de um parse completo"""
+    base, appended = _append_csv()
+    _load(manager, base)
+    incremental = _load(manager, appended)
+    assert manager.frame_cache.get_info(manager.current_hash).get("appended_rows") == 20
+
+    full = _plain_load(tmp_path, appended)
+    _assert_same_frame(incremental, full)
+    assert incremental["cep"].astype(str).tail(2).tolist() == ["07777", "01234"]
+    _assert_describe_matches(manager.aggregate_profiler.describe(manager.aggregates), full)
+
+
+def test_merged_moments_keep_precision():
+    """Média grande e variância pequena (timestamps): a combinação de blocos não perde dígitos"""
+    from profile_aggregates import AggregateProfiler
+
+    values = 1.7e9 + np.random.default_rng(0).normal(size=30_000)
+    frame = pd.DataFrame({"ts": values})
+    profiler = AggregateProfiler()
+    merged = profiler.compute(frame.iloc[:10_000])
+    for start in (10_000, 20_000):
+        merged = profiler.merge(merged, profiler.compute(frame.iloc[start:start + 10_000]))
+    described = profiler.describe(merged)["ts"]
+    assert described["mean"] == pytest.approx(values.mean(), rel=1e-12)
+    assert described["std"] == pytest.approx(values.std(ddof=1), rel=1e-9)
+
+
+def _duplicated_frame(rows: int = 5_000) -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    return pd.DataFrame({
+        "id": rng.integers(0, 400, rows),
+        "cidade": pd.Categorical(rng.choice(["a", "b", "c"], rows)),
+        "valor": rng.integers(0, 3, rows).astype(float),
+    })
+
+
+def test_row_hash_index_matches_pandas():
+    """Duplicatas, grupos e deduplicação iguais aos do pandas"""
+    from row_hash_index import RowHashIndex
+
+    df = _duplicated_frame()
+    index = RowHashIndex.build(df)
+    np.testing.assert_array_equal(index.duplicated(), df.duplicated().to_numpy())
+    assert index.duplicate_count() == int(df.duplicated().sum())
+    np.testing.assert_array_equal(index.unique_positions(), np.flatnonzero(~df.duplicated().to_numpy()))
+    for group in index.duplicate_groups(limit=20):
+        assert len(group) > 1
+        assert len(df.iloc[group].drop_duplicates()) == 1
+
+
+def test_row_hash_index_append_after_downcast():
+    """Anexar linhas com tipos reduzidos dá os mesmos hashes de um índice recalculado"""
+    from row_hash_index import RowHashIndex
+
+    df = _duplicated_frame()
+    base = df.iloc[:4_000].astype({"id": "int16", "valor": "float32"})
+    appended = RowHashIndex.build(base).append(df.iloc[4_000:])
+    np.testing.assert_array_equal(appended.hashes, RowHashIndex.build(df).hashes)
+    with pytest.raises(ValueError):
+        RowHashIndex.build(base).append(df.iloc[4_000:].astype({"id": "float64"}))
+
+
+@pytest.mark.parametrize("distinct", [50, 5_000, 200_000])
+def test_hll_estimate_within_error(distinct):
+    """Estimativa de distintos dentro de 4 desvios padrão do erro relativo"""
+    from sketches import HyperLogLog
+
+    values = pd.Series([f"id-{i}" for i in range(distinct)] * 2)
+    sketch = HyperLogLog(12).add_series(values)
+    assert abs(sketch.estimate() - distinct) <= 4 * sketch.relative_error * distinct
+
+
+def test_hll_merge_is_union():
+    """Combinar sketches de blocos equivale a um sketch da coluna inteira"""
+    from sketches import HyperLogLog
+
+    values = pd.Series([f"cliente-{i % 30_000}" for i in range(90_000)])
+    blocks = [HyperLogLog(12).add_series(values.iloc[start:start + 20_000]) for start in range(0, 90_000, 20_000)]
+    merged = blocks[0]
+    for block in blocks[1:]:
+        merged = merged.merge(block)
+    whole = HyperLogLog(12).add_series(values)
+    np.testing.assert_array_equal(merged.registers, whole.registers)
+    assert HyperLogLog.from_dict(merged.to_dict()).estimate() == whole.estimate()
+    with pytest.raises(ValueError):
+        merged.merge(HyperLogLog(10))
+
+
+def test_parallel_profiler_matches_serial():
+    """describe e agregados calculados no pool de processos iguais aos calculados no processo atual"""
+    from parallel_profiler import ParallelColumnProfiler
+    from profile_aggregates import AggregateProfiler
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(20_000, 12)), columns=[f"s{i}" for i in range(12)])
+    df.iloc[::7, 3] = np.nan
+    df["codigo"] = rng.integers(0, 9, len(df)).astype("int8")
+    profiler = ParallelColumnProfiler(max_workers=2, min_columns=4, min_cells=1_000)
+    try:
+        assert profiler.should_use(len(df), len(df.columns))
+        described = profiler.describe(df)
+        assert described is not None
+        pd.testing.assert_frame_equal(described, df.describe(), check_exact=False, rtol=1e-9)
+
+        parallel = profiler.aggregates(df, 200)
+        serial = AggregateProfiler().compute(df)["columns"]
+        for col, info in parallel.items():
+            assert info["count"] == serial[col]["count"]
+            assert info["mean"] == pytest.approx(serial[col]["mean"], rel=1e-12, abs=1e-12)
+            assert info["m2"] == pytest.approx(serial[col]["m2"], rel=1e-12)
+            assert (info["min"], info["max"]) == (serial[col]["min"], serial[col]["max"])
+    finally:
+        profiler.shutdown()
+
+
+def test_filtered_profile_matches_pandas(manager):
+    """Perfil de um filtro por categoria (combinação de partições) igual ao perfil do recorte"""
+    rng = np.random.default_rng(0)
+    rows = 20_000
+    frame = pd.DataFrame({
+        "regiao": rng.choice(["norte", "sul", "leste", "oeste"], rows),
+        "valor": np.round(rng.normal(1_000, 50, rows), 2),
+        "qtd": rng.integers(0, 5, rows),
+        "loja": rng.choice(["p", "q", "r"], rows),
+    })
+    frame.loc[::9, "valor"] = np.nan
+    frame = pd.concat([frame, frame.iloc[:100]], ignore_index=True)
+    df = _load(manager, frame.to_csv(index=False))
+    assert "regiao" in manager.get_partition_columns(df)
+
+    values = ["norte", "sul"]
+    filtered = manager.get_filtered_profile("regiao", values)
+    assert manager._partitions
+    subset = df[df["regiao"].isin(values)]
+    assert filtered.n_rows == len(subset)
+    assert filtered.duplicates == int(subset.duplicated().sum())
+    pd.testing.assert_series_equal(filtered.missing, subset.isna().sum(), check_names=False)
+
+    summary = filtered.numeric_summary()
+    _assert_describe_matches(summary, subset)
+    for col in subset.select_dtypes("number").columns:
+        ordered = np.sort(subset[col].dropna().to_numpy(dtype=np.float64))
+        for label, probability in (("25%", 0.25), ("50%", 0.5), ("75%", 0.75)):
+            low = np.searchsorted(ordered, summary.loc[label, col], side="left") / len(ordered)
+            high = np.searchsorted(ordered, summary.loc[label, col], side="right") / len(ordered)
+            assert low - 0.05 <= probability <= high + 0.05
+
+    categorical = filtered.categorical_summary()
+    assert categorical["loja"]["unique_values"] == subset["loja"].nunique()
+    assert categorical["loja"]["most_common"] == subset["loja"].mode().iloc[0]
+
+
+def test_profile_store_round_trip(tmp_path):
+    """Perfil e correlação gravados voltam iguais; colunas diferentes ou arquivo corrompido são ignorados"""
+    from dataset_profile import ProfileEngine
+    from profile_store import ProfileStore
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "cidade": pd.Categorical(rng.choice(["a", "b", "c"], 5_000)),
+        "x": rng.normal(size=5_000),
+        "n": rng.integers(0, 100, 5_000).astype("int16"),
+        "quando": pd.date_range("2024-01-01", periods=5_000, freq="h"),
+    })
+    df.loc[::7, "x"] = np.nan
+    profile = ProfileEngine().build(df)
+    store = ProfileStore(str(tmp_path))
+    store.save_profile("abc", profile)
+    store.save_correlation("abc", "pearson", df[["x", "n"]].corr())
+
+    loaded = store.load_profile("abc", df)
+    assert loaded is not None
+    assert loaded.to_dict() == profile.to_dict()
+    pd.testing.assert_series_equal(loaded.dtypes, df.dtypes)
+    pd.testing.assert_frame_equal(loaded.numeric_summary(), profile.numeric_summary())
+    pd.testing.assert_frame_equal(store.load_correlation("abc", "pearson"), df[["x", "n"]].corr())
+    assert store.load_correlation("abc", "spearman") is None
+    assert store.load_profile("abc", df.astype({"n": "float64"})) is None
+
+    with open(store.path("abc"), "w", encoding="utf-8") as f:
+        f.write("{corrompido")
+    assert store.load_profile("abc", df) is None
+
+
+def test_stored_profiles_are_kept_per_mode(tmp_path):
+    """O perfil out-of-core (DuckDB) e o em memória do mesmo conteúdo são gravados separadamente"""
+    pytest.importorskip("duckdb")
+    content = "grupo,valor\n" + "".join(f"g{i % 4},{i * 0.5}\n" for i in range(2_000))
+
+    in_memory = _manager(tmp_path)
+    _load(in_memory, content)
+    assert not in_memory.get_profile().out_of_core
+
+    out_of_core = _manager(tmp_path)
+    _load(out_of_core, content, out_of_core=True)
+    assert out_of_core.current_hash == in_memory.current_hash
+    profile = out_of_core.get_profile()
+    assert profile.out_of_core
+    assert profile.n_rows == 2_000
+
+    store = in_memory.profile_store
+    key = in_memory.current_hash
+    assert store.path(key, "memory") != store.path(key, "out_of_core")
+    assert not store.load_profile(key, in_memory.current_df, "memory").out_of_core
+    assert store.load_profile(key, out_of_core.current_df, "out_of_core").out_of_core
+
+
+def _backend_frame(rows: int = 3_000) -> pd.DataFrame:
+    """Numéricas com ausentes, texto repetitivo e linhas duplicadas, para comparar DuckDB e pandas"""
+    rng = np.random.default_rng(8)
+    df = pd.DataFrame({
+        "valor": rng.normal(50, 10, rows).round(3),
+        "qtd": rng.integers(0, 100, rows).astype("float64"),
+        "grupo": rng.choice(["norte", "sul", "leste"], rows, p=[0.5, 0.3, 0.2]),
+    })
+    df.loc[rng.choice(rows, 150, replace=False), "valor"] = np.nan
+    df.loc[rng.choice(rows, 40, replace=False), "grupo"] = np.nan
+    return pd.concat([df, df.iloc[:25]], ignore_index=True)
+
+
+@pytest.fixture
+def backend_and_frame(tmp_path):
+    pytest.importorskip("duckdb")
+    from query_backend import DuckDBBackend
+
+    df = _backend_frame()
+    path = tmp_path / "dados.csv"
+    df.to_csv(path, index=False)
+    backend = DuckDBBackend(str(path))
+    yield backend, df
+    backend.close()
+
+
+def test_backend_summaries_match_pandas(backend_and_frame):
+    backend, df = backend_and_frame
+    numeric = ["valor", "qtd"]
+    assert backend.row_count() == len(df)
+    assert backend.numeric_columns() == numeric
+    assert backend.categorical_columns() == ["grupo"]
+    pd.testing.assert_series_equal(backend.null_counts(), df.isna().sum(), check_dtype=False)
+    assert backend.duplicate_count() == df.duplicated().sum()
+
+    summary = backend.numeric_summary()
+    _assert_describe_matches(summary, df)
+    # Quartis aproximados (t-digest): próximos dos exatos
+    quartiles = df[numeric].quantile([0.25, 0.5, 0.75])
+    np.testing.assert_allclose(summary.loc[["25%", "50%", "75%"]].to_numpy(), quartiles.to_numpy(), rtol=0.02)
+
+    categorical = backend.categorical_summary()["grupo"]
+    assert categorical == {"unique_values": 3, "most_common": "norte", "missing_values": df["grupo"].isna().sum()}
+    pd.testing.assert_series_equal(backend.value_counts("grupo", limit=2),
+                                   df["grupo"].value_counts().head(2), check_names=False, check_dtype=False,
+                                   check_index_type=False)
+
+    histogram = backend.histogram("qtd", bins=10)
+    counts, edges = np.histogram(df["qtd"].dropna(), bins=10)
+    np.testing.assert_array_equal(histogram["contagem"], counts)
+    np.testing.assert_allclose(histogram["inicio"], edges[:-1])
+    pd.testing.assert_frame_equal(backend.histogram("qtd", bins=10, bounds=(edges[0], edges[-1])), histogram)
+
+    pd.testing.assert_frame_equal(backend.correlation_matrix(), df[numeric].corr(), check_exact=False, rtol=1e-9)
+
+
+def test_backend_types_cover_whole_file(tmp_path):
+    """Coluna numérica na amostra do DuckDB e texto no fim do arquivo continua consultável"""
+    pytest.importorskip("duckdb")
+    from query_backend import DuckDBBackend
+
+    rows = 30_000
+    df = pd.DataFrame({"codigo": [str(i) for i in range(rows)], "valor": np.arange(rows) * 0.5})
+    df.loc[rows - 5, "codigo"] = "A1"
+    path = tmp_path / "dados.csv"
+    df.to_csv(path, index=False)
+
+    backend = DuckDBBackend(str(path))
+    try:
+        assert backend.numeric_columns() == ["valor"]
+        assert backend.categorical_summary()["codigo"]["missing_values"] == 0
+        assert backend.numeric_summary().loc["count", "valor"] == rows
+    finally:
+        backend.close()
+    projected = DuckDBBackend(str(path), columns=["codigo"])
+    try:
+        assert projected.columns() == ["codigo"]
+        assert projected.value_counts("codigo", limit=rows).sum() == rows
+    finally:
+        projected.close()
+
+
+def test_out_of_core_profile_matches_plain_load(tmp_path):
+    pytest.importorskip("duckdb")
+    original = _backend_frame()
+    content = original.to_csv(index=False)
+    expected = _plain_load(tmp_path, content)
+
+    manager = _manager(tmp_path / "out_of_core")
+    sample = _load(manager, content, out_of_core=True)
+    assert manager.get_query_backend(sample) is not None
+    profile = manager.get_profile()
+    assert profile.out_of_core
+    assert profile.n_rows == len(expected)
+    assert profile.duplicates == expected.duplicated().sum()
+    pd.testing.assert_series_equal(profile.missing, expected.isna().sum(), check_dtype=False)
+    # A carga em memória guarda "valor" em float32; o DuckDB lê o texto do arquivo em float64
+    _assert_describe_matches(profile.numeric_summary(), original)
+    assert profile.categorical_summary(["grupo"])["grupo"]["most_common"] == "norte"
+    assert profile.top_values("grupo").tolist() == expected["grupo"].value_counts().tolist()
+
+
+def test_profile_keeps_histograms_and_top_values(tmp_path):
+    """Histogramas e valores mais frequentes batem com NumPy/pandas e sobrevivem à gravação"""
+    from dataset_profile import ProfileEngine, HISTOGRAM_BINS, TOP_VALUES_LIMIT
+    from profile_store import ProfileStore
+
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "x": rng.normal(size=4_000),
+        "n": rng.integers(0, 50, 4_000).astype("int16"),
+        "constante": np.full(4_000, 2.5),
+        "cidade": rng.choice([f"c{i}" for i in range(25)], 4_000),
+    })
+    df.loc[::9, "x"] = np.nan
+    profile = ProfileEngine().build(df)
+
+    for col in ["x", "n"]:
+        values = df[col].dropna().to_numpy(dtype=np.float64)
+        hist = profile.histogram(col)
+        expected, edges = np.histogram(values, bins=HISTOGRAM_BINS)
+        np.testing.assert_array_equal(hist["contagem"].to_numpy(), expected)
+        np.testing.assert_allclose(hist["inicio"].to_numpy(), edges[:-1])
+        assert hist["contagem"].sum() == len(values)
+    assert profile.histogram("constante")["contagem"].sum() == len(df)
+    assert profile.histogram("cidade") is None
+
+    top = profile.top_values("cidade")
+    pd.testing.assert_series_equal(top, df["cidade"].value_counts().head(TOP_VALUES_LIMIT),
+                                   check_names=False, check_index_type=False)
+    assert profile.top_values("x") is None
+
+    store = ProfileStore(str(tmp_path))
+    store.save_profile("abc", profile)
+    loaded = store.load_profile("abc", df)
+    assert loaded.to_dict() == profile.to_dict()
+    pd.testing.assert_frame_equal(loaded.histogram("x"), profile.histogram("x"))
+    pd.testing.assert_series_equal(loaded.top_values("cidade"), top, check_index_type=False)
+
+
+def test_reload_reuses_stored_profile(tmp_path, monkeypatch):
+    """Um novo upload do mesmo conteúdo usa o perfil gravado, sem recalcular"""
+    frame = pd.DataFrame({"cidade": list("abcab") * 400, "x": np.arange(2_000) / 7})
+    content = frame.to_csv(index=False)
+    first = _manager(tmp_path)
+    _load(first, content)
+    expected = first.get_profile().to_dict()
+
+    second = _manager(tmp_path)
+    _load(second, content)
+    monkeypatch.setattr(second.profile_engine, "build", lambda *args, **kwargs: pytest.fail("perfil recalculado"))
+    assert second.is_profile_ready()
+    assert second.get_profile().to_dict() == expected
+
+
+@pytest.mark.parametrize("n_columns", [6, 80])
+def test_nullity_mask_matches_pandas(n_columns):
+    """Contagens, ausentes por registro e padrões de ausência iguais aos calculados com ``isna()``"""
+    from nullity_mask import NullityMask
+
+    rng = np.random.default_rng(n_columns)
+    rows = 3_001
+    df = pd.DataFrame({f"c{i}": rng.normal(size=rows) for i in range(n_columns)})
+    df["texto"] = rng.choice(["a", "b", None], rows)
+    for position in range(0, n_columns, 2):
+        df.iloc[rng.random(rows) < 0.05, position] = np.nan
+    df.iloc[:50, [0, n_columns - 2]] = np.nan
+
+    mask = NullityMask.build(df)
+    missing = df.isna()
+    pd.testing.assert_series_equal(mask.counts(), missing.sum(), check_names=False)
+    assert mask.total == int(missing.to_numpy().sum())
+    np.testing.assert_array_equal(mask.row_counts(), missing.sum(axis=1).to_numpy())
+    assert mask.rows_with_missing() == int(missing.any(axis=1).sum())
+    np.testing.assert_array_equal(mask.column("texto"), missing["texto"].to_numpy())
+    assert mask.nbytes <= missing.to_numpy().nbytes / 8 + len(df.columns)
+
+    expected = (
+        missing[missing.any(axis=1)]
+        .apply(lambda row: ", ".join(row.index[row]), axis=1)
+        .value_counts()
+    )
+    patterns = mask.patterns(limit=None)
+    assert patterns["registros"].sum() == mask.rows_with_missing()
+    assert dict(zip(patterns["colunas_ausentes"], patterns["registros"])) == expected.to_dict()
+    assert patterns["registros"].is_monotonic_decreasing
+    assert len(mask.patterns(limit=3)) == 3
+
+
+def test_load_settings_change_cache_key(manager):
+    """Mudar dtypes Arrow ou a redução de tipos gera outra chave de cache e um novo parse"""
+    pytest.importorskip("pyarrow")
+    content = pd.DataFrame({"n": np.arange(1_000) % 50, "nome": list("abcd") * 250}).to_csv(index=False)
+    plain = _load(manager, content)
+    plain_hash = manager.current_hash
+    assert not isinstance(plain["n"].dtype, pd.ArrowDtype)
+
+    manager.arrow_dtypes = True
+    arrow = _load(manager, content)
+    assert manager.current_hash != plain_hash
+    assert isinstance(arrow["n"].dtype, pd.ArrowDtype)
+
+    manager.arrow_dtypes = False
+    manager.optimize_memory = False
+    unoptimized = _load(manager, content)
+    assert manager.current_hash != plain_hash
+    assert unoptimized["n"].dtype == np.int64
+
+    manager.optimize_memory = True
+    assert _load(manager, content) is plain
+    assert manager.current_hash == plain_hash
+
+    manager.memory_optimizer.float32_rtol = 0.0
+    _load(manager, content)
+    assert manager.current_hash != plain_hash
+
+
+@pytest.mark.parametrize("rtol", [1e-7, 1e-6, 1e-5])
+def test_float32_downcast_within_relative_tolerance(rtol):
+    """Floats viram float32 quando o erro relativo do round-trip cabe em ``float32_rtol``"""
+    from memory_optimizer import MemoryOptimizer
+
+    rng = np.random.default_rng(5)
+    values = rng.lognormal(sigma=4, size=10_000) * rng.choice([-1, 1], 10_000)
+    values[::13] = np.nan
+    df, report = MemoryOptimizer(float32_rtol=rtol).optimize(pd.DataFrame({"x": values}))
+
+    assert df["x"].dtype == np.float32
+    assert report["x"]["bytes_after"] * 2 == report["x"]["bytes_before"]
+    restored = df["x"].to_numpy(dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(restored), np.isnan(values))
+    np.testing.assert_allclose(restored, values, rtol=rtol)
+
+
+@pytest.mark.parametrize("values", [
+    [0.1, 0.2, 1e300],      # estoura o float32
+    [0.1, 0.2, 1e-320],     # subnormal do float64 vira zero no float32
+])
+def test_float32_downcast_keeps_out_of_range_columns(values):
+    from memory_optimizer import MemoryOptimizer
+
+    df, _ = MemoryOptimizer().optimize(pd.DataFrame({"x": values}))
+    assert df["x"].dtype == np.float64
+    assert df["x"].tolist() == values
+
+
+def test_float32_downcast_exact_when_tolerance_is_zero():
+    from memory_optimizer import MemoryOptimizer
+
+    inexact = pd.DataFrame({"x": [0.1, 0.2, 0.3]})
+    exact = pd.DataFrame({"x": [0.5, 0.25, np.nan, 1024.0]})
+    assert MemoryOptimizer(float32_rtol=0.0).optimize(inexact)[0]["x"].dtype == np.float64
+    assert MemoryOptimizer(float32_rtol=0.0).optimize(exact)[0]["x"].dtype == np.float32
+    assert MemoryOptimizer().optimize(inexact.copy())[0]["x"].dtype == np.float32
+
+
+@pytest.mark.parametrize("values, expected", [
+    ([0, 1, 127], np.int8),
+    ([-129, 0, 5], np.int16),
+    ([0, 70_000], np.int32),
+    ([0, 2**40], np.int64),
+])
+def test_integer_downcast_to_smallest_type(values, expected):
+    from memory_optimizer import MemoryOptimizer
+
+    df, report = MemoryOptimizer().optimize(pd.DataFrame({"n": np.array(values, dtype=np.int64)}))
+    assert df["n"].dtype == expected
+    assert df["n"].tolist() == values
+    assert report["n"]["dtype_after"] == np.dtype(expected).name
+
+
+def test_category_conversion_follows_unique_ratio():
+    from memory_optimizer import MemoryOptimizer
+
+    df = pd.DataFrame({
+        "repetido": ["sp", "rj", "sp", None] * 50,
+        "unico": [f"id{i}" for i in range(200)],
+        "vazio": [None] * 200,
+        "flag": [True, False] * 100,
+    })
+    optimized, report = MemoryOptimizer(category_max_ratio=0.5).optimize(df.copy())
+    assert optimized["repetido"].dtype == "category"
+    assert optimized["repetido"].isna().sum() == 50
+    assert optimized["unico"].dtype == object
+    assert optimized["vazio"].dtype == object
+    assert optimized["flag"].dtype == bool
+    assert report["unico"]["bytes_after"] == report["unico"]["bytes_before"]
+
+    table = MemoryOptimizer().report_frame(report).set_index("coluna")
+    saved = table.loc["repetido"]
+    assert saved["economia_bytes"] == saved["bytes_antes"] - saved["bytes_depois"] > 0
+    assert table.loc["unico", "economia_pct"] == 0.0
+
+
+def test_downcast_numeric_leaves_text_untouched():
+    """A redução bloco a bloco mexe só nas numéricas; texto vira category apenas após a concatenação"""
+    from memory_optimizer import MemoryOptimizer
+
+    df = pd.DataFrame({"n": np.arange(100, dtype=np.int64), "x": np.linspace(0, 1, 100),
+                       "cidade": ["sp"] * 100, "flag": [True] * 100})
+    result = MemoryOptimizer().downcast_numeric(df)
+    assert result["n"].dtype == np.int8
+    assert result["x"].dtype == np.float32
+    assert result["cidade"].dtype == object
+    assert result["flag"].dtype == bool
+
+
+def test_profile_includes_arrow_string_columns():
+    """Colunas de texto com dtypes Arrow (``string[pyarrow]``) entram nas categóricas do perfil"""
+    pytest.importorskip("pyarrow")
+    from dataset_profile import ProfileEngine
+
+    content = "cidade,valor\nsp,1\nrj,2\nsp,3\n"
+    df = pd.read_csv(io.StringIO(content), dtype_backend="pyarrow")
+    profile = ProfileEngine().build(df)
+    assert profile.categorical_columns == ["cidade"]
+    assert profile.numeric_columns == ["valor"]
+    assert profile.categorical_summary()["cidade"]["unique_values"] == 2
+    assert profile.categorical_summary()["cidade"]["most_common"] == "sp"
+
+
+def _cities_csv(delimiter: str = ",", rows: int = 300) -> str:
+    cities = ["São Paulo", "Brasília", "Maceió", "Belém"]
+    lines = [delimiter.join(["cidade", "valor", "descricao"])]
+    lines += [delimiter.join([cities[i % 4], f"{i}.5", f"item {i} à venda"]) for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+@pytest.mark.parametrize("encoding, delimiter, expected_encoding", [
+    ("utf-8", ",", "utf-8"),
+    ("utf-8-sig", ";", "utf-8-sig"),
+    ("cp1252", "\t", "cp1252"),
+    ("latin-1", "|", "cp1252"),  # cp1252 decodifica os mesmos acentos do latin-1
+])
+def test_sniff_encoding_and_delimiter(manager, encoding, delimiter, expected_encoding):
+    """Encoding e delimitador vêm de uma amostra de bytes; o parse usa os dois uma única vez"""
+    content = _cities_csv(delimiter).encode(encoding)
+    assert manager._sniff_csv_format(_Upload(content, "dados.csv")) == (expected_encoding, delimiter)
+
+    df = _load(manager, content)
+    assert list(df.columns) == ["cidade", "valor", "descricao"]
+    assert set(df["cidade"].astype(str)) == {"São Paulo", "Brasília", "Maceió", "Belém"}
+    assert manager.current_delimiter == delimiter
+
+
+def test_sniff_tolerates_character_cut_at_sample_end(manager):
+    """Um caractere multibyte cortado no fim da amostra não faz o UTF-8 ser descartado"""
+    content = _cities_csv().encode("utf-8")
+    cut = content.index("ã".encode("utf-8")) + 1
+    manager.sniff_sample_bytes = cut
+    assert manager._sniff_csv_format(_Upload(content, "dados.csv")) == ("utf-8", ",")
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_invalid_byte_after_sample_falls_back_to_latin1(manager, engine):
+    """Byte inválido em UTF-8 depois da amostra: o parse é refeito em latin-1 sem perder linhas"""
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    content = _cities_csv(rows=2_000).encode("utf-8") + "Goiânia,1.5,fim\n".encode("latin-1")
+    manager.parser_engine = engine
+    manager.sniff_sample_bytes = 4 * 1024
+    df = _load(manager, content)
+    assert len(df) == 2_001
+    assert manager.current_encoding == "latin-1"
+    assert df["cidade"].astype(str).iloc[-1] == "Goiânia"
+
+
+def test_semicolon_files_use_decimal_comma(manager):
+    """CSV com ';' tem os números lidos com vírgula decimal e ponto de milhar"""
+    content = "produto;preco\n" + "".join(f"p{i};{i}.234,5{i % 10}\n" for i in range(1, 200))
+    df = _load(manager, content)
+    assert df["preco"].dtype.kind == "f"
+    assert df["preco"].iloc[0] == pytest.approx(1234.51)
+    assert df["preco"].iloc[-1] == pytest.approx(199234.59)
+
+
+def _compress(content: bytes, compression: str, members=("dados.csv",)) -> bytes:
+    """Comprime ``content``; no zip, ele é gravado no último de ``members`` (os demais ficam com texto)"""
+    import bz2
+    import gzip
+    import zipfile
+
+    if compression == "gzip":
+        return gzip.compress(content)
+    if compression == "bz2":
+        return bz2.compress(content)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for member in members[:-1]:
+            archive.writestr(member, b"outro arquivo")
+        archive.writestr(members[-1], content)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zip", "bz2"])
+def test_uncompressed_size_of_uploads(compression):
+    """Tamanho descomprimido exato para gzip/zip e estimado para bz2, sem mover a posição do upload"""
+    from compressed_upload import ESTIMATED_COMPRESSION_RATIO, uncompressed_size
+
+    content = pd.DataFrame({"x": np.arange(50_000)}).to_csv(index=False).encode()
+    upload = _Upload(_compress(content, compression), "dados.csv")
+    expected = len(content) if compression != "bz2" else upload.size * ESTIMATED_COMPRESSION_RATIO
+    assert uncompressed_size(upload) == expected
+    assert upload.tell() == 0
+    assert uncompressed_size(_Upload(content, "dados.csv")) == len(content)
+
+
+def test_compressed_upload_uses_content_size_for_chunking(manager, monkeypatch):
+    """A leitura em blocos é decidida pelo tamanho descomprimido, não pelo do .gz"""
+    content = pd.DataFrame({"x": np.arange(50_000)}).to_csv(index=False).encode()
+    compressed = _compress(content, "gzip")
+    manager.chunked_threshold_bytes = len(compressed) * 2
+    manager.chunk_size = 10_000
+    chunked_calls = []
+    read_chunked = manager._read_csv_chunked
+    monkeypatch.setattr(manager, "_read_csv_chunked",
+                        lambda *args, **kwargs: chunked_calls.append(1) or read_chunked(*args, **kwargs))
+    df = _load(manager, compressed, "dados.csv.gz")
+    assert chunked_calls
+    assert len(df) == 50_000
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zip", "bz2", None])
+def test_detect_compression_by_magic_bytes(compression):
+    from compressed_upload import detect_compression
+
+    content = b"a,b\n1,2\n"
+    upload = _Upload(_compress(content, compression) if compression else content, "dados.csv")
+    upload.seek(3)
+    assert detect_compression(upload) == compression
+    assert upload.tell() == 0
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zip", "bz2"])
+def test_decompressed_upload_restarts_on_seek_zero(compression):
+    from compressed_upload import DecompressedUpload
+
+    content = _cities_csv(rows=2_000).encode("utf-8")
+    upload = _Upload(_compress(content, compression), "dados.csv.gz")
+    stream = DecompressedUpload(upload, compression)
+    assert stream.read(100) == content[:100]
+    assert 0 < stream.tell() <= upload.size
+    assert stream.seek(0) == 0
+    buffer = bytearray(50)
+    assert stream.readinto(buffer) == 50 and bytes(buffer) == content[:50]
+    stream.seek(0)
+    assert stream.read() == content
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(10)
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(0, os.SEEK_END)
+    stream.close()
+    assert not upload.closed
+
+
+@pytest.mark.parametrize("members, expected", [
+    (("LEIAME.txt", "dados.csv"), b"csv"),
+    (("dados.csv", "LEIAME.txt"), b"outro arquivo"),
+    (("LEIAME.txt", "notas.txt"), b"outro arquivo"),
+])
+def test_zip_reads_first_csv_member(members, expected):
+    from compressed_upload import open_upload
+
+    content = b"csv"
+    stream = open_upload(_Upload(_compress(content, "zip", members), "dados.zip"))
+    assert stream.read() == expected
+
+
+@pytest.mark.parametrize("compression, name", [("gzip", "dados.csv.gz"), ("zip", "dados.zip"), ("bz2", "dados.csv.bz2")])
+def test_compressed_load_matches_plain_load(tmp_path, manager, compression, name):
+    content = _cities_csv(delimiter=";", rows=1_500).encode("latin-1")
+    expected = _plain_load(tmp_path, content)
+    df = _load(manager, _compress(content, compression), name)
+    _assert_same_frame(df, expected)
+    assert manager.current_encoding == "cp1252" and manager.current_delimiter == ";"
+    _assert_same_frame(_load(_manager(tmp_path / "blocos"), _compress(content, compression), name, chunked=True),
+                       expected)
+
+
+def _infer_and_apply(values, decimal_hint=None, name="coluna"):
+    """Esquema e coluna convertida de uma coluna de texto"""
+    from type_inference import TypeInferenceEngine
+
+    frame = pd.DataFrame({name: pd.Series(values, dtype=object)})
+    engine = TypeInferenceEngine()
+    schema = engine.infer_schema(frame, decimal_hint)
+    return schema[name], engine.apply_schema(frame, schema)[name]
+
+
+@pytest.mark.parametrize("values, decimal, expected", [
+    (["1.234,56", "7,5", "-3,25", "10"], ",", [1234.56, 7.5, -3.25, 10.0]),
+    (["1,234.56", "7.5", "-3.25", "1e3"], ".", [1234.56, 7.5, -3.25, 1000.0]),
+    (["R$ 1.234,56", "R$ 0,99", "-R$ 5,00", "R$10"], ",", [1234.56, 0.99, -5.0, 10.0]),
+    (["$1,234.56", "$ 0.99", "-$5.00", "$10"], ".", [1234.56, 0.99, -5.0, 10.0]),
+])
+def test_infer_locale_decimals(values, decimal, expected):
+    """Vírgula ou ponto decimal (com milhar e moeda) detectados na amostra e aplicados na coluna"""
+    info, converted = _infer_and_apply(values * 50)
+    assert (info["inferred_type"], info["decimal"]) == ("numeric", decimal)
+    np.testing.assert_allclose(converted.to_numpy(dtype=np.float64), np.tile(expected, 50))
+
+
+@pytest.mark.parametrize("hint", [",", "."])
+def test_infer_ambiguous_decimal_uses_hint(hint):
+    """"1,250" serve aos dois formatos: vale o separador sugerido pelo delimitador do arquivo"""
+    info, converted = _infer_and_apply(["1,250", "2,500", "3,750"] * 50, decimal_hint=hint)
+    assert info["decimal"] == hint
+    assert converted.iloc[0] == (1.25 if hint == "," else 1250.0)
+
+
+@pytest.mark.parametrize("values, fmt, first", [
+    (["03/04/2024", "15/12/2023", "01/01/2024"], "%d/%m/%Y", pd.Timestamp(2024, 4, 3)),
+    (["03/04/2024 08:30:00", "15/12/2023 23:59:59"], "%d/%m/%Y %H:%M:%S", pd.Timestamp(2024, 4, 3, 8, 30)),
+    (["2024-04-03", "2023-12-15"], "%Y-%m-%d", pd.Timestamp(2024, 4, 3)),
+    (["2024-04-03T08:30:00", "2023-12-15T23:59:59"], "%Y-%m-%dT%H:%M:%S", pd.Timestamp(2024, 4, 3, 8, 30)),
+    (["12/31/2023", "04/13/2024"], "%m/%d/%Y", pd.Timestamp(2023, 12, 31)),
+])
+def test_infer_date_formats(values, fmt, first):
+    """Formato detectado na amostra (dia antes do mês quando ambíguo) e aplicado de uma vez"""
+    info, converted = _infer_and_apply(values * 50)
+    assert (info["inferred_type"], info["format"]) == ("datetime", fmt)
+    assert pd.api.types.is_datetime64_any_dtype(converted)
+    assert converted.iloc[0] == first
+    assert converted.notna().all()
+
+
+def test_date_format_cache_is_tried_first():
+    """O formato já visto para a coluna é testado primeiro nas próximas cargas"""
+    from type_inference import TypeInferenceEngine
+
+    engine = TypeInferenceEngine()
+    engine.infer_schema(pd.DataFrame({"quando": ["2024-04-03", "2023-12-15"] * 50}))
+    assert engine.datetime_format_cache["quando"] == "%Y-%m-%d"
+    # Ambíguo entre dia/mês e mês/dia: o formato guardado para a coluna decide
+    engine.datetime_format_cache["quando"] = "%m/%d/%Y"
+    schema = engine.infer_schema(pd.DataFrame({"quando": ["03/04/2024", "05/06/2024"] * 50}))
+    assert schema["quando"]["format"] == "%m/%d/%Y"
+
+
+@pytest.mark.parametrize("values, expected_dtype", [
+    (["sim", "não", "Sim", "NAO"], "bool"),
+    (["true", "false", "TRUE", "False"], "bool"),
+    (["s", "n", "S", None], "boolean"),
+])
+def test_infer_booleans(values, expected_dtype):
+    """Sim/não, true/false e s/n (sem diferenciar maiúsculas) viram booleanos; ausentes usam ``boolean``"""
+    info, converted = _infer_and_apply(values * 50)
+    assert info["inferred_type"] == "boolean"
+    assert str(converted.dtype) == expected_dtype
+    assert converted.iloc[:3].tolist() == [True, False, True]
+
+
+def test_mostly_invalid_column_stays_text():
+    """Amostra numérica, mas a coluna inteira perde mais que o limite na conversão: fica texto"""
+    values = [str(i) for i in range(2_000)] + [f"código {i}" for i in range(300)]
+    info, converted = _infer_and_apply(values)
+    assert info["inferred_type"] == "text"
+    assert converted.iloc[-1] == "código 299"
+
+
+def test_repetitive_text_becomes_category():
+    info, converted = _infer_and_apply(["norte", "sul", "leste"] * 100)
+    assert info["inferred_type"] == "category"
+    assert isinstance(converted.dtype, pd.CategoricalDtype)
+
+
+def _monthly_files():
+    """Três exportações com colunas e tipos divergentes (coluna extra, inteiro/decimal, nomes repetidos)"""
+    rng = np.random.default_rng(6)
+    january = pd.DataFrame({"loja": rng.choice(["a", "b"], 400), "qtd": rng.integers(0, 9, 400)})
+    february = pd.DataFrame({"loja": rng.choice(["b", "c"], 300), "qtd": rng.integers(0, 9, 300) + 0.5,
+                             "desconto": rng.random(300)})
+    march = pd.DataFrame({"loja": rng.choice(["a", "c"], 200), "qtd": rng.integers(0, 9, 200)})
+    return [("vendas.csv", january), ("fevereiro.csv", february), ("vendas.csv", march)]
+
+
+def test_multiple_files_combine_in_upload_order(manager, monkeypatch):
+    """Arquivos lidos em paralelo entram na ordem do upload, com origem, união de colunas e tipos promovidos"""
+    import time
+
+    from data_manager import SOURCE_FILE_COLUMN
+
+    files = _monthly_files()
+    load_single = manager._load_single_upload
+    started = []
+
+    def slow_first(file, *args):
+        started.append(file.name)
+        if len(started) == 1:
+            time.sleep(0.2)  # o primeiro arquivo termina por último
+        return load_single(file, *args)
+
+    monkeypatch.setattr(manager, "_load_single_upload", slow_first)
+    manager.max_parallel_files = 3
+    df = _load_files(manager, [(name, frame.to_csv(index=False)) for name, frame in files])
+
+    assert len(started) == 3
+    assert len(df) == 900
+    assert list(df[SOURCE_FILE_COLUMN].cat.categories) == ["vendas.csv", "fevereiro.csv", "vendas.csv (3)"]
+    assert df[SOURCE_FILE_COLUMN].value_counts(sort=False).tolist() == [400, 300, 200]
+    assert df["qtd"].dtype.kind == "f"
+    expected_qtd = np.concatenate([frame["qtd"].to_numpy(dtype=np.float64) for _, frame in files])
+    np.testing.assert_allclose(df["qtd"].to_numpy(dtype=np.float64), expected_qtd)
+    assert df["desconto"].isna().sum() == 600
+    assert set(df["loja"].astype(str)) == {"a", "b", "c"}
+    _assert_describe_matches(manager.aggregate_profiler.describe(manager.aggregates), df)
+
+    # Mesmos arquivos de novo: DataFrame combinado vem do cache, sem novo parse
+    monkeypatch.setattr(manager, "_load_single_upload", lambda *args: pytest.fail("arquivo relido"))
+    again = _load_files(manager, [(name, frame.to_csv(index=False)) for name, frame in files])
+    assert again is df
+
+
+def test_multiple_files_without_combining_load_first(manager):
+    files = _monthly_files()
+    manager.combine_multiple_files = False
+    df = _load_files(manager, [(name, frame.to_csv(index=False)) for name, frame in files])
+    assert len(df) == 400
+    assert manager.current_filename == "vendas.csv"
+
+
+def _mixed_frame(rows: int = 30_000) -> pd.DataFrame:
+    """Tipos variados, com colunas cujo conteúdo muda depois dos primeiros blocos"""
+    rng = np.random.default_rng(1)
+    frame = pd.DataFrame({
+        "id": np.arange(rows),
+        "valor": np.round(rng.normal(50, 5, rows), 2),
+        "cidade": rng.choice(["sp", "rj", "bh"], rows),
+        "data": pd.date_range("2024-01-01", periods=rows, freq="h").strftime("%d/%m/%Y %H:%M"),
+        "ativo": rng.choice(["sim", "não"], rows),
+        # Numérico até o fim, com um código inválido: vira ausente nos dois modos
+        "codigo": [str(i) for i in range(rows - 3)] + ["A1", str(rows), str(rows + 1)],
+        # Números no primeiro bloco e texto depois: a coluna inteira fica texto
+        "texto": [str(i) for i in range(rows // 3)] + [f"X{i}" for i in range(rows - rows // 3)],
+    })
+    frame.loc[::11, "valor"] = np.nan
+    return frame
+
+
+def test_chunked_load_matches_plain_load(tmp_path, manager):
+    """A leitura em blocos dá o mesmo DataFrame e o mesmo esquema da leitura completa"""
+    content = _mixed_frame().to_csv(index=False)
+    manager.chunk_size = 10_000
+    chunked = _load(manager, content, chunked=True)
+    chunked_schema = {col: info["inferred_type"] for col, info in manager.inferred_schema.items()}
+
+    reference = _manager(tmp_path / "referencia")
+    full = _load(reference, content)
+    _assert_same_frame(chunked, full)
+    assert chunked_schema == {col: info["inferred_type"] for col, info in reference.inferred_schema.items()}
+    assert chunked_schema["texto"] == "text"
+    assert chunked["texto"].head(2).tolist() == ["0", "1"]
+    assert chunked["codigo"].isna().sum() == 1
+    _assert_describe_matches(manager.aggregate_profiler.describe(manager.aggregates), full)
+
+
+def test_chunked_load_switches_on_size(manager, monkeypatch):
+    """Sem ``chunked`` explícito, a leitura em blocos é usada a partir de ``chunked_threshold_bytes``"""
+    content = _mixed_frame(5_000).to_csv(index=False).encode("utf-8")
+    calls = []
+    read_chunked = manager._read_csv_chunked
+    monkeypatch.setattr(manager, "_read_csv_chunked",
+                        lambda *args, **kwargs: calls.append(1) or read_chunked(*args, **kwargs))
+    manager.chunked_threshold_bytes = len(content) + 1
+    _load(manager, content)
+    assert not calls
+
+    # Outro conteúdo (o mesmo viria do cache de DataFrames, sem parse)
+    larger = _mixed_frame(6_000).to_csv(index=False).encode("utf-8")
+    manager.chunked_threshold_bytes = len(larger)
+    manager.chunk_size = 1_000
+    assert len(_load(manager, larger)) == 6_000
+    assert calls
+
+
+def test_chunked_load_builds_aggregates_per_chunk(tmp_path, manager, monkeypatch):
+    """Na leitura em blocos os agregados vêm de cada bloco e coincidem com os da leitura inteira"""
+    rng = np.random.default_rng(3)
+    rows = 25_000
+    frame = pd.DataFrame({
+        "valor": np.round(rng.normal(100, 10, rows), 3),
+        "cliente": [f"c{i}" for i in rng.integers(0, 3_000, rows)],
+        "vazia": [np.nan] * rows,
+    })
+    content = frame.to_csv(index=False)
+    manager.chunk_size = 10_000
+    sizes = []
+    compute = manager.aggregate_profiler.compute
+    monkeypatch.setattr(manager.aggregate_profiler, "compute",
+                        lambda df: sizes.append(len(df)) or compute(df))
+    chunked = _load(manager, content, chunked=True)
+    assert max(sizes) <= manager.chunk_size
+    monkeypatch.undo()
+
+    full = _plain_load(tmp_path, content)
+    _assert_same_frame(chunked, full)
+    aggregates = manager.aggregates
+    assert list(aggregates["columns"]) == [str(col) for col in full.columns]
+    _assert_describe_matches(manager.aggregate_profiler.describe(aggregates), full)
+    distinct = manager.aggregate_profiler.distinct_sketches(aggregates)
+    assert set(distinct) == {"cliente"}
+    assert distinct["cliente"].estimate() == pytest.approx(full["cliente"].nunique(), rel=0.05)
+
+
+def test_reconcile_recomputes_changed_columns():
+    """Colunas removidas saem dos agregados e colunas que mudaram de tipo são recalculadas"""
+    from profile_aggregates import AggregateProfiler
+
+    profiler = AggregateProfiler()
+    blocks = profiler.merge(profiler.compute(pd.DataFrame({"a": [1.0, 2.0], "b": [1, 2], "c": [np.nan] * 2})),
+                            profiler.compute(pd.DataFrame({"a": [3.0], "b": [3], "c": [np.nan]})))
+    final = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": ["1", "2", "x"]})
+    reconciled = profiler.reconcile(blocks, final)
+    assert list(reconciled["columns"]) == ["a", "b"]
+    assert reconciled["columns"]["a"] == blocks["columns"]["a"]
+    assert profiler.matches(reconciled, "b", final["b"])
+    assert profiler.distinct_sketches(reconciled)["b"].estimate() == 3
+
+
+@pytest.fixture
+def numeric_frame_with_gaps():
+    """Colunas numéricas correlacionadas com ausentes em padrões diferentes e uma coluna constante"""
+    rng = np.random.default_rng(0)
+    rows = 4_000
+    df = pd.DataFrame(rng.normal(size=(rows, 4)), columns=["a", "b", "c", "d"])
+    df["b"] += df["a"]
+    df["e"] = np.round(df["c"])
+    df["constante"] = 1.0
+    df.loc[rng.random(rows) < 0.2, "a"] = np.nan
+    df.loc[rng.random(rows) < 0.3, "b"] = np.nan
+    df.loc[::3, "e"] = np.nan
+    df.loc[::2, "constante"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+@pytest.mark.parametrize("use_float32, tolerance", [(False, 1e-12), (True, 1e-5)])
+def test_correlation_matches_pandas(numeric_frame_with_gaps, method, use_float32, tolerance):
+    """Pares completos como em ``DataFrame.corr``, inclusive Spearman com ausentes e colunas constantes"""
+    from correlation_engine import CorrelationEngine
+
+    expected = numeric_frame_with_gaps.corr(method=method)
+    matrix = CorrelationEngine(use_float32=use_float32).compute(numeric_frame_with_gaps, method)
+    pd.testing.assert_frame_equal(matrix, expected, check_exact=False, rtol=0, atol=tolerance)
+
+
+def test_correlation_cache_and_subsets(numeric_frame_with_gaps):
+    """A matriz é calculada uma vez por versão dos dados; subconjuntos são recortes dela"""
+    from correlation_engine import CorrelationEngine
+
+    engine = CorrelationEngine()
+    full = engine.get_matrix("v1", numeric_frame_with_gaps)
+    assert engine.has_matrix("v1", numeric_frame_with_gaps)
+    subset = engine.get_matrix("v1", numeric_frame_with_gaps, columns=["b", "a", "inexistente"])
+    pd.testing.assert_frame_equal(subset, full.loc[["b", "a"], ["b", "a"]])
+    engine.invalidate("v1")
+    assert not engine.has_matrix("v1", numeric_frame_with_gaps)
+    with pytest.raises(ValueError):
+        engine.get_matrix("v1", numeric_frame_with_gaps, method="kendall")
+
+
+def test_top_pairs_ordering_ties_and_gaps():
+    """Pares mais fortes em ordem, empates na ordem do triângulo superior, NaN ignorado e k maior que os pares"""
+    from correlation_engine import CorrelationEngine
+
+    labels = ["a", "b", "c", "d"]
+    values = np.array([
+        [1.0, 0.9, -0.5, 0.3],
+        [0.9, 1.0, np.nan, 0.3],
+        [-0.5, np.nan, 1.0, -0.8],
+        [0.3, 0.3, -0.8, 1.0],
+    ])
+    matrix = pd.DataFrame(values, index=labels, columns=labels)
+    engine = CorrelationEngine()
+
+    pairs = engine.top_pairs(matrix, k=2)
+    assert pairs["positive"] == [("a", "b", 0.9), ("a", "d", 0.3)]
+    assert pairs["negative"] == [("c", "d", -0.8), ("a", "c", -0.5)]
+
+    everything = engine.top_pairs(matrix, k=10)
+    assert everything["positive"] == [("a", "b", 0.9), ("a", "d", 0.3), ("b", "d", 0.3)]
+    assert everything["negative"] == [("c", "d", -0.8), ("a", "c", -0.5)]
+    assert engine.top_pairs(matrix, k=0) == {"positive": [], "negative": []}
+    assert engine.top_pairs(matrix.iloc[:1, :1], k=3) == {"positive": [], "negative": []}
+
+
+def test_top_pairs_matches_full_sort():
+    """Em uma matriz grande, a seleção parcial dá os mesmos pares de uma ordenação completa"""
+    from correlation_engine import CorrelationEngine
+
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame(rng.normal(size=(200, 40)))
+    frame = frame + frame.shift(axis=1).fillna(0) * 0.5
+    matrix = frame.corr()
+    stacked = matrix.where(np.triu(np.ones(matrix.shape, dtype=bool), k=1)).stack()
+    pairs = CorrelationEngine().top_pairs(matrix, k=5)
+    expected = stacked[stacked > 0].sort_values(ascending=False).head(5)
+    assert [(a, b) for a, b, _ in pairs["positive"]] == list(expected.index)
+    expected = stacked[stacked < 0].sort_values().head(5)
+    assert [(a, b) for a, b, _ in pairs["negative"]] == list(expected.index)
+
+
+def test_exact_job_error_is_returned_not_raised():
+    """A exceção do cálculo exato fica guardada para a renderização, sem chamar o Streamlit na thread"""
+    import threading
+    from sampling_layer import SamplingLayer
+
+    sampling = SamplingLayer(max_workers=1)
+    release = threading.Event()
+
+    def failing():
+        raise ValueError("coluna inválida")
+
+    job = sampling.submit("v1", "overview", failing)
+    job.exception(timeout=5)
+    assert sampling.get_result("v1", "overview") is None
+    assert not sampling.is_pending("v1", "overview")
+    assert isinstance(sampling.get_error("v1", "overview"), ValueError)
+
+    sampling.submit("v1", "bloqueio", release.wait)
+    queued = sampling.submit("v1", "cancelado", lambda: 1)
+    assert queued.cancel()
+    assert sampling.get_result("v1", "cancelado") is None
+    assert sampling.get_error("v1", "cancelado") is None
+    release.set()
+
+    ok = sampling.submit("v1", "visualizations", lambda: 42)
+    ok.result(timeout=5)
+    assert sampling.get_result("v1", "visualizations") == 42
+    assert sampling.get_error("v1", "visualizations") is None
+    assert sampling.get_error("v2", "overview") is None
+
+
+def _strata_frame(rows: int = 20_000) -> pd.DataFrame:
+    """Grupos de tamanhos bem diferentes, incluindo um raro com 3 registros"""
+    rng = np.random.default_rng(10)
+    regiao = rng.choice(["norte", "sul", "leste"], rows, p=[0.7, 0.2, 0.1]).astype(object)
+    regiao[:3] = "ilha"
+    return pd.DataFrame({"regiao": pd.Categorical(regiao), "loja": rng.integers(0, 200, rows),
+                         "valor": rng.normal(size=rows)})
+
+
+def test_stratified_sample_keeps_every_group_in_proportion():
+    from sampling_layer import SamplingLayer
+
+    df = _strata_frame()
+    sampling = SamplingLayer(sample_rows=1_000)
+    assert sampling.needs_sampling(df)
+    assert not sampling.needs_sampling(df.head(1_000))
+
+    sample, strata = sampling.get_sample("v1", df)
+    assert strata == "regiao"
+    assert sample.index.is_unique and sample.index.isin(df.index).all()
+    assert abs(len(sample) - 1_000) <= 4
+    counts = sample["regiao"].value_counts()
+    assert counts["ilha"] >= 1
+    expected = df["regiao"].value_counts(normalize=True)
+    for group in ["norte", "sul", "leste"]:
+        assert counts[group] / len(sample) == pytest.approx(expected[group], abs=0.005)
+    assert sampling.get_sample("v1", df)[0] is sample
+
+
+def test_random_sample_without_low_cardinality_column():
+    from sampling_layer import SamplingLayer
+
+    df = _strata_frame().drop(columns="regiao")
+    sampling = SamplingLayer(sample_rows=500, max_strata=50)
+    sample, strata = sampling.get_sample("v1", df)
+    assert strata is None
+    assert len(sample) == 500
+    assert sample.index.is_unique and sample.index.is_monotonic_increasing
+
+
+def test_exact_jobs_run_once_per_version_and_invalidate():
+    from sampling_layer import SamplingLayer
+
+    sampling = SamplingLayer(sample_rows=1_000)
+    df = _strata_frame()
+    calls = []
+
+    def count():
+        calls.append(1)
+        return len(calls)
+
+    sampling.submit("v1", "total", count).result(timeout=5)
+    sampling.submit("v1", "total", count).result(timeout=5)
+    assert calls == [1]
+    assert sampling.get_result("v1", "total") == 1
+    assert sampling.get_result("v2", "total") is None
+
+    sample, _ = sampling.get_sample("v1", df)
+    sampling.invalidate("v1")
+    assert sampling.get_result("v1", "total") is None
+    assert sampling.get_sample("v1", df)[0] is not sample
+    sampling.submit("v1", "total", count).result(timeout=5)
+    assert calls == [1, 1]
+
+
+def test_sample_frame_only_for_large_current_data(manager):
+    manager.sampling.sample_rows = 1_000
+    df = _load(manager, _strata_frame().to_csv(index=False))
+
+    sample, strata = manager.get_sample_frame(df)
+    assert len(sample) < len(df)
+    assert strata == "regiao"
+    assert manager.get_sample_frame(df)[0] is sample
+
+    subset = df[df["regiao"] == "norte"]
+    result, strata = manager.get_sample_frame(subset)
+    assert result is subset and strata is None
+    small = df.head(1_000)
+    assert manager.get_sample_frame(small)[0] is small
+
+    manager.get_exact_result("linhas", len, df)
+    manager.sampling.submit(manager.current_hash, "linhas", len, df).result(timeout=5)
+    assert manager.get_exact_result("linhas", len, df) == len(df)
+
+
+def _wide_csv(rows: int = 1_000, width: int = 40) -> str:
+    """CSV largo com uma coluna de texto livre longo"""
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({f"m{i:02d}": rng.normal(size=rows).round(4) for i in range(width)})
+    df["grupo"] = rng.choice(["a", "b", "c"], rows)
+    df["comentario"] = [f"cliente {i} relatou atraso na entrega do pedido número {i * 7}" for i in range(rows)]
+    return df.to_csv(index=False)
+
+
+def test_peek_reads_header_and_first_rows_once(manager, monkeypatch):
+    content = _wide_csv()
+    upload = _Upload(content.encode("utf-8"), "largo.csv")
+    preview = manager.peek_upload(upload)
+    assert len(preview) == manager.peek_rows
+    assert list(preview.columns) == list(pd.read_csv(io.StringIO(content), nrows=0).columns)
+    assert upload.tell() == 0
+
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: pytest.fail("prévia relida"))
+    assert manager.peek_upload(_Upload(content.encode("utf-8"), "copia.csv")) is preview
+    assert manager.get_free_text_columns(upload) == ["comentario"]
+
+
+def test_projection_loads_only_selected_columns(tmp_path, manager):
+    content = _wide_csv()
+    full = _plain_load(tmp_path, content)
+
+    selected = ["grupo", "m03", "inexistente", "m01"]
+    df = _load(manager, content, columns=selected)
+    assert list(df.columns) == ["m01", "m03", "grupo"]
+    _assert_same_frame(df, full[["m01", "m03", "grupo"]])
+    projected_hash = manager.current_hash
+
+    # A ordem da seleção não muda a chave; outra seleção ou o arquivo inteiro sim
+    _load(manager, content, columns=list(reversed(selected)))
+    assert manager.current_hash == projected_hash
+    _load(manager, content, columns=["m01"])
+    assert manager.current_hash != projected_hash
+    assert len(_load(manager, content).columns) == len(full.columns)
+    assert manager.current_hash != projected_hash
+
+    chunked = _load(_manager(tmp_path / "blocos"), content, chunked=True, columns=selected)
+    _assert_same_frame(chunked, df)
+
+
+def test_parser_benchmark_runs_once_per_host(tmp_path, monkeypatch):
+    import parser_benchmark
+
+    monkeypatch.setattr(parser_benchmark, "PYARROW_AVAILABLE", True)
+    monkeypatch.setattr(parser_benchmark, "_host_signature", lambda: "host-a")
+    runs = []
+
+    def fake_benchmark():
+        runs.append(1)
+        return {"c": 80.0, "pyarrow": 240.0}
+
+    monkeypatch.setattr(parser_benchmark, "benchmark_parser_engines", fake_benchmark)
+    assert parser_benchmark.get_default_engine(str(tmp_path)) == "pyarrow"
+    assert parser_benchmark.get_default_engine(str(tmp_path)) == "pyarrow"
+    assert runs == [1]
+
+    # Outro host (ou versão do pandas/PyArrow) refaz a medição
+    monkeypatch.setattr(parser_benchmark, "_host_signature", lambda: "host-b")
+    monkeypatch.setattr(parser_benchmark, "benchmark_parser_engines", lambda: {"c": 300.0, "pyarrow": 240.0})
+    assert parser_benchmark.get_default_engine(str(tmp_path)) == "c"
+
+    (tmp_path / parser_benchmark.BENCHMARK_FILE).write_text("{corrompido", encoding="utf-8")
+    assert parser_benchmark.get_default_engine(str(tmp_path)) == "c"
+
+
+def test_auto_engine_resolved_once_per_manager(manager, monkeypatch):
+    import data_manager
+
+    calls = []
+    monkeypatch.setattr(data_manager, "get_default_engine", lambda cache_dir: calls.append(cache_dir) or "c")
+    manager.parser_engine = "auto"
+    assert manager._resolve_parser_engine() == "c"
+    assert manager._resolve_parser_engine() == "c"
+    assert calls == [manager.cache_dir]
+
+
+def _dated_csv(rows: int = 2_000) -> str:
+    """Coluna de data no padrão brasileiro, carimbo ISO com hora e um valor numérico"""
+    start = pd.Timestamp("2024-01-01")
+    frame = pd.DataFrame({
+        "registro": (start + pd.to_timedelta(np.arange(rows) * 37, unit="min")).strftime("%Y-%m-%d %H:%M:%S"),
+        "valor": np.arange(rows) * 0.25,
+        "data_venda": (start + pd.to_timedelta(np.arange(rows) % 365, unit="D")).strftime("%d/%m/%Y"),
+    })
+    return frame.to_csv(index=False)
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_datetime_columns_parsed_at_load(manager, chunked):
+    content = _dated_csv()
+    df = _load(manager, content, chunked=chunked)
+
+    assert pd.api.types.is_datetime64_any_dtype(df["data_venda"])
+    assert pd.api.types.is_datetime64_any_dtype(df["registro"])
+    assert df["data_venda"].notna().all()
+    assert df["data_venda"].iloc[31] == pd.Timestamp("2024-02-01")
+    assert df["registro"].iloc[1] == pd.Timestamp("2024-01-01 00:37:00")
+    # Nome com indicação de data vem primeiro; a ordem do arquivo decide o resto
+    assert manager.get_datetime_columns() == ["data_venda", "registro"]
+    assert manager.get_datetime_columns(df[["valor"]]) == []
+    assert manager.get_datetime_format("data_venda") == "%d/%m/%Y"
+    # O engine pyarrow já entrega o carimbo ISO tipado (sem formato detectado)
+    assert manager.get_datetime_format("registro") in (None, "%Y-%m-%d %H:%M:%S")
+    assert manager.get_datetime_format("valor") is None
+
+
+def test_datetime_format_reused_across_loads(manager, monkeypatch):
+    """O formato detectado é testado primeiro no próximo arquivo com a mesma coluna"""
+    _load(manager, _dated_csv())
+    tried = []
+    to_datetime = pd.to_datetime
+
+    def tracking(values, *args, **kwargs):
+        tried.append(kwargs.get("format"))
+        return to_datetime(values, *args, **kwargs)
+
+    monkeypatch.setattr(pd, "to_datetime", tracking)
+    df = _load(manager, _dated_csv(rows=500))
+    assert pd.api.types.is_datetime64_any_dtype(df["data_venda"])
+    # Uma tentativa na amostra e uma conversão vetorizada, sem testar outros formatos
+    assert tried.count("%d/%m/%Y") == 2
+    assert set(tried) <= {"%d/%m/%Y", "%Y-%m-%d %H:%M:%S"}
+
+
+def _profiled_frame(rows: int = 3_000) -> pd.DataFrame:
+    rng = np.random.default_rng(15)
+    df = pd.DataFrame({
+        "valor": rng.normal(100, 20, rows).round(2),
+        "qtd": rng.integers(0, 40, rows),
+        "canal": rng.choice(["loja", "site", "app"], rows, p=[0.5, 0.3, 0.2]),
+    })
+    df.loc[rng.choice(rows, 90, replace=False), "valor"] = np.nan
+    df.loc[rng.choice(rows, 30, replace=False), "canal"] = np.nan
+    return pd.concat([df, df.iloc[:12]], ignore_index=True)
+
+
+def test_shared_profile_matches_pandas(manager):
+    df = _load(manager, _profiled_frame().to_csv(index=False))
+    profile = manager.get_profile()
+
+    assert profile.n_rows == len(df)
+    assert profile.columns == df.columns.tolist()
+    assert profile.numeric_columns == ["valor", "qtd"]
+    assert profile.categorical_columns == ["canal"]
+    pd.testing.assert_series_equal(profile.missing, df.isna().sum(), check_dtype=False)
+    assert profile.duplicates == df.duplicated().sum()
+    # "valor" fica em float32: describe() do pandas sobre a coluna carregada, na precisão do float32
+    pd.testing.assert_frame_equal(profile.numeric_summary(), df.describe().astype("float64"),
+                                  check_exact=False, rtol=1e-6)
+
+    canal = profile.categorical_summary()["canal"]
+    assert canal["unique_values"] == df["canal"].nunique()
+    assert canal["most_common"] == df["canal"].mode()[0]
+    assert canal["missing_values"] == df["canal"].isna().sum()
+
+    summary = manager.get_data_summary()
+    assert summary["total_records"] == len(df)
+    assert summary["missing_values"] == profile.missing.to_dict()
+    integrity = manager.validate_data_integrity()
+    assert integrity["duplicates"] == profile.duplicates
+
+
+def test_profile_built_once_per_version_and_frame(manager, monkeypatch):
+    df = _load(manager, _profiled_frame().to_csv(index=False))
+    builds = []
+    build = manager.profile_engine.build
+    monkeypatch.setattr(manager.profile_engine, "build", lambda *args: builds.append(args[0]) or build(*args))
+    monkeypatch.setattr(manager.profile_store, "load_profile", lambda *args: None)
+
+    profile = manager.get_profile()
+    assert manager.get_profile() is profile
+    assert manager.get_profile(df) is profile
+    manager.get_data_summary()
+    manager.validate_data_integrity()
+    assert len(builds) == 1
+
+    subset = df[df["canal"] == "loja"]
+    assert manager.get_profile(subset).n_rows == len(subset)
+    assert manager.get_profile(subset) is manager.get_profile(subset)
+    assert len(builds) == 2
+
+    _load(manager, _profiled_frame(rows=500).to_csv(index=False))
+    assert manager.get_profile() is not profile
+    assert manager.get_profile().n_rows == 512
+
+
+def test_profile_is_immutable(manager):
+    _load(manager, _profiled_frame().to_csv(index=False))
+    profile = manager.get_profile()
+    expected = profile.to_dict()
+
+    with pytest.raises(AttributeError):
+        profile.duplicates = 0
+    # Cada acessor devolve uma cópia: alterá-la não muda o perfil compartilhado
+    copies = [profile.missing, profile.dtypes, profile.numeric_summary(), profile.histogram("valor"),
+              profile.top_values("canal")]
+    for copy in copies:
+        copy.iloc[0] = copy.iloc[-1]
+    profile.categorical_summary()["canal"]["most_common"] = "outro"
+    profile.columns.append("extra")
+    profile.numeric_columns.append("extra")
+    assert profile.to_dict() == expected
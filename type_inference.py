@@ -0,0 +1,217 @@
+# Motor de Inferência de Tipos para colunas CSV
+import re
+import pandas as pd
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+# Valores aceitos como booleanos (comparação em minúsculas)
+TRUE_VALUES = {'true', 'verdadeiro', 'sim', 's', 'yes', 'y'}
+FALSE_VALUES = {'false', 'falso', 'não', 'nao', 'n', 'no'}
+
+# Formatos de data testados na amostra, em ordem de preferência (padrão brasileiro primeiro)
+DATETIME_FORMATS = [
+    '%d/%m/%Y',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%d-%m-%Y',
+    '%Y/%m/%d',
+    '%m/%d/%Y',
+    'ISO8601',
+]
+
+# Símbolo de moeda no início do valor; o sinal antes dele ("-R$ 5,00") é preservado
+_CURRENCY_PREFIX = r'^([+-]?)(?:R\$|\$)\s*'
+
+# Números com vírgula decimal ("1.234,56") e com ponto decimal ("1,234.56")
+_NUMBER_COMMA_DECIMAL = re.compile(r'^[+-]?(?:R\$|\$)?\s*(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?$')
+_NUMBER_DOT_DECIMAL = re.compile(r'^[+-]?(?:R\$|\$)?\s*(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?(?:[eE][+-]?\d+)?$')
+_HAS_DIGIT = re.compile(r'\d')
+
+
+class TypeInferenceEngine:
+    """Decide o tipo de cada coluna a partir de uma amostra e converte cada coluna uma única vez"""
+
+    def __init__(self, sample_size: int = 1000, match_threshold: float = 0.95,
+                 category_max_ratio: float = 0.5):
+        self.sample_size = sample_size
+        self.match_threshold = match_threshold
+        self.category_max_ratio = category_max_ratio
+        # Último formato de data detectado por nome de coluna (testado primeiro nas próximas cargas)
+        self.datetime_format_cache: Dict[str, str] = {}
+
+    def infer_schema(self, df: pd.DataFrame, decimal_hint: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Infere o esquema do DataFrame a partir de amostras das colunas
+
+        Args:
+            df: DataFrame recém carregado
+            decimal_hint: Separador decimal preferido em caso de empate (',' ou '.')
+
+        Returns:
+            Dicionário coluna -> informações do tipo inferido
+        """
+        schema = {}
+        for col in df.columns:
+            schema[col] = self._infer_column(df[col], decimal_hint)
+        return schema
+
+    def apply_schema(self, df: pd.DataFrame, schema: Dict[str, Dict[str, Any]],
+                     types: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Converte as colunas de texto para os tipos inferidos com operações vetorizadas
+
+        Args:
+            df: DataFrame a converter
+            schema: Esquema retornado por infer_schema
+            types: Restringe a conversão a estes tipos inferidos (None = todos)
+        """
+        allowed = set(types) if types is not None else None
+        for col, info in schema.items():
+            if col not in df.columns or not self._is_text(df[col]):
+                continue
+            inferred = info.get('inferred_type')
+            if allowed is not None and inferred not in allowed:
+                continue
+
+            # Coluna já nativa na amostra (sem 'decimal'/'format') pode chegar como texto em outro bloco
+            converted = None
+            if inferred == 'numeric':
+                converted = self._to_numeric(df[col], info.get('decimal', '.'))
+            elif inferred == 'boolean':
+                converted = self._to_boolean(df[col])
+            elif inferred == 'datetime':
+                converted = self._to_datetime(df[col], info.get('format'))
+            elif inferred == 'category':
+                converted = df[col].astype('category')
+
+            if converted is None:
+                continue
+
+            # Conferir na coluna inteira: se a conversão perder valores demais, manter como texto
+            if inferred != 'category':
+                original_count = df[col].notna().sum()
+                if original_count and converted.notna().sum() / original_count < self.match_threshold:
+                    info['inferred_type'] = 'text'
+                    info['dtype'] = str(df[col].dtype)
+                    continue
+
+            df[col] = converted
+            info['dtype'] = str(converted.dtype)
+
+        return df
+
+    def schema_report(self, schema: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+        """Gera relatório tabular do esquema inferido"""
+        rows = []
+        for col, info in schema.items():
+            rows.append({
+                'coluna': col,
+                'tipo_original': info.get('source_dtype'),
+                'tipo_inferido': info.get('inferred_type'),
+                'dtype_final': info.get('dtype'),
+                'detalhe': info.get('format') or info.get('decimal') or '',
+                'confianca': round(info.get('confidence', 1.0), 3)
+            })
+        return pd.DataFrame(rows)
+
+    def _infer_column(self, series: pd.Series, decimal_hint: Optional[str]) -> Dict[str, Any]:
+        """Infere o tipo de uma coluna"""
+        info: Dict[str, Any] = {
+            'source_dtype': str(series.dtype),
+            'dtype': str(series.dtype),
+            'confidence': 1.0
+        }
+
+        if not self._is_text(series):
+            if pd.api.types.is_bool_dtype(series):
+                info['inferred_type'] = 'boolean'
+            elif pd.api.types.is_numeric_dtype(series):
+                info['inferred_type'] = 'numeric'
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                info['inferred_type'] = 'datetime'
+            else:
+                info['inferred_type'] = 'native'
+            return info
+
+        sample = self._sample(series)
+        if sample.empty:
+            info['inferred_type'] = 'empty'
+            return info
+
+        lowered = sample.str.lower()
+        bool_ratio = lowered.isin(TRUE_VALUES | FALSE_VALUES).mean()
+        if bool_ratio >= self.match_threshold:
+            info.update(inferred_type='boolean', confidence=float(bool_ratio))
+            return info
+
+        comma_ratio = sample.str.match(_NUMBER_COMMA_DECIMAL).mean()
+        dot_ratio = sample.str.match(_NUMBER_DOT_DECIMAL).mean()
+        if max(comma_ratio, dot_ratio) >= self.match_threshold:
+            if comma_ratio == dot_ratio:
+                decimal = decimal_hint or '.'
+            else:
+                decimal = ',' if comma_ratio > dot_ratio else '.'
+            info.update(inferred_type='numeric', decimal=decimal,
+                        confidence=float(max(comma_ratio, dot_ratio)))
+            return info
+
+        if sample.str.contains(_HAS_DIGIT).mean() >= self.match_threshold:
+            fmt, parsed_ratio = self._detect_datetime_format(sample, str(series.name))
+            if fmt is not None:
+                info.update(inferred_type='datetime', format=fmt, confidence=parsed_ratio)
+                return info
+
+        unique_ratio = sample.nunique() / len(sample)
+        if unique_ratio <= self.category_max_ratio:
+            info.update(inferred_type='category', confidence=float(1 - unique_ratio))
+            return info
+
+        info['inferred_type'] = 'text'
+        return info
+
+    def _detect_datetime_format(self, sample: pd.Series, column: str) -> Tuple[Optional[str], float]:
+        """Primeiro formato que converte a amostra, começando pelo formato já visto nesta coluna"""
+        cached = self.datetime_format_cache.get(column)
+        formats = [cached] + [fmt for fmt in DATETIME_FORMATS if fmt != cached] if cached else DATETIME_FORMATS
+        for fmt in formats:
+            parsed_ratio = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+            if parsed_ratio >= self.match_threshold:
+                self.datetime_format_cache[column] = fmt
+                return fmt, float(parsed_ratio)
+        return None, 0.0
+
+    def _sample(self, series: pd.Series) -> pd.Series:
+        """Amostra espaçada ao longo da coluna, sem valores ausentes ou vazios"""
+        step = max(1, len(series) // self.sample_size)
+        sample = series.iloc[::step].dropna().astype(str).str.strip()
+        return sample[sample != ''].head(self.sample_size)
+
+    def _is_text(self, series: pd.Series) -> bool:
+        """Indica se a coluna ainda está como texto"""
+        return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+    def _to_numeric(self, series: pd.Series, decimal: str) -> pd.Series:
+        """Converte texto numérico respeitando o separador decimal"""
+        text = series.astype(str).str.strip().str.replace(_CURRENCY_PREFIX, r'\1', regex=True)
+        if decimal == ',':
+            text = text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        else:
+            text = text.str.replace(',', '', regex=False)
+        numeric = pd.to_numeric(text, errors='coerce')
+        return numeric.where(series.notna())
+
+    def _to_boolean(self, series: pd.Series) -> pd.Series:
+        """Converte texto booleano ("sim"/"não", "true"/"false"...)"""
+        lowered = series.astype(str).str.strip().str.lower()
+        mapping = {value: True for value in TRUE_VALUES}
+        mapping.update({value: False for value in FALSE_VALUES})
+        converted = lowered.map(mapping).where(series.notna())
+        if converted.isna().any():
+            return converted.astype('boolean')
+        return converted.astype(bool)
+
+    def _to_datetime(self, series: pd.Series, fmt: str) -> pd.Series:
+        """Converte texto em datetime64 com o formato detectado"""
+        return pd.to_datetime(series, format=fmt, errors='coerce')
@@ -8,6 +8,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
 from typing import Dict, List, Tuple, Optional, Any
+from data_manager import data_manager
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -18,10 +19,25 @@ sns.set_palette("husl")
 class EnhancedVisualizer:
     """Classe para visualizações avançadas com matplotlib e seaborn"""
     
-    def __init__(self, df: pd.DataFrame):
+    # Acima deste número de registros os box plots usam os quartis do perfil (sketch KLL ou DuckDB)
+    box_summary_min_rows = 100_000
+    
+    def __init__(self, df: pd.DataFrame, backend=None):
+        """
+        Args:
+            df: DataFrame a visualizar (no modo out-of-core, a amostra em memória)
+            backend: DuckDBBackend opcional; quando informado, agregações são
+                calculadas sobre o arquivo completo em disco
+        """
         self.df = df
+        self.backend = backend
+        # Erros guardados em vez de exibidos: a geração pode rodar numa thread sem contexto do Streamlit
+        self.errors: List[str] = []
         self.numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        self.categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+        self.categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+        if backend is not None:
+            backend_numeric = backend.numeric_columns()
+            self.numeric_cols = [col for col in self.numeric_cols if col in backend_numeric]
         
     def create_comprehensive_analysis_plots(self) -> Dict[str, Any]:
         """Cria conjunto completo de visualizações para análise"""
@@ -40,8 +56,8 @@ class EnhancedVisualizer:
             if self.numeric_cols:
                 plots['outliers'] = self._create_outlier_analysis()
             
-            # 4. Análise temporal (se houver coluna de tempo)
-            time_cols = [col for col in self.df.columns if 'time' in col.lower() or 'date' in col.lower()]
+            # 4. Análise temporal (colunas de data já convertidas no carregamento)
+            time_cols = data_manager.get_datetime_columns(self.df)
             if time_cols:
                 plots['temporal'] = self._create_temporal_analysis(time_cols[0])
             
@@ -52,7 +68,7 @@ class EnhancedVisualizer:
             return plots
             
         except Exception as e:
-            st.error(f"Erro ao criar visualizações: {str(e)}")
+            self.errors.append(f"Erro ao criar visualizações: {str(e)}")
             return {}
     
     def _create_distribution_plots(self) -> go.Figure:
@@ -67,20 +83,34 @@ class EnhancedVisualizer:
                 specs=[[{"secondary_y": False}] * 3] * 2
             )
             
+            # Histogramas guardados no perfil (no modo out-of-core, contados no DuckDB)
+            profile = data_manager.get_profile(self.df)
+            
             for i, col in enumerate(cols_to_plot):
                 row = (i // 3) + 1
                 col_pos = (i % 3) + 1
                 
                 # Histograma
-                fig.add_trace(
-                    go.Histogram(
+                hist = profile.histogram(col) if profile is not None else None
+                if hist is None and self.backend is not None:
+                    # Faixas contadas no DuckDB: apenas 30 barras voltam para a memória
+                    hist = self.backend.histogram(col, bins=30)
+                if hist is not None:
+                    trace = go.Bar(
+                        x=(hist['inicio'] + hist['fim']) / 2,
+                        y=hist['contagem'],
+                        width=(hist['fim'] - hist['inicio']),
+                        name=col,
+                        opacity=0.7
+                    )
+                else:
+                    trace = go.Histogram(
                         x=self.df[col],
                         name=col,
                         nbinsx=30,
                         opacity=0.7
-                    ),
-                    row=row, col=col_pos
-                )
+                    )
+                fig.add_trace(trace, row=row, col=col_pos)
             
             fig.update_layout(
                 title="Distribuições das Variáveis Numéricas",
@@ -91,14 +121,14 @@ class EnhancedVisualizer:
             return fig
             
         except Exception as e:
-            st.error(f"Erro ao criar gráficos de distribuição: {str(e)}")
+            self.errors.append(f"Erro ao criar gráficos de distribuição: {str(e)}")
             return go.Figure()
     
     def _create_correlation_matrix(self) -> go.Figure:
         """Cria matriz de correlação"""
         try:
-            # Calcular correlação
-            corr_matrix = self.df[self.numeric_cols].corr()
+            # Matriz compartilhada (calculada uma vez por versão dos dados)
+            corr_matrix = data_manager.get_correlation(self.df, columns=self.numeric_cols)
             
             # Criar heatmap
             fig = go.Figure(data=go.Heatmap(
@@ -123,7 +153,7 @@ class EnhancedVisualizer:
             return fig
             
         except Exception as e:
-            st.error(f"Erro ao criar matriz de correlação: {str(e)}")
+            self.errors.append(f"Erro ao criar matriz de correlação: {str(e)}")
             return go.Figure()
     
     def _create_outlier_analysis(self) -> go.Figure:
@@ -133,18 +163,37 @@ class EnhancedVisualizer:
             cols_to_plot = self.numeric_cols[:6]
             
             fig = go.Figure()
-            
-            for col in cols_to_plot:
-                fig.add_trace(go.Box(
-                    y=self.df[col],
-                    name=col,
-                    boxpoints='outliers',
-                    jitter=0.3,
-                    pointpos=-1.8
-                ))
+            title = "Análise de Outliers (Box Plots)"
+            
+            if self.backend is not None or len(self.df) > self.box_summary_min_rows:
+                # Box plots a partir dos quartis do perfil (DuckDB ou sketches KLL), sem enviar os pontos
+                profile = data_manager.get_profile(self.df)
+                summary = profile.numeric_summary(cols_to_plot)
+                rank_error = profile.max_quantile_error(cols_to_plot)
+                if rank_error:
+                    title += f" — quartis aproximados (±{rank_error * 100:.1f}% de rank)"
+                for col in cols_to_plot:
+                    fig.add_trace(go.Box(
+                        name=col,
+                        q1=[summary.at['25%', col]],
+                        median=[summary.at['50%', col]],
+                        q3=[summary.at['75%', col]],
+                        lowerfence=[summary.at['min', col]],
+                        upperfence=[summary.at['max', col]],
+                        mean=[summary.at['mean', col]]
+                    ))
+            else:
+                for col in cols_to_plot:
+                    fig.add_trace(go.Box(
+                        y=self.df[col],
+                        name=col,
+                        boxpoints='outliers',
+                        jitter=0.3,
+                        pointpos=-1.8
+                    ))
             
             fig.update_layout(
-                title="Análise de Outliers (Box Plots)",
+                title=title,
                 yaxis_title="Valores",
                 height=500
             )
@@ -152,57 +201,69 @@ class EnhancedVisualizer:
             return fig
             
         except Exception as e:
-            st.error(f"Erro ao criar análise de outliers: {str(e)}")
+            self.errors.append(f"Erro ao criar análise de outliers: {str(e)}")
             return go.Figure()
     
     def _create_temporal_analysis(self, time_col: str) -> go.Figure:
         """Cria análise temporal"""
         try:
-            # Converter para datetime se necessário
-            if not pd.api.types.is_datetime64_any_dtype(self.df[time_col]):
-                self.df[time_col] = pd.to_datetime(self.df[time_col], errors='coerce')
+            if self.backend is not None and time_col in self.backend.column_types().index:
+                unit = 'hour' if self.backend.row_count() > 1000 else 'minute'
+                temporal_counts = self.backend.count_by_period(time_col, unit, data_manager.get_datetime_format(time_col))
+                return self._temporal_figure(temporal_counts, time_col)
+            
+            time_values = self.df[time_col]
             
             # Agrupar por período (dia, hora, etc.)
             if len(self.df) > 1000:
                 # Para datasets grandes, agrupar por hora
-                self.df['period'] = self.df[time_col].dt.floor('H')
+                period = time_values.dt.floor('H')
             else:
                 # Para datasets menores, agrupar por minuto
-                self.df['period'] = self.df[time_col].dt.floor('T')
+                period = time_values.dt.floor('T')
             
             # Contar ocorrências por período
-            temporal_counts = self.df.groupby('period').size().reset_index(name='count')
+            temporal_counts = period.rename('period').to_frame().groupby('period').size().reset_index(name='count')
             
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=temporal_counts['period'],
-                y=temporal_counts['count'],
-                mode='lines+markers',
-                name='Ocorrências',
-                line=dict(width=2)
-            ))
-            
-            fig.update_layout(
-                title=f"Análise Temporal - {time_col}",
-                xaxis_title="Tempo",
-                yaxis_title="Número de Ocorrências",
-                height=400
-            )
-            
-            return fig
+            return self._temporal_figure(temporal_counts, time_col)
             
         except Exception as e:
-            st.error(f"Erro ao criar análise temporal: {str(e)}")
+            self.errors.append(f"Erro ao criar análise temporal: {str(e)}")
             return go.Figure()
     
+    def _temporal_figure(self, temporal_counts: pd.DataFrame, time_col: str) -> go.Figure:
+        """Monta o gráfico de ocorrências por período"""
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=temporal_counts['period'],
+            y=temporal_counts['count'],
+            mode='lines+markers',
+            name='Ocorrências',
+            line=dict(width=2)
+        ))
+        
+        fig.update_layout(
+            title=f"Análise Temporal - {time_col}",
+            xaxis_title="Tempo",
+            yaxis_title="Número de Ocorrências",
+            height=400
+        )
+        
+        return fig
+    
     def _create_categorical_analysis(self) -> go.Figure:
         """Cria análise de variáveis categóricas"""
         try:
             # Selecionar primeira coluna categórica
             cat_col = self.categorical_cols[0]
             
-            # Contar valores
-            value_counts = self.df[cat_col].value_counts().head(10)
+            # Contar valores (valores mais frequentes guardados no perfil, se houver)
+            profile = data_manager.get_profile(self.df)
+            value_counts = profile.top_values(cat_col) if profile is not None else None
+            if value_counts is None and self.backend is not None and cat_col in self.backend.column_types().index:
+                value_counts = self.backend.value_counts(cat_col, limit=10)
+            elif value_counts is None:
+                value_counts = self.df[cat_col].value_counts().head(10)
             
             fig = go.Figure(data=[
                 go.Bar(
@@ -222,102 +283,164 @@ class EnhancedVisualizer:
             return fig
             
         except Exception as e:
-            st.error(f"Erro ao criar análise categórica: {str(e)}")
+            self.errors.append(f"Erro ao criar análise categórica: {str(e)}")
             return go.Figure()
     
     def create_summary_statistics(self) -> Dict[str, Any]:
         """Cria estatísticas resumidas"""
         try:
+            # Perfil compartilhado (no modo out-of-core, do arquivo completo via DuckDB)
+            profile = data_manager.get_profile(self.df)
             stats = {}
             
             # Estatísticas básicas
             stats['basic'] = {
-                'total_records': len(self.df),
-                'total_columns': len(self.df.columns),
+                'total_records': profile.n_rows,
+                'total_columns': profile.n_columns,
                 'numeric_columns': len(self.numeric_cols),
                 'categorical_columns': len(self.categorical_cols),
-                'missing_values': self.df.isnull().sum().sum(),
-                'duplicate_rows': self.df.duplicated().sum()
+                'missing_values': profile.total_missing,
+                'duplicate_rows': profile.duplicates
             }
             
             # Estatísticas por coluna numérica
-            if self.numeric_cols:
-                stats['numeric_summary'] = self.df[self.numeric_cols].describe().to_dict()
+            if profile.numeric_columns:
+                stats['numeric_summary'] = profile.numeric_summary().to_dict()
             
             # Estatísticas por coluna categórica
-            if self.categorical_cols:
-                stats['categorical_summary'] = {}
-                for col in self.categorical_cols:
-                    stats['categorical_summary'][col] = {
-                        'unique_values': self.df[col].nunique(),
-                        'most_common': self.df[col].mode().iloc[0] if len(self.df[col].mode()) > 0 else None,
-                        'missing_values': self.df[col].isnull().sum()
-                    }
+            if profile.categorical_columns:
+                stats['categorical_summary'] = profile.categorical_summary()
             
             return stats
             
         except Exception as e:
-            st.error(f"Erro ao criar estatísticas: {str(e)}")
+            self.errors.append(f"Erro ao criar estatísticas: {str(e)}")
             return {}
 
-def show_enhanced_visualizations(df: pd.DataFrame):
+def _build_visualizations(df: pd.DataFrame, backend=None,
+                          total_rows: Optional[int] = None) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+    """Gera gráficos, estatísticas e mensagens de erro (sem exibi-las: pode rodar em segundo plano)
+
+    Com ``total_rows`` o ``df`` é uma amostra e as contagens são extrapoladas.
+    """
+    visualizer = EnhancedVisualizer(df, backend)
+    plots = visualizer.create_comprehensive_analysis_plots()
+    stats = visualizer.create_summary_statistics()
+    if total_rows and stats and len(df):
+        scale = total_rows / len(df)
+        stats['basic']['total_records'] = total_rows
+        stats['basic']['missing_values'] = int(round(stats['basic']['missing_values'] * scale))
+        stats['basic']['duplicate_rows'] = int(round(stats['basic']['duplicate_rows'] * scale))
+    return plots, stats, visualizer.errors
+
+def _get_visualizations(df: pd.DataFrame,
+                        backend=None) -> Tuple[Dict[str, Any], Dict[str, Any], List[str], Optional[str]]:
+    """Visualizações exatas se prontas; senão, da amostra enquanto as exatas são calculadas
+    
+    Se o cálculo exato falhou, a amostra continua em uso e a exceção da thread
+    entra nos erros, para ser exibida por quem renderiza.
+    
+    Returns:
+        Gráficos, estatísticas, mensagens de erro e a descrição da amostra (None quando exatas)
+    """
+    sample, strata_col = data_manager.get_sample_frame(df)
+    if sample is df and backend is None:
+        return (*_build_visualizations(df), None)
+    
+    exact = data_manager.get_exact_result('visualizations', _build_visualizations, df, backend)
+    if exact is not None:
+        return (*exact, None)
+    
+    total_rows = backend.row_count() if backend is not None else len(df)
+    strata = f", estratificada por '{strata_col}'" if strata_col else ""
+    plots, stats, errors = _build_visualizations(sample, total_rows=total_rows)
+    exact_error = data_manager.get_exact_error('visualizations')
+    if exact_error is not None:
+        errors = [*errors, f"Erro ao calcular as visualizações exatas: {str(exact_error)}"]
+    return plots, stats, errors, f"{len(sample):,} registros{strata}"
+
+def show_enhanced_visualizations(df: pd.DataFrame, backend=None):
     """Função para mostrar visualizações avançadas no Streamlit"""
     try:
-        visualizer = EnhancedVisualizer(df)
-        
         st.markdown("### 📊 Visualizações Avançadas com Matplotlib e Seaborn")
         
-        # Criar visualizações
-        plots = visualizer.create_comprehensive_analysis_plots()
-        
-        if plots:
-            # Mostrar cada tipo de visualização
-            if 'distributions' in plots:
-                st.markdown("#### 📈 Distribuições das Variáveis Numéricas")
-                st.plotly_chart(plots['distributions'], use_container_width=True)
-            
-            if 'correlation' in plots:
-                st.markdown("#### 🔗 Matriz de Correlação")
-                st.plotly_chart(plots['correlation'], use_container_width=True)
-            
-            if 'outliers' in plots:
-                st.markdown("#### ⚠️ Análise de Outliers")
-                st.plotly_chart(plots['outliers'], use_container_width=True)
-            
-            if 'temporal' in plots:
-                st.markdown("#### 📅 Análise Temporal")
-                st.plotly_chart(plots['temporal'], use_container_width=True)
-            
-            if 'categorical' in plots:
-                st.markdown("#### 📋 Análise Categórica")
-                st.plotly_chart(plots['categorical'], use_container_width=True)
-        
-        # Mostrar estatísticas resumidas
-        stats = visualizer.create_summary_statistics()
-        if stats:
-            st.markdown("#### 📊 Estatísticas Resumidas")
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("📊 Registros", f"{stats['basic']['total_records']:,}")
-            
-            with col2:
-                st.metric("📋 Colunas", stats['basic']['total_columns'])
-            
-            with col3:
-                st.metric("⚠️ Valores Faltantes", f"{stats['basic']['missing_values']:,}")
-            
-            with col4:
-                st.metric("🔄 Duplicatas", f"{stats['basic']['duplicate_rows']:,}")
+        plots, stats, errors, sample_info = _get_visualizations(df, backend)
+        if sample_info is not None and data_manager.is_exact_pending('visualizations'):
+            # Atualiza só este trecho até as visualizações exatas ficarem prontas
+            st.fragment(_render_visualizations_until_exact, run_every=1.0)(df, backend)
+        else:
+            _render_visualizations(plots, stats, errors, sample_info)
         
     except Exception as e:
         st.error(f"Erro ao criar visualizações: {str(e)}")
 
-def generate_visualization_insights(df: pd.DataFrame) -> str:
+def _render_visualizations_until_exact(df: pd.DataFrame, backend=None):
+    """Renderiza as visualizações da amostra e recarrega a página quando as exatas terminam
+
+    Se o cálculo exato falhou, a página recarregada mostra a amostra com o erro
+    devolvido pela thread (exibido aqui, na execução do script, e não na thread).
+    """
+    plots, stats, errors, sample_info = _get_visualizations(df, backend)
+    if sample_info is None or not data_manager.is_exact_pending('visualizations'):
+        st.rerun()
+    _render_visualizations(plots, stats, errors, sample_info)
+
+def _render_visualizations(plots: Dict[str, Any], stats: Dict[str, Any], errors: List[str],
+                           sample_info: Optional[str] = None):
+    """Desenha os erros, os gráficos e as estatísticas resumidas"""
+    approx = "≈ " if sample_info else ""
+    for message in errors:
+        st.error(message)
+    if sample_info and data_manager.is_exact_pending('visualizations'):
+        st.caption(f"⏳ Gráficos aproximados a partir de uma amostra de {sample_info}; "
+                   "as visualizações exatas estão sendo calculadas em segundo plano")
+    elif sample_info:
+        st.caption(f"Gráficos aproximados a partir de uma amostra de {sample_info}")
+    
+    if plots:
+        # Mostrar cada tipo de visualização
+        if 'distributions' in plots:
+            st.markdown("#### 📈 Distribuições das Variáveis Numéricas")
+            st.plotly_chart(plots['distributions'], use_container_width=True)
+        
+        if 'correlation' in plots:
+            st.markdown("#### 🔗 Matriz de Correlação")
+            st.plotly_chart(plots['correlation'], use_container_width=True)
+        
+        if 'outliers' in plots:
+            st.markdown("#### ⚠️ Análise de Outliers")
+            st.plotly_chart(plots['outliers'], use_container_width=True)
+        
+        if 'temporal' in plots:
+            st.markdown("#### 📅 Análise Temporal")
+            st.plotly_chart(plots['temporal'], use_container_width=True)
+        
+        if 'categorical' in plots:
+            st.markdown("#### 📋 Análise Categórica")
+            st.plotly_chart(plots['categorical'], use_container_width=True)
+    
+    # Mostrar estatísticas resumidas
+    if stats:
+        st.markdown("#### 📊 Estatísticas Resumidas")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("📊 Registros", f"{stats['basic']['total_records']:,}")
+        
+        with col2:
+            st.metric("📋 Colunas", stats['basic']['total_columns'])
+        
+        with col3:
+            st.metric("⚠️ Valores Faltantes", f"{approx}{stats['basic']['missing_values']:,}")
+        
+        with col4:
+            st.metric("🔄 Duplicatas", f"{approx}{stats['basic']['duplicate_rows']:,}")
+
+def generate_visualization_insights(df: pd.DataFrame, backend=None) -> str:
     """Gera insights baseados nas visualizações"""
     try:
-        visualizer = EnhancedVisualizer(df)
+        visualizer = EnhancedVisualizer(df, backend)
         stats = visualizer.create_summary_statistics()
         
         insights = []
@@ -338,12 +461,12 @@ def generate_visualization_insights(df: pd.DataFrame) -> str:
         
         # Insights sobre correlações (se houver variáveis numéricas)
         if len(visualizer.numeric_cols) > 1:
-            corr_matrix = df[visualizer.numeric_cols].corr()
-            high_corr = corr_matrix.abs().stack().sort_values(ascending=False)
-            high_corr = high_corr[high_corr < 1.0].head(3)
+            top_pairs = data_manager.get_top_correlations(df, k=3, columns=visualizer.numeric_cols)
             
-            if len(high_corr) > 0:
-                insights.append(f"Correlações mais altas: {', '.join([f'{pair[0][0]}-{pair[0][1]} ({pair[1]:.2f})' for pair in high_corr.items()])}")
+            if top_pairs['positive']:
+                insights.append(f"Correlações positivas mais altas: {', '.join([f'{a}-{b} ({r:.2f})' for a, b, r in top_pairs['positive']])}")
+            if top_pairs['negative']:
+                insights.append(f"Correlações negativas mais fortes: {', '.join([f'{a}-{b} ({r:.2f})' for a, b, r in top_pairs['negative']])}")
         
         return "\n".join(insights)
         